@@ -41,7 +41,9 @@ def main():
         print(f"❌ Ошибка ONNX инференса: {e}")
 
     print("\n4. Бенчмарк производительности:")
-    performance = tester.benchmark_performance(num_runs=30)
+    performance = tester.benchmark_performance(
+        num_runs=30, history_path="results/benchmark_history.db"
+    )
 
     print("\n=== Результаты ===")
     print(f"PyTorch caption: {pytorch_caption}")
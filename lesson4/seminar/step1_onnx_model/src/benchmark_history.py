@@ -0,0 +1,387 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+
+DEFAULT_HISTORY_PATH = "results/benchmark_history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    git_revision TEXT,
+    ort_version TEXT,
+    hardware_id TEXT,
+    hardware TEXT,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id TEXT NOT NULL REFERENCES runs(run_id),
+    batch_size INTEGER NOT NULL,
+    latency_ms REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_samples_run ON samples(run_id, batch_size);
+"""
+
+
+def git_revision() -> str:
+    """Текущая git ревизия (с пометкой -dirty при незакоммиченных изменениях)"""
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        return f"{rev}-dirty" if dirty else rev
+    except Exception:
+        return "unknown"
+
+
+def ort_version() -> str:
+    """Версия onnxruntime"""
+    try:
+        import onnxruntime
+
+        return onnxruntime.__version__
+    except Exception:
+        return "unknown"
+
+
+def hardware_fingerprint() -> Dict:
+    """Описание железа, на котором запускался бенчмарк"""
+    info = {
+        "system": platform.system(),
+        "release": platform.release(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+    try:
+        info["memory_gb"] = round(
+            os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") / 1024**3, 1
+        )
+    except (ValueError, OSError, AttributeError):
+        info["memory_gb"] = None
+    return info
+
+
+def mann_whitney_u(a: np.ndarray, b: np.ndarray) -> Dict:
+    """
+    Двусторонний тест Манна-Уитни (нормальная аппроксимация с поправкой на связи)
+
+    Returns:
+        Словарь с U статистикой для b, p-value и вероятностью P(b > a)
+    """
+    n_a, n_b = len(a), len(b)
+    combined = np.concatenate([a, b])
+    order = np.argsort(combined, kind="mergesort")
+    sorted_values = combined[order]
+
+    ranks = np.empty(len(combined))
+    _, first_idx, counts = np.unique(
+        sorted_values, return_index=True, return_counts=True
+    )
+    for start, count in zip(first_idx, counts):
+        ranks[order[start : start + count]] = start + (count + 1) / 2.0
+
+    u_b = ranks[n_a:].sum() - n_b * (n_b + 1) / 2.0
+    mean_u = n_a * n_b / 2.0
+    n = n_a + n_b
+    tie_term = np.sum(counts**3 - counts) / (n * (n - 1)) if n > 1 else 0.0
+    var_u = n_a * n_b / 12.0 * ((n + 1) - tie_term)
+
+    if var_u <= 0:
+        p_value = 1.0
+    else:
+        z = (abs(u_b - mean_u) - 0.5) / math.sqrt(var_u)
+        p_value = math.erfc(max(z, 0.0) / math.sqrt(2))
+
+    return {
+        "u_statistic": float(u_b),
+        "p_value": float(p_value),
+        "prob_superiority": float(u_b / (n_a * n_b)),
+    }
+
+
+def bootstrap_diff_ci(
+    a: np.ndarray,
+    b: np.ndarray,
+    statistic,
+    n_bootstrap: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 42,
+) -> Dict:
+    """Бутстрап доверительный интервал для statistic(b) - statistic(a)"""
+    rng = np.random.default_rng(seed)
+    idx_a = rng.integers(0, len(a), size=(n_bootstrap, len(a)))
+    idx_b = rng.integers(0, len(b), size=(n_bootstrap, len(b)))
+    diffs = statistic(b[idx_b]) - statistic(a[idx_a])
+
+    alpha = (1 - confidence) / 2
+    return {
+        "diff": float(statistic(b[None, :])[0] - statistic(a[None, :])[0]),
+        "ci_low": float(np.quantile(diffs, alpha)),
+        "ci_high": float(np.quantile(diffs, 1 - alpha)),
+    }
+
+
+def _p95(samples: np.ndarray) -> np.ndarray:
+    return np.percentile(samples, 95, axis=1)
+
+
+def _mean(samples: np.ndarray) -> np.ndarray:
+    return np.mean(samples, axis=1)
+
+
+class BenchmarkHistory:
+    """
+    Append-only история бенчмарков в SQLite
+
+    Каждый запуск хранит git ревизию, версию onnxruntime, описание железа
+    и сырые замеры latency, поэтому любые два запуска можно сравнить
+    статистическими тестами.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_HISTORY_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record_run(
+        self,
+        source: str,
+        latencies_by_batch: Dict[int, List[float]],
+        params: Optional[Dict] = None,
+    ) -> str:
+        """
+        Сохранение запуска бенчмарка
+
+        Args:
+            source: Откуда запуск (batch_optimizer, generation, onnx_tester, ...)
+            latencies_by_batch: Сырые latency (мс) для каждого размера батча
+            params: Параметры запуска
+
+        Returns:
+            Идентификатор запуска
+        """
+        if not latencies_by_batch:
+            raise ValueError("Нет замеров для сохранения")
+
+        run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        hardware = hardware_fingerprint()
+        hardware_json = json.dumps(hardware, sort_keys=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+                    source,
+                    git_revision(),
+                    ort_version(),
+                    hashlib.sha1(hardware_json.encode()).hexdigest()[:12],
+                    hardware_json,
+                    json.dumps(params or {}, default=str),
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO samples VALUES (?, ?, ?)",
+                (
+                    (run_id, int(batch_size), float(latency))
+                    for batch_size, latencies in latencies_by_batch.items()
+                    for latency in latencies
+                ),
+            )
+
+        return run_id
+
+    def list_runs(self, source: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Последние запуски (новые первыми)"""
+        query = "SELECT * FROM runs"
+        args: tuple = ()
+        if source:
+            query += " WHERE source = ?"
+            args = (source,)
+        query += " ORDER BY created_at DESC, rowid DESC LIMIT ?"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, args + (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def resolve_run_id(self, run_ref: str, source: Optional[str] = None) -> str:
+        """Поддержка ссылок latest / previous вместо идентификатора"""
+        if run_ref not in ("latest", "previous"):
+            return run_ref
+
+        runs = self.list_runs(source=source, limit=2)
+        position = 0 if run_ref == "latest" else 1
+        if len(runs) <= position:
+            raise ValueError(f"В истории нет запуска '{run_ref}'")
+        return runs[position]["run_id"]
+
+    def load_samples(self, run_id: str) -> Dict[int, np.ndarray]:
+        """Сырые latency запуска по размерам батча"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT batch_size, latency_ms FROM samples WHERE run_id = ?",
+                (run_id,),
+            ).fetchall()
+
+        if not rows:
+            raise ValueError(f"Запуск {run_id} не найден")
+
+        samples: Dict[int, List[float]] = {}
+        for row in rows:
+            samples.setdefault(row["batch_size"], []).append(row["latency_ms"])
+        return {bs: np.asarray(values) for bs, values in samples.items()}
+
+    def compare(
+        self,
+        baseline_run: str,
+        candidate_run: str,
+        alpha: float = 0.05,
+        n_bootstrap: int = 2000,
+    ) -> List[Dict]:
+        """
+        Статистическое сравнение двух запусков
+
+        Для каждого общего размера батча считается тест Манна-Уитни по
+        latency и бутстрап интервалы для разницы p95 и throughput.
+        Регрессией считается значимый рост p95 или падение throughput.
+
+        Args:
+            baseline_run: Базовый запуск
+            candidate_run: Проверяемый запуск
+            alpha: Уровень значимости
+            n_bootstrap: Количество бутстрап выборок
+
+        Returns:
+            Список результатов сравнения по размерам батча
+        """
+        baseline = self.load_samples(baseline_run)
+        candidate = self.load_samples(candidate_run)
+
+        results = []
+        for batch_size in sorted(set(baseline) & set(candidate)):
+            a, b = baseline[batch_size], candidate[batch_size]
+
+            mw = mann_whitney_u(a, b)
+            p95_ci = bootstrap_diff_ci(
+                a, b, _p95, n_bootstrap=n_bootstrap, confidence=1 - alpha
+            )
+            mean_ci = bootstrap_diff_ci(
+                a, b, _mean, n_bootstrap=n_bootstrap, confidence=1 - alpha
+            )
+
+            throughput_a = batch_size * 1000 / np.mean(a)
+            throughput_b = batch_size * 1000 / np.mean(b)
+            throughput_change = (throughput_b - throughput_a) / throughput_a * 100
+
+            significant = mw["p_value"] < alpha
+            results.append(
+                {
+                    "batch_size": batch_size,
+                    "baseline_p95_ms": float(np.percentile(a, 95)),
+                    "candidate_p95_ms": float(np.percentile(b, 95)),
+                    "p95_diff_ms": p95_ci["diff"],
+                    "p95_ci_low_ms": p95_ci["ci_low"],
+                    "p95_ci_high_ms": p95_ci["ci_high"],
+                    "baseline_throughput": float(throughput_a),
+                    "candidate_throughput": float(throughput_b),
+                    "throughput_change_percent": float(throughput_change),
+                    "mann_whitney_p_value": mw["p_value"],
+                    "prob_candidate_slower": mw["prob_superiority"],
+                    "p95_regression": significant and p95_ci["ci_low"] > 0,
+                    # больше средняя latency = меньше throughput
+                    "throughput_regression": significant and mean_ci["ci_low"] > 0,
+                }
+            )
+
+        return results
+
+
+def main():
+    """CLI: список запусков и сравнение двух запусков"""
+    parser = argparse.ArgumentParser(description="История бенчмарков")
+    parser.add_argument("--db", default=DEFAULT_HISTORY_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = subparsers.add_parser("list", help="Последние запуски")
+    list_parser.add_argument("--source", default=None)
+    list_parser.add_argument("--limit", type=int, default=20)
+
+    compare_parser = subparsers.add_parser("compare", help="Сравнение двух запусков")
+    compare_parser.add_argument("baseline", help="run_id, latest или previous")
+    compare_parser.add_argument("candidate", help="run_id, latest или previous")
+    compare_parser.add_argument("--source", default=None)
+    compare_parser.add_argument("--alpha", type=float, default=0.05)
+    compare_parser.add_argument("--bootstrap", type=int, default=2000)
+
+    args = parser.parse_args()
+    history = BenchmarkHistory(args.db)
+
+    if args.command == "list":
+        for run in history.list_runs(source=args.source, limit=args.limit):
+            print(
+                f"{run['run_id']}  {run['created_at']}  {run['source']:<16} "
+                f"git={run['git_revision']}  ort={run['ort_version']}  "
+                f"hw={run['hardware_id']}"
+            )
+        return
+
+    baseline = history.resolve_run_id(args.baseline, args.source)
+    candidate = history.resolve_run_id(args.candidate, args.source)
+    print(f"Сравнение: {baseline} (база) -> {candidate}\n")
+
+    regressions = 0
+    for row in history.compare(baseline, candidate, args.alpha, args.bootstrap):
+        flags = []
+        if row["p95_regression"]:
+            flags.append("P95 REGRESSION")
+        if row["throughput_regression"]:
+            flags.append("THROUGHPUT REGRESSION")
+        regressions += len(flags)
+
+        print(
+            f"batch_size={row['batch_size']}: "
+            f"p95 {row['baseline_p95_ms']:.2f} -> {row['candidate_p95_ms']:.2f} ms "
+            f"(CI [{row['p95_ci_low_ms']:+.2f}, {row['p95_ci_high_ms']:+.2f}]), "
+            f"throughput {row['throughput_change_percent']:+.1f}%, "
+            f"p={row['mann_whitney_p_value']:.4f} "
+            f"{'❌ ' + ', '.join(flags) if flags else '✅'}"
+        )
+
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ import requests
 from PIL import Image
 from transformers import BlipProcessor
 
+from .benchmark_history import BenchmarkHistory
+
 
 class ONNXModelTester:
     """
@@ -91,8 +93,13 @@ class ONNXModelTester:
             print(f"Детали ошибки: {str(e)}")
             return None
 
-    def benchmark_performance(self, num_runs: int = 100):
-        """Бенчмарк производительности ONNX модели"""
+    def benchmark_performance(self, num_runs: int = 100, history_path: str = None):
+        """
+        Бенчмарк производительности ONNX модели
+
+        Если указан history_path, сырые замеры сохраняются в историю
+        бенчмарков (SQLite) для последующего сравнения запусков.
+        """
         import time
 
         if self.session is None:
@@ -136,12 +143,22 @@ class ONNXModelTester:
         print(f"P95 latency: {p95_latency:.2f} мс")
         print(f"P99 latency: {p99_latency:.2f} мс")
 
+        run_id = None
+        if history_path:
+            run_id = BenchmarkHistory(history_path).record_run(
+                "onnx_tester",
+                {1: latencies},
+                {"onnx_path": self.onnx_path, "num_runs": num_runs},
+            )
+            print(f"Запуск сохранен в историю {history_path}: {run_id}")
+
         return {
             "avg_latency": avg_latency,
             "p50_latency": p50_latency,
             "p95_latency": p95_latency,
             "p99_latency": p99_latency,
             "latencies": latencies,
+            "history_run_id": run_id,
         }
 
 
@@ -155,7 +172,9 @@ def main():
 
     tester.test_inference()
 
-    tester.benchmark_performance(num_runs=50)
+    tester.benchmark_performance(
+        num_runs=50, history_path="results/benchmark_history.db"
+    )
 
     print("\nТестирование ONNX модели завершено!")
 
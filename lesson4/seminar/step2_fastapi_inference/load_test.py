@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import csv
+import math
+import mimetypes
+import os
+import random
+import time
+from collections import Counter
+
+import httpx
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+CDF_PERCENTILES = [50, 75, 90, 95, 99, 99.9, 99.99, 100]
+
+
+class LatencyHistogram:
+    """
+    HDR-подобная гистограмма latency
+
+    Логарифмические корзины с фиксированной относительной точностью:
+    запись O(1), память не зависит от количества запросов.
+    """
+
+    def __init__(
+        self,
+        lowest_ms: float = 0.01,
+        highest_ms: float = 3_600_000.0,
+        significant_digits: int = 2,
+    ):
+        self.lowest_ms = lowest_ms
+        self.highest_ms = highest_ms
+        self._log_base = math.log1p(10.0**-significant_digits)
+        self.counts = np.zeros(self._index(highest_ms) + 1, dtype=np.int64)
+        self.total = 0
+        self.max_ms = 0.0
+
+    def _index(self, value_ms: float) -> int:
+        value_ms = min(max(value_ms, self.lowest_ms), self.highest_ms)
+        return int(math.log(value_ms / self.lowest_ms) / self._log_base)
+
+    def _value(self, index: int) -> float:
+        return self.lowest_ms * math.exp((index + 1) * self._log_base)
+
+    def record(self, value_ms: float):
+        self.counts[self._index(value_ms)] += 1
+        self.total += 1
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, q: float) -> float:
+        """Значение q-го перцентиля (верхняя граница корзины)"""
+        if self.total == 0:
+            return 0.0
+        if q >= 100:
+            return self.max_ms
+
+        rank = max(1, math.ceil(q / 100.0 * self.total))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        return min(self._value(index), self.max_ms)
+
+
+def load_corpus(images_dir: str) -> list[tuple[str, bytes, str]]:
+    """Загрузка локального корпуса изображений в память"""
+    corpus = []
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        with open(os.path.join(images_dir, filename), "rb") as f:
+            content = f.read()
+        mime = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        corpus.append((filename, content, mime))
+
+    if not corpus:
+        raise ValueError(f"В папке {images_dir} нет изображений")
+    return corpus
+
+
+def arrival_offsets(
+    rate_rps: float, duration_s: float, arrival: str, rng: random.Random
+) -> list[float]:
+    """Запланированные моменты отправки запросов (секунды от начала шага)"""
+    offsets = []
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate_rps) if arrival == "poisson" else 1.0 / rate_rps
+        if t >= duration_s:
+            return offsets
+        offsets.append(t)
+
+
+async def run_step(
+    client: httpx.AsyncClient,
+    base_url: str,
+    corpus: list,
+    rate_rps: float,
+    duration_s: float,
+    arrival: str,
+    concurrency: int,
+    rng: random.Random,
+) -> dict:
+    """
+    Один шаг нагрузки с открытой моделью (open-loop)
+
+    Запросы отправляются по расписанию независимо от ответов сервиса.
+    Latency считается от запланированного момента отправки, поэтому
+    ожидание из-за лимита конкурентности или медленного сервиса попадает
+    в статистику (коррекция coordinated omission).
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    latency_hist = LatencyHistogram()
+    service_hist = LatencyHistogram()
+    errors = Counter()
+
+    async def send(intended: float, image: tuple):
+        filename, content, mime = image
+        async with semaphore:
+            sent = loop.time()
+            try:
+                response = await client.post(
+                    f"{base_url}/predict", files={"file": (filename, content, mime)}
+                )
+                if response.status_code != 200:
+                    errors[f"http_{response.status_code}"] += 1
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] += 1
+            done = loop.time()
+
+        latency_hist.record((done - intended) * 1000)
+        service_hist.record((done - sent) * 1000)
+
+    offsets = arrival_offsets(rate_rps, duration_s, arrival, rng)
+    start = loop.time()
+    tasks = []
+    for offset in offsets:
+        intended = start + offset
+        delay = intended - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(intended, rng.choice(corpus))))
+
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    return {
+        "target_rps": rate_rps,
+        "achieved_rps": len(offsets) / elapsed if elapsed > 0 else 0.0,
+        "requests": len(offsets),
+        "errors": sum(errors.values()),
+        "error_breakdown": dict(errors),
+        "latency": latency_hist,
+        "service_time": service_hist,
+    }
+
+
+async def run_sweep(args) -> list[dict]:
+    """Ступенчатое увеличение нагрузки до нарушения SLO по p99"""
+    corpus = load_corpus(args.images_dir)
+    rng = random.Random(args.seed)
+    rates = [float(r) for r in args.rates.split(",")]
+
+    print(f"🔥 Нагрузочный тест {args.base_url}/predict")
+    print(
+        f"Поток: {args.arrival}, шаги: {rates} req/s по {args.duration}s, "
+        f"конкурентность <= {args.concurrency}, SLO p99 <= {args.slo_p99_ms} мс"
+    )
+    print(f"Корпус: {len(corpus)} изображений из {args.images_dir}\n")
+
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    results = []
+    async with httpx.AsyncClient(limits=limits, timeout=args.timeout) as client:
+        for rate in rates:
+            step = await run_step(
+                client,
+                args.base_url,
+                corpus,
+                rate,
+                args.duration,
+                args.arrival,
+                args.concurrency,
+                rng,
+            )
+            results.append(step)
+
+            p99 = step["latency"].percentile(99)
+            print(
+                f"{rate:>7.2f} req/s -> {step['achieved_rps']:.2f} req/s, "
+                f"p50={step['latency'].percentile(50):.0f}ms "
+                f"p95={step['latency'].percentile(95):.0f}ms "
+                f"p99={p99:.0f}ms, ошибок: {step['errors']}/{step['requests']} "
+                f"{'✅' if p99 <= args.slo_p99_ms else '❌'}"
+            )
+
+            if p99 > args.slo_p99_ms and not args.full_sweep:
+                break
+
+    return results
+
+
+def save_results(results: list[dict], output_dir: str):
+    """Сохранение сводки по шагам и CDF latency"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    summary_path = os.path.join(output_dir, "load_test_summary.csv")
+    with open(summary_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "target_rps",
+                "achieved_rps",
+                "requests",
+                "errors",
+                "p50_ms",
+                "p95_ms",
+                "p99_ms",
+                "max_ms",
+                "service_p99_ms",
+                "error_breakdown",
+            ]
+        )
+        for step in results:
+            latency = step["latency"]
+            writer.writerow(
+                [
+                    step["target_rps"],
+                    round(step["achieved_rps"], 3),
+                    step["requests"],
+                    step["errors"],
+                    round(latency.percentile(50), 2),
+                    round(latency.percentile(95), 2),
+                    round(latency.percentile(99), 2),
+                    round(latency.max_ms, 2),
+                    round(step["service_time"].percentile(99), 2),
+                    step["error_breakdown"],
+                ]
+            )
+
+    cdf_path = os.path.join(output_dir, "load_test_cdf.csv")
+    with open(cdf_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["target_rps", "percentile", "latency_ms"])
+        for step in results:
+            for q in CDF_PERCENTILES:
+                writer.writerow(
+                    [step["target_rps"], q, round(step["latency"].percentile(q), 2)]
+                )
+
+    print(f"\n📊 Сводка: {summary_path}")
+    print(f"📈 CDF latency: {cdf_path}")
+
+
+def find_knee(results: list[dict], slo_p99_ms: float):
+    """Последний шаг в рамках SLO и первый шаг, где p99 его нарушает"""
+    last_ok, first_bad = None, None
+    for step in results:
+        if step["latency"].percentile(99) <= slo_p99_ms:
+            last_ok = step["target_rps"]
+        elif first_bad is None:
+            first_bad = step["target_rps"]
+    return last_ok, first_bad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop нагрузочный тест /predict")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--images-dir", default="test_images")
+    parser.add_argument("--rates", default="0.5,1,2,4,8", help="req/s через запятую")
+    parser.add_argument("--duration", type=float, default=30.0, help="секунд на шаг")
+    parser.add_argument("--arrival", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--slo-p99-ms", type=float, default=5000.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output-dir", default="results")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--full-sweep",
+        action="store_true",
+        help="не останавливаться после нарушения SLO",
+    )
+    args = parser.parse_args()
+
+    started = time.time()
+    results = asyncio.run(run_sweep(args))
+    save_results(results, args.output_dir)
+
+    last_ok, first_bad = find_knee(results, args.slo_p99_ms)
+    print(f"\n🎯 Максимальная нагрузка в рамках SLO: {last_ok} req/s")
+    if first_bad is not None:
+        print(f"   p99 нарушает SLO начиная с {first_bad} req/s")
+    print(f"⏱  Длительность теста: {time.time() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
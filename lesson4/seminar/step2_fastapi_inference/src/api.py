@@ -1,11 +1,14 @@
 import io
 import os
+import time
 from typing import List
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import PlainTextResponse
 from PIL import Image
 
 from .model_service import ONNXImageCaptionService
+from .prometheus import REGISTRY, REQUEST_DURATION, REQUESTS_TOTAL
 
 app = FastAPI(
     title="ONNX Image Captioning Service",
@@ -17,6 +20,25 @@ app = FastAPI(
 model_service: ONNXImageCaptionService = None
 
 
+@app.middleware("http")
+async def prometheus_middleware(request: Request, call_next):
+    """Счетчик запросов и гистограмма latency для /metrics/prometheus"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # шаблон пути маршрута, а не сырой URL: ограниченное число меток
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=status)
+        REQUEST_DURATION.observe(
+            time.perf_counter() - start, endpoint=endpoint, method=request.method
+        )
+
+
 @app.on_event("startup")
 async def startup_event():
     """Инициализация при запуске сервиса"""
@@ -161,3 +183,13 @@ async def get_metrics():
         "model_type": "ONNX BLIP",
         "onnx_path": model_service.onnx_path,
     }
+
+
+@app.get("/metrics/prometheus", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """
+    Метрики запросов в текстовом формате Prometheus
+    """
+    return PlainTextResponse(
+        REGISTRY.exposition(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -36,27 +36,17 @@ class ONNXImageCaptionService:
         self.loaded = True
         print("ONNX модель и процессор загружены успешно")
 
-    def preprocess_image(self, image: Image.Image) -> dict:
-        """Предобработка изображения для ONNX модели"""
-
-        if image.mode != "RGB":
-            image = image.convert("RGB")
-
-        inputs = self.processor(image, return_tensors="pt")
-
-        image_input = inputs.pixel_values.numpy()
-
-        token_id = getattr(self.processor.tokenizer, "bos_token_id", None)
-        if token_id is None:
-            token_id = getattr(self.processor.tokenizer, "cls_token_id", 101)
-
-        input_ids = np.array([[token_id] * 16], dtype=np.int64)
-
-        return {"image": image_input, "input_ids": input_ids}
+    def preprocess_images(self, images: list[Image.Image]) -> np.ndarray:
+        """Предобработка списка изображений в один батч для ONNX модели"""
+        rgb_images = [
+            image if image.mode == "RGB" else image.convert("RGB") for image in images
+        ]
+        inputs = self.processor(rgb_images, return_tensors="pt")
+        return inputs.pixel_values.numpy()
 
     def predict(self, image: Image.Image) -> dict:
         """
-        Выполнение ONNX инференса для одного изображения
+        Выполнение ONNX инференса для одного изображения (батч из одного)
 
         Args:
             image: PIL изображение
@@ -64,133 +54,187 @@ class ONNXImageCaptionService:
         Returns:
             dict с результатами инференса
         """
-        if not self.loaded:
-            raise ValueError("Модель не загружена. Вызовите load_model() сначала.")
-
-        start_time = time.time()
-
-        preprocess_start = time.time()
-        onnx_inputs = self.preprocess_image(image)
-        preprocess_time = time.time() - preprocess_start
+        results, _ = self.predict_batch([image])
+        result = results[0]
+        del result["batch_index"]
+        return result
 
-        inference_start = time.time()
-        try:
+    def predict_batch(self, images: list[Image.Image]) -> tuple[list[dict], dict]:
+        """
+        Batch инференс: все изображения генерируются вместе через generate_batch,
+        один session.run на шаг генерации для всего батча
 
-            caption = self._iterative_generation(onnx_inputs["image"], max_tokens=10)
-            inference_time = time.time() - inference_start
+        Args:
+            images: Список PIL изображений
 
-            postprocess_start = time.time()
-            if caption is None:
-                caption = "Failed to generate caption"
-                success = False
-            else:
-                success = True
-            postprocess_time = time.time() - postprocess_start
+        Returns:
+            Tuple из списка результатов и статистики батча
+        """
+        if not self.loaded:
+            raise ValueError("Модель не загружена. Вызовите load_model() сначала.")
 
+        batch_size = len(images)
+        batch_start = time.perf_counter()
+        error = None
+        try:
+            captions, timing = (
+                self.generate_batch(images, max_tokens=10)
+                if images
+                else ([], {"preprocess_ms": 0, "inference_ms": 0, "decode_ms": 0})
+            )
         except Exception as e:
-            inference_time = time.time() - inference_start
-            postprocess_time = 0
-            caption = f"ONNX inference error: {str(e)[:100]}"
-            success = False
-
-        total_time = time.time() - start_time
-
-        return {
-            "prediction": caption,
-            "image_size": list(image.size),
-            "model_type": "ONNX BLIP",
-            "success": success,
-            "timing": {
-                "total_ms": total_time * 1000,
-                "preprocess_ms": preprocess_time * 1000,
-                "inference_ms": inference_time * 1000,
-                "postprocess_ms": postprocess_time * 1000,
-            },
-            "onnx_details": {},
+            captions = [None] * batch_size
+            timing = {
+                "preprocess_ms": 0,
+                "inference_ms": (time.perf_counter() - batch_start) * 1000,
+                "decode_ms": 0,
+            }
+            error = f"ONNX inference error: {str(e)[:100]}"
+
+        batch_time = time.perf_counter() - batch_start
+
+        # время батча делится поровну между изображениями
+        share = 1 / batch_size if batch_size else 0
+        results = []
+        for i, (image, caption) in enumerate(zip(images, captions)):
+            success = caption is not None
+            results.append(
+                {
+                    "prediction": (
+                        caption if success else error or "Failed to generate caption"
+                    ),
+                    "image_size": list(image.size),
+                    "model_type": "ONNX BLIP",
+                    "success": success,
+                    "timing": {
+                        "total_ms": batch_time * 1000 * share,
+                        "preprocess_ms": timing["preprocess_ms"] * share,
+                        "inference_ms": timing["inference_ms"] * share,
+                        "postprocess_ms": timing["decode_ms"] * share,
+                    },
+                    "onnx_details": {"batch_size": batch_size},
+                    "batch_index": i,
+                }
+            )
+
+        successful_requests = sum(1 for r in results if r["success"])
+
+        batch_stats = {
+            "batch_size": batch_size,
+            "successful_requests": successful_requests,
+            "failed_requests": batch_size - successful_requests,
+            "total_batch_time_ms": batch_time * 1000,
+            "avg_time_per_image_ms": batch_time * 1000 * share,
+            "total_inference_time_ms": timing["inference_ms"],
         }
 
-    def predict_batch(self, images: list[Image.Image]) -> tuple[list[dict], dict]:
+        return results, batch_stats
+
+    def generate_batch(
+        self, images: list[Image.Image], max_tokens: int = 10
+    ) -> tuple[list[Optional[str]], dict]:
         """
-        Batch инференс (выполняется последовательно для ONNX)
+        Генерация описаний для батча изображений одним проходом модели на шаг
 
         Args:
             images: Список PIL изображений
+            max_tokens: Максимальное количество генерируемых токенов
 
         Returns:
-            Tuple из списка результатов и статистики батча
+            Tuple из списка описаний и времени по этапам
         """
-        results = []
+        if not self.loaded:
+            raise ValueError("Модель не загружена. Вызовите load_model() сначала.")
 
-        batch_start = time.time()
-        for i, image in enumerate(images):
-            result = self.predict(image)
-            result["batch_index"] = i
-            results.append(result)
+        start_time = time.perf_counter()
 
-        batch_time = time.time() - batch_start
+        image_input = self.preprocess_images(images)
+        preprocess_time = time.perf_counter() - start_time
 
-        successful_requests = sum(1 for r in results if r.get("success", False))
+        inference_start = time.perf_counter()
+        generated, step_times = self._iterative_generation_batch(
+            image_input, max_tokens=max_tokens
+        )
+        inference_time = time.perf_counter() - inference_start
 
-        batch_stats = {
+        decode_start = time.perf_counter()
+        captions = [
+            (
+                self.processor.tokenizer.decode(tokens, skip_special_tokens=True)
+                if tokens
+                else None
+            )
+            for tokens in generated
+        ]
+        decode_time = time.perf_counter() - decode_start
+
+        total_time = time.perf_counter() - start_time
+
+        timing = {
             "batch_size": len(images),
-            "successful_requests": successful_requests,
-            "failed_requests": len(images) - successful_requests,
-            "total_batch_time_ms": batch_time * 1000,
-            "avg_time_per_image_ms": batch_time * 1000 / len(images) if images else 0,
-            "total_inference_time_ms": sum(
-                r["timing"]["inference_ms"] for r in results
-            ),
+            "total_ms": total_time * 1000,
+            "preprocess_ms": preprocess_time * 1000,
+            "inference_ms": inference_time * 1000,
+            "decode_ms": decode_time * 1000,
+            "steps": len(step_times),
+            "step_ms": [t * 1000 for t in step_times],
+            "tokens_generated": sum(len(tokens) for tokens in generated),
         }
 
-        return results, batch_stats
+        return captions, timing
 
-    def _iterative_generation(
+    def _iterative_generation_batch(
         self, image_input: np.ndarray, max_tokens: int = 10
-    ) -> str:
+    ) -> tuple[list[list[int]], list[float]]:
         """
-        Итеративная генерация текста с ONNX моделью
+        Итеративная генерация текста для батча: один session.run на шаг
         """
 
         token_id = getattr(self.processor.tokenizer, "bos_token_id", None)
         if token_id is None:
             token_id = getattr(self.processor.tokenizer, "cls_token_id", 101)
 
-        current_tokens = [token_id]
-        generated_tokens = []
+        batch_size = image_input.shape[0]
+        current_tokens = [[token_id] for _ in range(batch_size)]
+        generated_tokens: list[list[int]] = [[] for _ in range(batch_size)]
+        finished = [False] * batch_size
+        step_times = []
 
         for step in range(max_tokens):
-
-            if len(current_tokens) < 16:
-                input_ids = current_tokens + [token_id] * (16 - len(current_tokens))
-            else:
-                input_ids = current_tokens[-16:]
-
-            input_ids_array = np.array([input_ids], dtype=np.int64)
-
-            onnx_inputs = {"image": image_input, "input_ids": input_ids_array}
-
+            input_ids = []
+            for tokens in current_tokens:
+                if len(tokens) < 16:
+                    input_ids.append(tokens + [token_id] * (16 - len(tokens)))
+                else:
+                    input_ids.append(tokens[-16:])
+
+            onnx_inputs = {
+                "image": image_input,
+                "input_ids": np.array(input_ids, dtype=np.int64),
+            }
+
+            step_start = time.perf_counter()
             try:
-                outputs = self.session.run(None, onnx_inputs)
-                logits = outputs[0]
+                logits = self.session.run(None, onnx_inputs)[0]
+            except Exception:
+                break
+            step_times.append(time.perf_counter() - step_start)
+
+            for i, tokens in enumerate(current_tokens):
+                if finished[i]:
+                    continue
 
-                pos = len(current_tokens) - 1 if len(current_tokens) <= 16 else 15
-                last_token_logits = logits[0, pos, :]
-                predicted_id = int(np.argmax(last_token_logits))
+                pos = len(tokens) - 1 if len(tokens) <= 16 else 15
+                predicted_id = int(np.argmax(logits[i, pos, :]))
 
                 if predicted_id == 102:
-                    break
+                    finished[i] = True
+                    continue
 
-                current_tokens.append(predicted_id)
-                generated_tokens.append(predicted_id)
+                tokens.append(predicted_id)
+                generated_tokens[i].append(predicted_id)
 
-            except Exception:
+            if all(finished):
                 break
 
-        if generated_tokens:
-            try:
-                return self.processor.tokenizer.decode(
-                    generated_tokens, skip_special_tokens=True
-                )
-            except Exception:
-                return None
-        return None
+        return generated_tokens, step_times
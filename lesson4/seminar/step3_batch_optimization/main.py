@@ -38,13 +38,49 @@ def main():
     results_full.to_csv("results/optimization_results.csv", index=False)
     print("\n📊 Результаты сохранены: results/optimization_results.csv")
 
+    optimizer.record_history(params={"max_batch_size": 8, "num_iterations": 40})
+
     optimizer.plot_results(results_full, "results/batch_optimization.png")
 
+    print("\n" + "=" * 50)
+    print("3. Симуляция очереди (end-to-end latency с учетом ожидания)")
+
+    best_policy, simulation_df = optimizer.simulate_batching_policies(
+        arrival_rate_rps=2.0, num_requests=2000, target_p95_ms=5000
+    )
+
+    simulation_df.to_csv("results/queueing_simulation.csv", index=False)
+    print("\n📊 Результаты симуляции сохранены: results/queueing_simulation.csv")
+
+    print("\n" + "=" * 50)
+    print("4. End-to-end генерация на реальных изображениях")
+
+    optimal_batch_e2e = None
+    try:
+        optimal_batch_e2e, results_e2e = optimizer.find_optimal_generation_batch_size(
+            max_batch_size=4, num_iterations=5
+        )
+        results_e2e.to_csv("results/generation_results.csv", index=False)
+        print("\n📊 Результаты E2E сохранены: results/generation_results.csv")
+        optimizer.record_history(mode="generation", params={"max_batch_size": 4})
+    except (FileNotFoundError, ValueError) as e:
+        print(f"⚠️ E2E бенчмарк пропущен: {e}")
+
     print("\n" + "=" * 50)
     print("🎯 ИТОГОВЫЕ РЕКОМЕНДАЦИИ")
     print("=" * 50)
     print(f"Быстрый тест - оптимальный batch_size: {optimal_batch_quick}")
     print(f"Полный тест - оптимальный batch_size: {optimal_batch_full}")
+    if optimal_batch_e2e is not None:
+        print(f"E2E генерация - оптимальный batch_size: {optimal_batch_e2e}")
+
+    if best_policy is not None:
+        print(
+            f"Политика батчинга для 2 req/s: "
+            f"max_batch_size={int(best_policy['max_batch_size'])}, "
+            f"max_wait_ms={best_policy['max_wait_ms']:.0f} "
+            f"(p95 e2e={best_policy['p95_e2e_ms']:.1f}ms)"
+        )
 
     print("\nТоп-3 размера батча по p95 latency per sample:")
     top_batches = results_full.nsmallest(3, "p95_latency_per_sample_ms")
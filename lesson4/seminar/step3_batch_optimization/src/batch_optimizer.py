@@ -1,6 +1,6 @@
 import os
 import time
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import matplotlib.pyplot as plt
 import numpy as np
@@ -9,6 +9,14 @@ import pandas as pd
 import psutil
 from transformers import BlipProcessor
 
+from .benchmark_history import DEFAULT_HISTORY_PATH, BenchmarkHistory
+from .queue_simulator import QueueSimulator
+from .service_loader import (
+    DEFAULT_STEP2_DIR,
+    load_caption_service_class,
+    load_image_corpus,
+)
+
 
 class BatchOptimizer:
     """
@@ -23,6 +31,9 @@ class BatchOptimizer:
         self.session: Optional[ort.InferenceSession] = None
         self.processor: Optional[BlipProcessor] = None
         self.loaded = False
+        self.service_times_ms: Dict[int, List[float]] = {}
+        self.generation_times_ms: Dict[int, List[float]] = {}
+        self.caption_service = None
 
     def load_model(self):
         """Загрузка ONNX модели"""
@@ -77,7 +88,6 @@ class BatchOptimizer:
         memory_usage = []
 
         for i in range(num_iterations):
-
             process = psutil.Process()
             memory_before = process.memory_info().rss / 1024 / 1024
 
@@ -170,6 +180,7 @@ class BatchOptimizer:
             result = self.benchmark_batch_size(batch_size, num_iterations)
 
             if result["success"]:
+                self.service_times_ms[batch_size] = result["raw_data"]["latencies_ms"]
                 results.append(
                     {
                         "batch_size": batch_size,
@@ -230,6 +241,335 @@ class BatchOptimizer:
 
         return optimal_batch_size, df
 
+    def load_generation_service(self, step2_dir: str = DEFAULT_STEP2_DIR):
+        """Подключение реального пути генерации ONNXImageCaptionService из step2"""
+        if not self.loaded:
+            raise ValueError("Модель не загружена")
+
+        service_cls = load_caption_service_class(step2_dir)
+        service = service_cls(self.onnx_path, model_name=self.model_name)
+        service.session = self.session
+        service.processor = self.processor
+        service.loaded = True
+
+        self.caption_service = service
+        print(f"Подключен сервис генерации из {step2_dir}")
+
+    def benchmark_generation(
+        self,
+        batch_size: int,
+        images: List,
+        num_iterations: int = 10,
+        max_tokens: int = 10,
+    ) -> Dict:
+        """
+        End-to-end бенчмарк генерации для конкретного размера батча
+
+        Каждая итерация проходит полный путь сервиса: предобработка,
+        до max_tokens последовательных session.run и детокенизация.
+
+        Args:
+            batch_size: Размер батча для тестирования
+            images: Корпус реальных изображений
+            num_iterations: Количество итераций для статистики
+            max_tokens: Максимальное количество генерируемых токенов
+
+        Returns:
+            Словарь с метриками по этапам и на токен
+        """
+        if self.caption_service is None:
+            raise ValueError(
+                "Сервис генерации не подключен. Вызовите load_generation_service()"
+            )
+
+        print(f"E2E генерация batch_size={batch_size}, итераций={num_iterations}")
+
+        def make_batch(offset: int) -> List:
+            return [images[(offset + k) % len(images)] for k in range(batch_size)]
+
+        try:
+            for i in range(2):
+                self.caption_service.generate_batch(
+                    make_batch(i * batch_size), max_tokens=max_tokens
+                )
+        except Exception as e:
+            return {"batch_size": batch_size, "error": str(e), "success": False}
+
+        timings = []
+        for i in range(num_iterations):
+            try:
+                _, timing = self.caption_service.generate_batch(
+                    make_batch(i * batch_size), max_tokens=max_tokens
+                )
+            except Exception as e:
+                return {"batch_size": batch_size, "error": str(e), "success": False}
+            timings.append(timing)
+
+        total = np.array([t["total_ms"] for t in timings])
+        preprocess = np.array([t["preprocess_ms"] for t in timings])
+        inference = np.array([t["inference_ms"] for t in timings])
+        decode = np.array([t["decode_ms"] for t in timings])
+        step_ms = np.array([ms for t in timings for ms in t["step_ms"]])
+        tokens = np.array([t["tokens_generated"] for t in timings])
+
+        return {
+            "batch_size": batch_size,
+            "success": True,
+            "total_latency": {
+                "mean_ms": np.mean(total),
+                "p50_ms": np.percentile(total, 50),
+                "p95_ms": np.percentile(total, 95),
+                "p99_ms": np.percentile(total, 99),
+            },
+            "per_sample_latency": {
+                "mean_ms": np.mean(total) / batch_size,
+                "p95_ms": np.percentile(total, 95) / batch_size,
+            },
+            "stages": {
+                "preprocess_mean_ms": np.mean(preprocess),
+                "inference_mean_ms": np.mean(inference),
+                "decode_mean_ms": np.mean(decode),
+                "preprocess_p95_ms": np.percentile(preprocess, 95),
+                "inference_p95_ms": np.percentile(inference, 95),
+                "decode_p95_ms": np.percentile(decode, 95),
+            },
+            "per_token": {
+                "step_mean_ms": np.mean(step_ms) if step_ms.size else 0.0,
+                "step_p95_ms": np.percentile(step_ms, 95) if step_ms.size else 0.0,
+                "tokens_per_sample": np.mean(tokens) / batch_size,
+                "ms_per_token": np.sum(inference) / max(1, np.sum(tokens)),
+            },
+            "throughput": {"samples_per_second": batch_size * 1000 / np.mean(total)},
+            "raw_data": {"latencies_ms": total.tolist()},
+        }
+
+    def find_optimal_generation_batch_size(
+        self,
+        images_dir: str = os.path.join(DEFAULT_STEP2_DIR, "test_images"),
+        max_batch_size: int = 8,
+        num_iterations: int = 10,
+        max_tokens: int = 10,
+        target_p95_ms: Optional[float] = None,
+    ) -> Tuple[int, pd.DataFrame]:
+        """
+        Поиск оптимального размера батча по end-to-end latency генерации
+
+        Args:
+            images_dir: Папка с локальным корпусом изображений
+            max_batch_size: Максимальный размер батча для тестирования
+            num_iterations: Количество итераций для каждого размера
+            max_tokens: Максимальное количество генерируемых токенов
+            target_p95_ms: Ограничение на p95 latency всего запроса (мс),
+                именно столько ждет клиент, чей запрос попал в батч
+
+        Returns:
+            Оптимальный размер батча и DataFrame с результатами
+        """
+        print("=== Поиск оптимального размера батча (E2E генерация) ===\n")
+
+        if self.caption_service is None:
+            self.load_generation_service()
+
+        images = load_image_corpus(images_dir)
+        print(f"Корпус изображений: {len(images)} из {images_dir}")
+
+        batch_sizes = sorted(
+            {1} | {2**i for i in range(int(np.log2(max_batch_size)) + 1)}
+        )
+        print(f"Тестируемые размеры батчей: {batch_sizes}")
+
+        results = []
+        for batch_size in batch_sizes:
+            result = self.benchmark_generation(
+                batch_size, images, num_iterations, max_tokens
+            )
+
+            if not result["success"]:
+                print(f"❌ batch_size={batch_size}: {result['error']}")
+                continue
+
+            self.generation_times_ms[batch_size] = result["raw_data"]["latencies_ms"]
+
+            results.append(
+                {
+                    "batch_size": batch_size,
+                    "p95_e2e_total_ms": result["total_latency"]["p95_ms"],
+                    "p99_e2e_total_ms": result["total_latency"]["p99_ms"],
+                    "p95_e2e_per_sample_ms": result["per_sample_latency"]["p95_ms"],
+                    "preprocess_mean_ms": result["stages"]["preprocess_mean_ms"],
+                    "inference_mean_ms": result["stages"]["inference_mean_ms"],
+                    "decode_mean_ms": result["stages"]["decode_mean_ms"],
+                    "step_mean_ms": result["per_token"]["step_mean_ms"],
+                    "ms_per_token": result["per_token"]["ms_per_token"],
+                    "tokens_per_sample": result["per_token"]["tokens_per_sample"],
+                    "throughput_samples_per_sec": result["throughput"][
+                        "samples_per_second"
+                    ],
+                }
+            )
+            print(
+                f"✅ batch_size={batch_size}: "
+                f"p95 запроса={result['total_latency']['p95_ms']:.1f}ms, "
+                f"preprocess={result['stages']['preprocess_mean_ms']:.1f}ms, "
+                f"inference={result['stages']['inference_mean_ms']:.1f}ms, "
+                f"decode={result['stages']['decode_mean_ms']:.1f}ms, "
+                f"{result['per_token']['ms_per_token']:.1f}ms/token"
+            )
+
+        if not results:
+            raise ValueError("Ни один размер батча не прошел тестирование")
+
+        df = pd.DataFrame(results)
+
+        valid_df = df
+        if target_p95_ms:
+            valid_df = df[df["p95_e2e_total_ms"] <= target_p95_ms]
+            print(f"\nПрименено ограничение на p95 запроса: <= {target_p95_ms} ms")
+
+        if valid_df.empty:
+            print("⚠️ Ни один размер батча не удовлетворяет ограничениям")
+            valid_df = df
+
+        optimal_idx = valid_df["p95_e2e_per_sample_ms"].idxmin()
+        optimal_batch_size = int(valid_df.loc[optimal_idx, "batch_size"])
+
+        print(f"\n🎯 Оптимальный размер батча (E2E): {optimal_batch_size}")
+        print(f"   p95 запроса: {valid_df.loc[optimal_idx, 'p95_e2e_total_ms']:.1f} ms")
+
+        return optimal_batch_size, df
+
+    def record_history(
+        self,
+        db_path: str = DEFAULT_HISTORY_PATH,
+        mode: str = "forward",
+        params: Optional[Dict] = None,
+    ) -> str:
+        """
+        Сохранение сырых замеров последнего бенчмарка в историю
+
+        Args:
+            db_path: Путь к SQLite базе истории
+            mode: "forward" (find_optimal_batch_size) или "generation"
+                (find_optimal_generation_batch_size)
+            params: Параметры запуска для сохранения
+
+        Returns:
+            Идентификатор запуска в истории
+        """
+        latencies = (
+            self.generation_times_ms if mode == "generation" else self.service_times_ms
+        )
+        if not latencies:
+            raise ValueError(f"Нет замеров для режима {mode}")
+
+        run_params = {"onnx_path": self.onnx_path, "model_name": self.model_name}
+        run_params.update(params or {})
+
+        run_id = BenchmarkHistory(db_path).record_run(
+            f"batch_optimizer_{mode}", latencies, run_params
+        )
+        print(f"Запуск сохранен в историю {db_path}: {run_id}")
+        return run_id
+
+    def simulate_batching_policies(
+        self,
+        arrival_rate_rps: Optional[float] = None,
+        trace_path: Optional[str] = None,
+        max_wait_ms_options: Tuple[float, ...] = (0, 10, 50, 100, 250),
+        num_requests: int = 5000,
+        num_workers: int = 1,
+        target_p95_ms: Optional[float] = None,
+        mode: Optional[str] = None,
+    ) -> Tuple[Optional[Dict], pd.DataFrame]:
+        """
+        Симуляция очереди для подбора параметров батчинга под поток запросов
+
+        Прогоняет пуассоновский или записанный поток запросов через замеры
+        latency батча. Реальный запрос проходит весь цикл генерации, поэтому
+        по умолчанию используются замеры find_optimal_generation_batch_size,
+        если они есть; одиночный session.run из find_optimal_batch_size
+        занижает время обслуживания.
+
+        Args:
+            arrival_rate_rps: Интенсивность пуассоновского потока (запросов/сек)
+            trace_path: CSV с записанным потоком (колонка timestamp, секунды)
+            max_wait_ms_options: Варианты времени ожидания набора батча
+            num_requests: Количество запросов для пуассоновского потока
+            num_workers: Количество реплик, обрабатывающих очередь
+            target_p95_ms: Целевое end-to-end p95 latency
+            mode: "generation" (find_optimal_generation_batch_size) или
+                "forward" (find_optimal_batch_size); по умолчанию generation,
+                если есть его замеры
+
+        Returns:
+            Лучшая политика (или None) и DataFrame со всеми политиками
+        """
+        if mode is None:
+            mode = "generation" if self.generation_times_ms else "forward"
+        if mode not in ("forward", "generation"):
+            raise ValueError(f"Неизвестный режим: {mode}")
+        service_times_ms = (
+            self.generation_times_ms if mode == "generation" else self.service_times_ms
+        )
+        if not service_times_ms:
+            benchmark = (
+                "find_optimal_generation_batch_size"
+                if mode == "generation"
+                else "find_optimal_batch_size"
+            )
+            raise ValueError(
+                f"Нет замеров latency для режима {mode}. "
+                f"Вызовите {benchmark}() сначала."
+            )
+        if arrival_rate_rps is None and trace_path is None:
+            raise ValueError("Нужно указать arrival_rate_rps или trace_path")
+
+        simulator = QueueSimulator(service_times_ms, num_workers=num_workers)
+
+        if trace_path is not None:
+            arrivals_ms = simulator.load_trace(trace_path)
+            print(f"=== Симуляция очереди по трассе {trace_path} ===")
+        else:
+            arrivals_ms = simulator.poisson_arrivals(arrival_rate_rps, num_requests)
+            print(f"=== Симуляция очереди: Poisson {arrival_rate_rps} req/s ===")
+
+        print(
+            f"Запросов: {len(arrivals_ms)}, реплик: {num_workers}, "
+            f"время обслуживания: {mode}"
+        )
+
+        df = pd.DataFrame(
+            simulator.sweep_policies(
+                arrivals_ms, simulator.batch_sizes, list(max_wait_ms_options)
+            )
+        )
+
+        for _, row in df.iterrows():
+            print(
+                f"  max_batch={int(row['max_batch_size'])}, "
+                f"max_wait={row['max_wait_ms']:.0f}ms: "
+                f"p50={row['p50_e2e_ms']:.1f}ms, p95={row['p95_e2e_ms']:.1f}ms, "
+                f"p99={row['p99_e2e_ms']:.1f}ms, util={row['utilization']:.2f}"
+                + ("" if row["stable"] else " (очередь растет)")
+            )
+
+        valid_df = df[df["stable"]]
+        if target_p95_ms:
+            valid_df = valid_df[valid_df["p95_e2e_ms"] <= target_p95_ms]
+
+        if valid_df.empty:
+            print("⚠️ Ни одна политика не удовлетворяет ограничениям")
+            return None, df
+
+        best = valid_df.loc[valid_df["p95_e2e_ms"].idxmin()].to_dict()
+        print(
+            f"\n🎯 Лучшая политика: max_batch_size={int(best['max_batch_size'])}, "
+            f"max_wait_ms={best['max_wait_ms']:.0f}, "
+            f"p95={best['p95_e2e_ms']:.1f}ms"
+        )
+
+        return best, df
+
     def plot_results(
         self, df: pd.DataFrame, save_path: str = "results/batch_optimization.png"
     ):
@@ -294,6 +634,8 @@ def main():
     results_df.to_csv("results/optimization_results.csv", index=False)
     print("Результаты сохранены: results/optimization_results.csv")
 
+    optimizer.record_history(params={"max_batch_size": 8, "num_iterations": 30})
+
     optimizer.plot_results(results_df)
 
     print(f"\n✅ Оптимизация завершена. Рекомендуемый batch_size: {optimal_batch_size}")
@@ -0,0 +1,183 @@
+import csv
+from typing import Dict, List
+
+import numpy as np
+
+# Очередь считается растущей, если среднее ожидание в последней четверти
+# запросов больше WAIT_GROWTH_FACTOR * ожидание во второй четверти (первая —
+# прогрев) плюс запас на разброс: max_wait_ms и среднее время батча
+WAIT_GROWTH_FACTOR = 1.5
+# В коротких потоках (меньше MIN_REQUESTS_FOR_TREND запросов) тренда нет:
+# устойчиво, если к приходу последнего запроса в очереди остается не больше
+# одного батча на реплику
+MIN_REQUESTS_FOR_TREND = 8
+
+
+class QueueSimulator:
+    """
+    Дискретно-событийная симуляция очереди запросов с динамическим батчингом.
+
+    Время обслуживания батча берется из замеренных latency для каждого
+    размера батча, поэтому результат учитывает и ожидание в очереди,
+    и ожидание набора батча, и сам инференс.
+    """
+
+    def __init__(
+        self,
+        service_times_ms: Dict[int, List[float]],
+        num_workers: int = 1,
+        seed: int = 42,
+    ):
+        if not service_times_ms:
+            raise ValueError("Нет замеров времени обслуживания")
+
+        self.service_times_ms = {
+            int(bs): np.asarray(times, dtype=np.float64)
+            for bs, times in service_times_ms.items()
+            if len(times) > 0
+        }
+        self.batch_sizes = sorted(self.service_times_ms)
+        self.num_workers = num_workers
+        self.rng = np.random.default_rng(seed)
+
+    def poisson_arrivals(self, rate_rps: float, num_requests: int) -> np.ndarray:
+        """Пуассоновский поток запросов, моменты прихода в мс"""
+        if rate_rps <= 0:
+            raise ValueError("rate_rps должен быть положительным")
+
+        gaps_ms = self.rng.exponential(1000.0 / rate_rps, size=num_requests)
+        return np.cumsum(gaps_ms)
+
+    @staticmethod
+    def load_trace(path: str, column: str = "timestamp") -> np.ndarray:
+        """
+        Загрузка записанного потока запросов из CSV
+
+        Ожидается колонка с временем прихода запроса в секундах
+        (unix time или относительное время).
+        """
+        with open(path, newline="", encoding="utf-8") as fp:
+            reader = csv.DictReader(fp)
+            timestamps = [float(row[column]) for row in reader if row.get(column)]
+
+        if not timestamps:
+            raise ValueError(f"Трасса {path} не содержит запросов")
+
+        arrivals = np.sort(np.asarray(timestamps, dtype=np.float64))
+        return (arrivals - arrivals[0]) * 1000.0
+
+    def sample_service_time(self, batch_size: int) -> float:
+        """Случайное время обработки батча по замеренному распределению"""
+        idx = np.searchsorted(self.batch_sizes, batch_size)
+        if idx < len(self.batch_sizes):
+            measured = self.batch_sizes[idx]
+            scale = 1.0
+        else:
+            measured = self.batch_sizes[-1]
+            scale = batch_size / measured
+
+        samples = self.service_times_ms[measured]
+        return float(samples[self.rng.integers(len(samples))]) * scale
+
+    def simulate(
+        self, arrivals_ms: np.ndarray, max_batch_size: int, max_wait_ms: float
+    ) -> Dict:
+        """
+        Прогон потока запросов через политику батчинга
+
+        Args:
+            arrivals_ms: Отсортированные моменты прихода запросов (мс)
+            max_batch_size: Максимальный размер батча
+            max_wait_ms: Сколько ждать набора батча после прихода первого запроса
+
+        Returns:
+            Словарь с end-to-end метриками
+        """
+        arrivals = np.asarray(arrivals_ms, dtype=np.float64)
+        n = len(arrivals)
+        if n == 0:
+            raise ValueError("Пустой поток запросов")
+
+        worker_free = np.zeros(self.num_workers)
+        latencies = np.empty(n)
+        queue_waits = np.empty(n)
+        batch_sizes = []
+        service_times = []
+        busy_ms = 0.0
+
+        i = 0
+        while i < n:
+            w = int(np.argmin(worker_free))
+            first = arrivals[i]
+            start = max(worker_free[w], first)
+            deadline = first + max_wait_ms
+
+            arrived = int(np.searchsorted(arrivals, start, side="right"))
+            if arrived - i >= max_batch_size or start >= deadline:
+                dispatch = start
+            else:
+                fill_idx = i + max_batch_size - 1
+                fill_time = arrivals[fill_idx] if fill_idx < n else np.inf
+                dispatch = min(deadline, fill_time)
+                arrived = int(np.searchsorted(arrivals, dispatch, side="right"))
+
+            size = min(arrived - i, max_batch_size)
+            service = self.sample_service_time(size)
+            finish = dispatch + service
+
+            latencies[i : i + size] = finish - arrivals[i : i + size]
+            queue_waits[i : i + size] = dispatch - arrivals[i : i + size]
+            worker_free[w] = finish
+            batch_sizes.append(size)
+            service_times.append(service)
+            busy_ms += service
+            i += size
+
+        makespan = max(float(worker_free.max()) - float(arrivals[0]), 1e-9)
+        offered_rps = n * 1000.0 / max(float(arrivals[-1] - arrivals[0]), 1e-9)
+        achieved_rps = n * 1000.0 / makespan
+
+        # utilization ограничена 1.0 и не отличает перегрузку от границы
+        # устойчивости, поэтому устойчивость определяется по росту ожидания
+        if n >= MIN_REQUESTS_FOR_TREND:
+            quarters = np.array_split(queue_waits, 4)
+            early_wait = float(np.mean(quarters[1]))
+            late_wait = float(np.mean(quarters[3]))
+            slack = max_wait_ms + float(np.mean(service_times))
+            wait_growth_ms = late_wait - early_wait
+            stable = late_wait <= WAIT_GROWTH_FACTOR * early_wait + slack
+        else:
+            wait_growth_ms = 0.0
+            backlog = int(np.sum(arrivals + queue_waits > arrivals[-1]))
+            stable = backlog <= max_batch_size * self.num_workers
+
+        return {
+            "max_batch_size": max_batch_size,
+            "max_wait_ms": max_wait_ms,
+            "num_workers": self.num_workers,
+            "requests": n,
+            "offered_rps": offered_rps,
+            "achieved_rps": achieved_rps,
+            "p50_e2e_ms": float(np.percentile(latencies, 50)),
+            "p95_e2e_ms": float(np.percentile(latencies, 95)),
+            "p99_e2e_ms": float(np.percentile(latencies, 99)),
+            "mean_e2e_ms": float(np.mean(latencies)),
+            "mean_queue_wait_ms": float(np.mean(queue_waits)),
+            "mean_batch_size": float(np.mean(batch_sizes)),
+            "utilization": busy_ms / (self.num_workers * makespan),
+            "wait_growth_ms": wait_growth_ms,
+            "stable": bool(stable),
+        }
+
+    def sweep_policies(
+        self,
+        arrivals_ms: np.ndarray,
+        max_batch_sizes: List[int],
+        max_wait_ms_options: List[float],
+    ) -> List[Dict]:
+        """Симуляция всех комбинаций (max_batch_size, max_wait_ms)"""
+        results = []
+        for max_batch_size in max_batch_sizes:
+            for max_wait_ms in max_wait_ms_options:
+                results.append(self.simulate(arrivals_ms, max_batch_size, max_wait_ms))
+        return results
@@ -0,0 +1,43 @@
+import importlib.util
+import os
+from typing import List
+
+from PIL import Image
+
+DEFAULT_STEP2_DIR = os.path.join("..", "step2_fastapi_inference")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def load_caption_service_class(step2_dir: str = DEFAULT_STEP2_DIR):
+    """
+    Загрузка класса ONNXImageCaptionService из step2
+
+    Оба шага используют пакет `src`, поэтому модуль загружается по пути
+    файла, а не через обычный import.
+    """
+    module_path = os.path.join(step2_dir, "src", "model_service.py")
+    if not os.path.exists(module_path):
+        raise FileNotFoundError(f"Сервис из step2 не найден: {module_path}")
+
+    spec = importlib.util.spec_from_file_location("step2_model_service", module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ONNXImageCaptionService
+
+
+def load_image_corpus(images_dir: str) -> List[Image.Image]:
+    """Загрузка локального корпуса изображений для бенчмарка"""
+    if not os.path.isdir(images_dir):
+        raise FileNotFoundError(f"Папка с изображениями не найдена: {images_dir}")
+
+    images = []
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        with Image.open(os.path.join(images_dir, filename)) as image:
+            images.append(image.convert("RGB"))
+
+    if not images:
+        raise ValueError(f"В папке {images_dir} нет изображений")
+
+    return images
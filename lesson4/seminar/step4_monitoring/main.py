@@ -3,21 +3,65 @@
 #   1) Запусти FastAPI сервис из шага 2 (uvicorn ...).
 #   2) В отдельном терминале запусти мониторинг:
 #        python main.py --config config/monitoring_config.yaml
+#   Прогон детектора аномалий по истории:
+#        python main.py --replay logs/metrics.jsonl
+#   Нагрузочная проба (capacity check канарейки):
+#        python main.py --load --rps 5 --duration 60 --target replica-1
 #
-# Зависимости: requests, pyyaml, colorama (необязательно)
+# Зависимости: httpx, pyyaml, colorama (необязательно)
 
 import argparse
+from dataclasses import replace as dc_replace
 
+from src.anomaly import replay
 from src.config import load_config
+from src.load_probe import run_load
 from src.monitor import run_monitor
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", default="config/monitoring_config.yaml")
+    parser.add_argument(
+        "--replay", default=None, help="metrics.jsonl for offline anomaly detection"
+    )
+    parser.add_argument("--load", action="store_true", help="run a load probe")
+    parser.add_argument("--rps", type=float, default=None, help="load probe rate")
+    parser.add_argument("--duration", type=float, default=None, help="seconds")
+    parser.add_argument("--target", default=None, help="target name for --load")
     args = parser.parse_args()
 
     cfg = load_config(args.config)
+    if args.load:
+        overrides = {}
+        if args.rps is not None:
+            overrides["rps"] = args.rps
+        if args.duration is not None:
+            overrides["duration_seconds"] = args.duration
+        cfg.load_probe = dc_replace(cfg.load_probe, **overrides)
+        targets = {t.name: t for t in cfg.targets}
+        target = targets[args.target] if args.target else cfg.targets[0]
+        report = run_load(cfg, target)
+        print(
+            f"{target.name}: {report['achieved_rps']:.2f}/{report['target_rps']} rps, "
+            f"p50={report['p50_ms']:.0f}ms p95={report['p95_ms']:.0f}ms "
+            f"p99={report['p99_ms']:.0f}ms, errors {report['errors']}/"
+            f"{report['requests']} {report['error_breakdown']}"
+        )
+        return
+
+    if args.replay:
+        cooldown = cfg.alerts.cooldown_minutes * 60.0 if cfg.alerts.enabled else None
+        alerts = replay(args.replay, cfg.anomaly, cooldown)
+        for alert in alerts:
+            for a in alert["anomalies"]:
+                print(
+                    f"{alert['ts']}  {alert['target']}  {a['endpoint']} {a['metric']}="
+                    f"{a['value']} (baseline {a['baseline']}, cusum {a['cusum']})"
+                )
+        print(f"anomaly alerts: {len(alerts)}")
+        return
+
     run_monitor(cfg)
 
 
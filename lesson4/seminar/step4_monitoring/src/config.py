@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 
 import yaml
@@ -16,6 +16,13 @@ class MonitoringCfg:
     check_interval_seconds: int
     samples_per_check: int
     request_timeout_seconds: int
+    health_concurrency: int = 2
+    predict_concurrency: int = 1
+    cycle_budget_seconds: float | None = None
+    window_slot_seconds: int = 10
+    alert_window: str = "5m"
+    max_connections: int = 200  # shared client pool across all targets
+    max_outstanding_probes: int = 10  # per endpoint; beyond it slots are missed
 
 
 @dataclass
@@ -30,6 +37,15 @@ class ThresholdsCfg:
     consecutive_failures_critical: int
 
 
+@dataclass
+class TargetCfg:
+    name: str
+    base_url: str
+    thresholds: ThresholdsCfg
+    # probes per cycle for each endpoint
+    probe_mix: dict = field(default_factory=dict)
+
+
 @dataclass
 class AlertsCfg:
     enabled: bool
@@ -41,6 +57,56 @@ class LoggingCfg:
     console_colors: bool
     log_file: str
     metrics_file: str
+    queue_size: int = 10000
+    batch_size: int = 100
+    flush_interval_seconds: float = 1.0
+    max_bytes: int = 10 * 1024 * 1024
+    backup_count: int = 5
+    compress: bool = False
+    overflow_policy: str = "drop"
+    max_body_chars: int = 200
+
+
+@dataclass
+class AnomalyCfg:
+    enabled: bool = True
+    window: str = "1m"  # window whose stats are fed to the detector each cycle
+    metrics: list = field(default_factory=lambda: ["p95_ms", "error_rate_percent"])
+    alpha: float = 0.05  # EWMA weight of a new sample
+    cusum_k: float = 0.5  # allowed drift, in sigmas
+    cusum_h: float = 5.0  # alarm threshold, in sigmas
+    warmup_samples: int = 20
+    min_relative_std: float = 0.05
+    min_std: float = 1.0
+
+
+@dataclass
+class ScrapeCfg:
+    enabled: bool = False
+    path: str = "/metrics/prometheus"
+    requests_metric: str = "http_requests_total"
+    duration_metric: str = "http_request_duration_seconds"
+    endpoints: list = field(default_factory=lambda: ["/predict", "/health"])
+
+
+@dataclass
+class LoadProbeCfg:
+    rps: float = 1.0
+    duration_seconds: float = 60.0
+    arrival: str = "poisson"  # poisson | constant
+    max_in_flight: int = 32
+    deadline_seconds: float = 30.0
+    seed: int = 42
+    # [{"path": image file or directory, "weight": 1.0}]
+    corpus: list = field(default_factory=list)
+
+
+@dataclass
+class StorageCfg:
+    enabled: bool = True
+    db_path: str = "logs/metrics.db"
+    raw_retention_hours: float = 24.0
+    retention_days: dict | None = None  # {"1m": 7, "5m": 30, "1h": 365}
 
 
 @dataclass
@@ -57,30 +123,69 @@ class AppConfig:
     alerts: AlertsCfg
     logging: LoggingCfg
     testing: TestingCfg | None = None
+    storage: StorageCfg | None = None
+    anomaly: AnomalyCfg = field(default_factory=AnomalyCfg)
+    scrape: ScrapeCfg = field(default_factory=ScrapeCfg)
+    load_probe: LoadProbeCfg = field(default_factory=LoadProbeCfg)
+    targets: list[TargetCfg] = field(default_factory=list)
+
+
+_THRESHOLD_KEYS = {
+    "response_time_ms": "response_time",
+    "p95_latency_ms": "p95",
+    "error_rate_percent": "error_rate",
+    "consecutive_failures": "consecutive_failures",
+}
+
+
+def _parse_thresholds(th: dict, base: ThresholdsCfg | None = None) -> ThresholdsCfg:
+    # a target may override only some of the levels; the rest come from `base`
+    values = {}
+    for key, prefix in _THRESHOLD_KEYS.items():
+        for level in ("warning", "critical"):
+            if key in th and level in th[key]:
+                value = th[key][level]
+                if prefix == "error_rate":
+                    value = float(value)
+                values[f"{prefix}_{level}"] = value
+    return replace(base, **values) if base else ThresholdsCfg(**values)
+
+
+def _parse_targets(data: dict, thresholds: ThresholdsCfg, samples: int) -> list:
+    default_mix = {"/health": samples, "/predict": samples}
+    raw = data.get("targets") or [
+        {"name": "service", "base_url": data["service"]["base_url"]}
+    ]
+    return [
+        TargetCfg(
+            name=t.get("name") or t["base_url"],
+            base_url=t["base_url"].rstrip("/"),
+            thresholds=_parse_thresholds(t.get("thresholds") or {}, thresholds),
+            probe_mix={**default_mix, **(t.get("probe_mix") or {})},
+        )
+        for t in raw
+    ]
 
 
 def load_config(path: str) -> AppConfig:
     p = Path(path)
     data = yaml.safe_load(p.read_text(encoding="utf-8"))
-    th = data["thresholds"]
     testing = data.get("testing") or {}
+    thresholds = _parse_thresholds(data["thresholds"])
+    monitoring = MonitoringCfg(**data["monitoring"])
     return AppConfig(
         service=ServiceCfg(**data["service"]),
-        monitoring=MonitoringCfg(**data["monitoring"]),
-        thresholds=ThresholdsCfg(
-            response_time_warning=th["response_time_ms"]["warning"],
-            response_time_critical=th["response_time_ms"]["critical"],
-            p95_warning=th["p95_latency_ms"]["warning"],
-            p95_critical=th["p95_latency_ms"]["critical"],
-            error_rate_warning=float(th["error_rate_percent"]["warning"]),
-            error_rate_critical=float(th["error_rate_percent"]["critical"]),
-            consecutive_failures_warning=th["consecutive_failures"]["warning"],
-            consecutive_failures_critical=th["consecutive_failures"]["critical"],
-        ),
+        monitoring=monitoring,
+        thresholds=thresholds,
         alerts=AlertsCfg(**data["alerts"]),
         logging=LoggingCfg(**data["logging"]),
         testing=TestingCfg(
             sample_image_path=testing.get("sample_image_path"),
             form_field=testing.get("form_field", "file"),
         ),
+        storage=StorageCfg(**(data.get("storage") or {})),
+        anomaly=AnomalyCfg(**(data.get("anomaly") or {})),
+        scrape=ScrapeCfg(**(data.get("scrape") or {})),
+        load_probe=LoadProbeCfg(**(data.get("load_probe") or {})),
+        targets=_parse_targets(data, thresholds, monitoring.samples_per_check),
     )
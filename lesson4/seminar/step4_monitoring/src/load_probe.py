@@ -0,0 +1,190 @@
+import asyncio
+import mimetypes
+import os
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import httpx
+
+from .config import AppConfig, LoadProbeCfg, TargetCfg
+from .logger import JsonLogger
+from .metrics_store import MetricsStore
+from .monitor import build_logger, build_metrics_log, build_store
+from .prober import AsyncProber
+from .stats import NUM_BUCKETS, bucket_index, quantile_from_counts
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def load_weighted_corpus(
+    entries: List[Dict], form_field: str = "file"
+) -> Tuple[List[Tuple[str, str, bytes, str]], List[float]]:
+    # entries: [{"path": file or directory, "weight": w}]; every image found
+    # under an entry gets that entry's weight
+    images, weights = [], []
+    for entry in entries:
+        path, weight = entry["path"], float(entry.get("weight", 1.0))
+        if os.path.isdir(path):
+            files = [
+                os.path.join(path, name)
+                for name in sorted(os.listdir(path))
+                if name.lower().endswith(IMAGE_EXTENSIONS)
+            ]
+        else:
+            files = [path]
+        for file_path in files:
+            with open(file_path, "rb") as fp:
+                content = fp.read()
+            mime = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+            images.append((form_field, os.path.basename(file_path), content, mime))
+            weights.append(weight)
+    return images, weights
+
+
+def _error_key(res: Dict) -> str:
+    body = res["body"] if isinstance(res["body"], dict) else {}
+    if "status_code" in body:
+        return f"http_{body['status_code']}"
+    return body.get("error_type") or "error"
+
+
+async def run_load_probe(
+    prober: AsyncProber,
+    corpus: List[Tuple[str, str, bytes, str]],
+    weights: List[float],
+    lp: LoadProbeCfg,
+    rng: random.Random,
+) -> Dict:
+    """
+    Open-loop /predict load at `lp.rps` for `lp.duration_seconds`.
+
+    Requests are sent at planned times regardless of outstanding ones and
+    latency is measured from the planned time. When `lp.max_in_flight`
+    requests are already outstanding, the slot is counted as an error
+    ("missed_slot") instead of being silently skipped.
+    """
+    loop = asyncio.get_running_loop()
+    counts = [0] * NUM_BUCKETS
+    errors: Counter = Counter()
+    results: List[Dict] = []
+    in_flight = 0
+    max_ms = 0.0
+
+    def on_done(task: asyncio.Task):
+        nonlocal in_flight, max_ms
+        in_flight -= 1
+        res = task.result()
+        results.append(res)
+        counts[bucket_index(res["latency_ms"])] += 1
+        max_ms = max(max_ms, res["latency_ms"])
+        if not res["ok"]:
+            errors[_error_key(res)] += 1
+
+    start = loop.time()
+    planned = start
+    sent = 0
+    tasks = []
+    while True:
+        gap = rng.expovariate(lp.rps) if lp.arrival == "poisson" else 1.0 / lp.rps
+        planned += gap
+        if planned - start >= lp.duration_seconds:
+            break
+        delay = planned - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if in_flight >= lp.max_in_flight:
+            errors["missed_slot"] += 1
+            continue
+        image = rng.choices(corpus, weights)[0] if corpus else None
+        in_flight += 1
+        sent += 1
+        task = asyncio.create_task(
+            prober.probe("/predict", planned, lp.deadline_seconds, image)
+        )
+        task.add_done_callback(on_done)
+        tasks.append(task)
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = loop.time() - start
+    completed = len(results)
+    total = completed + errors["missed_slot"]
+
+    summary = {
+        "target_rps": lp.rps,
+        "achieved_rps": sent / elapsed if elapsed > 0 else 0.0,
+        "throughput_rps": (
+            sum(1 for r in results if r["ok"]) / elapsed if elapsed > 0 else 0.0
+        ),
+        "requests": total,
+        "errors": sum(errors.values()),
+        "error_rate_percent": 100.0 * sum(errors.values()) / total if total else 0.0,
+        "error_breakdown": dict(errors),
+        "max_ms": max_ms,
+    }
+    for q in PERCENTILES:
+        summary[f"p{q}_ms"] = min(
+            quantile_from_counts(counts, completed, q / 100), max_ms
+        )
+    summary["results"] = results
+    return summary
+
+
+async def _load_main(cfg: AppConfig, target: TargetCfg, logger: JsonLogger) -> Dict:
+    lp = cfg.load_probe
+    form_field = cfg.testing.form_field if cfg.testing else "file"
+    corpus, weights = load_weighted_corpus(lp.corpus, form_field)
+    limits = httpx.Limits(
+        max_connections=lp.max_in_flight, max_keepalive_connections=lp.max_in_flight
+    )
+    async with httpx.AsyncClient(
+        timeout=cfg.monitoring.request_timeout_seconds, limits=limits
+    ) as client:
+        prober = AsyncProber(
+            target.base_url,
+            cfg.monitoring.request_timeout_seconds,
+            predict_concurrency=lp.max_in_flight,
+            testing=cfg.testing,
+            client=client,
+        )
+        logger.info(
+            "load probe started",
+            target=target.name,
+            rps=lp.rps,
+            duration_seconds=lp.duration_seconds,
+            corpus_images=len(corpus),
+        )
+        return await run_load_probe(prober, corpus, weights, lp, random.Random(lp.seed))
+
+
+def run_load(cfg: AppConfig, target: TargetCfg) -> Dict:
+    """Run a load probe against one target and report it like a monitor cycle."""
+    logger = build_logger(cfg)
+    metrics_log = build_metrics_log(cfg)
+    store: MetricsStore | None = build_store(cfg)
+    try:
+        summary = asyncio.run(_load_main(cfg, target, logger))
+        results = summary.pop("results")
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "target": target.name,
+            "mode": "load",
+            "duration_seconds": cfg.load_probe.duration_seconds,
+            **summary,
+        }
+        metrics_log.write(payload)
+        if store:
+            store.write(
+                target.name,
+                [(r["ts"], "load:/predict", r["latency_ms"], r["ok"]) for r in results],
+            )
+        logger.info("LOAD", **payload)
+        return payload
+    finally:
+        logger.close()
+        metrics_log.close()
+        if store:
+            store.close()
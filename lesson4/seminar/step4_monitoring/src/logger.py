@@ -1,7 +1,12 @@
+import gzip
 import json
+import os
+import queue
+import shutil
+import threading
 import time
 from pathlib import Path
-from typing import Any
+from typing import Any, List
 
 try:
     from colorama import Fore, Style
@@ -21,12 +26,57 @@ except Exception:
     Fore = Style = Dummy()
 
 
+_STOP = object()
+
+
 class JsonLogger:
-    def __init__(self, log_file: str, console_colors: bool = True):
+    """
+    JSON-lines logger with a background writer thread.
+
+    Callers only enqueue records; serialization, disk writes, rotation and
+    console output happen on the writer thread, so probing never waits on
+    I/O. Records are written in batches and flushed when `batch_size` records
+    are pending or `flush_interval_seconds` has passed. When the queue is
+    full, records are dropped (and counted) or the caller blocks, depending
+    on `overflow_policy`.
+
+    With `console=False` the logger is a plain JSON-lines sink: `write`
+    appends records as they are, without console echo.
+    """
+
+    def __init__(
+        self,
+        log_file: str,
+        console_colors: bool = True,
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval_seconds: float = 1.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        compress: bool = False,
+        overflow_policy: str = "drop",
+        console: bool = True,
+    ):
+        if overflow_policy not in ("drop", "block"):
+            raise ValueError(f"unknown overflow_policy: {overflow_policy}")
         self.log_path = Path(log_file)
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.console = console
         self.console_colors = console_colors and _HAS_COLOR
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_seconds
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.overflow_policy = overflow_policy
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
         self._fp = self.log_path.open("a", encoding="utf-8")
+        self._writer = threading.Thread(
+            target=self._run, name="json-logger", daemon=True
+        )
+        self._writer.start()
 
     def _ts(self) -> str:
         return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime())
@@ -47,9 +97,17 @@ class JsonLogger:
         rec = {"ts": self._ts(), "level": level, "message": message}
         if kwargs:
             rec.update(kwargs)
-        self._fp.write(json.dumps(rec, ensure_ascii=False) + "\n")
-        self._fp.flush()
-        self._console(level, f"{message} | {kwargs}" if kwargs else message)
+        self.write(rec)
+
+    def write(self, rec: dict):
+        # enqueue a record as is; it is serialized on the writer thread
+        if self.overflow_policy == "block":
+            self._queue.put(rec)
+            return
+        try:
+            self._queue.put_nowait(rec)
+        except queue.Full:
+            self.dropped += 1
 
     def info(self, message: str, **kwargs: Any):
         self.log("INFO", message, **kwargs)
@@ -60,7 +118,93 @@ class JsonLogger:
     def error(self, message: str, **kwargs: Any):
         self.log("ERROR", message, **kwargs)
 
+    # --- writer thread ---
+
+    def _run(self):
+        batch: List[dict] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is _STOP:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            if (
+                stopping
+                or len(batch) >= self.batch_size
+                or (time.monotonic() >= deadline)
+            ):
+                self._write_batch(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write_batch(self, batch: List[dict]):
+        if self.dropped > self._reported_dropped:
+            batch.append(
+                {
+                    "ts": self._ts(),
+                    "level": "WARN",
+                    "message": "log records dropped",
+                    "dropped_total": self.dropped,
+                }
+            )
+            self._reported_dropped = self.dropped
+        if not batch:
+            return
+
+        try:
+            self._fp.write(
+                "".join(json.dumps(rec, ensure_ascii=False) + "\n" for rec in batch)
+            )
+            self._fp.flush()
+            if self.max_bytes and self._fp.tell() >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            print(f"[ERROR] log write failed: {e}")
+
+        if not self.console:
+            return
+        try:
+            for rec in batch:
+                extra = {
+                    k: v for k, v in rec.items() if k not in ("ts", "level", "message")
+                }
+                msg = rec["message"]
+                self._console(rec["level"], f"{msg} | {extra}" if extra else msg)
+        except OSError:
+            pass  # console is gone (closed pipe); the log file is what matters
+
+    def _rotate(self):
+        self._fp.close()
+        suffix = ".gz" if self.compress else ""
+        for i in range(self.backup_count - 1, 0, -1):
+            src = Path(f"{self.log_path}.{i}{suffix}")
+            if src.exists():
+                os.replace(src, f"{self.log_path}.{i + 1}{suffix}")
+
+        if self.backup_count > 0:
+            if self.compress:
+                with self.log_path.open("rb") as f_in, gzip.open(
+                    f"{self.log_path}.1.gz", "wb"
+                ) as f_out:
+                    shutil.copyfileobj(f_in, f_out)
+                self.log_path.unlink()
+            else:
+                os.replace(self.log_path, f"{self.log_path}.1")
+        else:
+            self.log_path.unlink()
+        self._fp = self.log_path.open("a", encoding="utf-8")
+
     def close(self):
+        # drain everything queued so far, then stop the writer
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
         try:
             self._fp.close()
         except Exception:
@@ -0,0 +1,308 @@
+import argparse
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .stats import NUM_BUCKETS, bucket_index, quantile_from_counts
+
+DEFAULT_DB_PATH = "logs/metrics.db"
+
+# rollup resolutions (seconds) and how long each one is kept by default
+RESOLUTIONS = {"1m": 60, "5m": 300, "1h": 3600}
+DEFAULT_RETENTION_DAYS = {"1m": 7, "5m": 30, "1h": 365}
+STATS = ("count", "error_rate", "avg", "p50", "p95", "p99", "max")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS raw (
+    ts REAL NOT NULL,
+    target TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    latency_ms REAL NOT NULL,
+    ok INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_raw_series ON raw(target, endpoint, ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution INTEGER NOT NULL,
+    bucket_start REAL NOT NULL,
+    target TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    sum_ms REAL NOT NULL,
+    max_ms REAL NOT NULL,
+    p50_ms REAL NOT NULL,
+    p95_ms REAL NOT NULL,
+    hist TEXT NOT NULL,
+    PRIMARY KEY (resolution, target, endpoint, bucket_start)
+);
+"""
+
+
+class _Bucket:
+    __slots__ = ("count", "errors", "sum_ms", "max_ms", "hist")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.hist: Dict[int, int] = {}
+
+    def add(self, latency_ms: float, ok: bool):
+        idx = bucket_index(latency_ms)
+        self.hist[idx] = self.hist.get(idx, 0) + 1
+        self.count += 1
+        self.sum_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        if not ok:
+            self.errors += 1
+
+    def merge_row(self, count, errors, sum_ms, max_ms, hist: str):
+        for idx, n in json.loads(hist).items():
+            self.hist[int(idx)] = self.hist.get(int(idx), 0) + n
+        self.count += count
+        self.errors += errors
+        self.sum_ms += sum_ms
+        self.max_ms = max(self.max_ms, max_ms)
+
+    def quantile(self, q: float) -> float:
+        counts = [0] * NUM_BUCKETS
+        for idx, n in self.hist.items():
+            counts[idx] = n
+        return min(quantile_from_counts(counts, self.count, q), self.max_ms)
+
+    def stat(self, name: str) -> float:
+        if name == "count":
+            return float(self.count)
+        if self.count == 0:
+            return 0.0
+        if name == "error_rate":
+            return 100.0 * self.errors / self.count
+        if name == "avg":
+            return self.sum_ms / self.count
+        if name == "max":
+            return self.max_ms
+        return self.quantile(float(name[1:]) / 100.0)
+
+
+class MetricsStore:
+    """
+    Compact time-series store for probe results (SQLite).
+
+    Raw points are kept for `raw_retention_hours`; 1m/5m/1h rollups keep
+    count, errors, p50/p95/max and a sparse latency histogram, so quantiles
+    over any range are computed by merging histograms instead of re-reading
+    raw data. Open rollup buckets are upserted on every write.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_DB_PATH,
+        raw_retention_hours: float = 24.0,
+        retention_days: Optional[Dict[str, float]] = None,
+    ):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.raw_retention = raw_retention_hours * 3600.0
+        self.retention = {
+            name: days * 86400.0
+            for name, days in {
+                **DEFAULT_RETENTION_DAYS,
+                **(retention_days or {}),
+            }.items()
+        }
+        # every target writes from its own worker thread (asyncio.to_thread);
+        # the lock serializes all use of the shared connection and open buckets
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        # (resolution, target, endpoint) -> (bucket_start, _Bucket)
+        self._open: Dict[Tuple[int, str, str], Tuple[float, _Bucket]] = {}
+        self._last_prune = 0.0
+
+    def write(self, target: str, points: Iterable[Tuple[float, str, float, bool]]):
+        # points: (ts, endpoint, latency_ms, ok)
+        points = list(points)
+        if not points:
+            return
+
+        with self._lock:
+            self._write(target, points)
+
+    def _write(self, target: str, points: List[Tuple[float, str, float, bool]]):
+        rows = []
+        for ts, endpoint, latency_ms, ok in points:
+            for resolution in RESOLUTIONS.values():
+                start = ts - ts % resolution
+                key = (resolution, target, endpoint)
+                current = self._open.get(key)
+                if current is None or current[0] != start:
+                    current = (start, self._load_bucket(key, start))
+                    self._open[key] = current
+                current[1].add(latency_ms, ok)
+
+        for (resolution, tgt, endpoint), (start, b) in self._open.items():
+            if tgt == target:
+                rows.append(
+                    (
+                        resolution,
+                        start,
+                        tgt,
+                        endpoint,
+                        b.count,
+                        b.errors,
+                        b.sum_ms,
+                        b.max_ms,
+                        b.quantile(0.50),
+                        b.quantile(0.95),
+                        json.dumps(b.hist),
+                    )
+                )
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO raw VALUES (?, ?, ?, ?, ?)",
+                [(ts, target, ep, lat, int(ok)) for ts, ep, lat, ok in points],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rollups VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+        if time.time() - self._last_prune >= 600:
+            self.prune()
+
+    def _load_bucket(self, key: Tuple[int, str, str], start: float) -> _Bucket:
+        # continue a bucket already persisted (e.g. after a monitor restart)
+        resolution, target, endpoint = key
+        bucket = _Bucket()
+        row = self._conn.execute(
+            "SELECT count, errors, sum_ms, max_ms, hist FROM rollups "
+            "WHERE resolution=? AND target=? AND endpoint=? AND bucket_start=?",
+            (resolution, target, endpoint, start),
+        ).fetchone()
+        if row:
+            bucket.merge_row(*row)
+        return bucket
+
+    def prune(self, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM raw WHERE ts < ?", (now - self.raw_retention,)
+            )
+            for name, resolution in RESOLUTIONS.items():
+                self._conn.execute(
+                    "DELETE FROM rollups WHERE resolution=? AND bucket_start < ?",
+                    (resolution, now - self.retention[name]),
+                )
+        self._last_prune = now
+
+    def _pick_resolution(self, start: float, end: float) -> int:
+        # coarsest rollup whose buckets tile the range exactly
+        for resolution in sorted(RESOLUTIONS.values(), reverse=True):
+            if start % resolution == 0 and end % resolution == 0 and end > start:
+                return resolution
+        return min(RESOLUTIONS.values())
+
+    def query(
+        self,
+        endpoint: str,
+        start: float,
+        end: float,
+        stat: str = "p95",
+        target: Optional[str] = None,
+        step: Optional[int] = None,
+    ) -> List[Tuple[float, float]]:
+        """
+        Value of `stat` for [start, end); one point for the whole range, or
+        one point per `step` seconds (must be one of the rollup resolutions).
+        """
+        if stat not in STATS:
+            raise ValueError(f"unknown stat: {stat}, expected one of {STATS}")
+        resolution = step or self._pick_resolution(start, end)
+        if resolution not in RESOLUTIONS.values():
+            raise ValueError(f"step must be one of {sorted(RESOLUTIONS.values())}")
+
+        sql = (
+            "SELECT bucket_start, count, errors, sum_ms, max_ms, hist FROM rollups "
+            "WHERE resolution=? AND endpoint=? AND bucket_start >= ? "
+            "AND bucket_start < ?"
+        )
+        params: list = [resolution, endpoint, start - start % resolution, end]
+        if target is not None:
+            sql += " AND target=?"
+            params.append(target)
+
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY bucket_start", params).fetchall()
+
+        merged: Dict[float, _Bucket] = {}
+        for bucket_start, *row in rows:
+            key = bucket_start if step else start
+            merged.setdefault(key, _Bucket()).merge_row(*row)
+
+        if not step:
+            return [(start, merged.get(start, _Bucket()).stat(stat))]
+        return [(ts, b.stat(stat)) for ts, b in merged.items()]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _parse_time(value: str) -> float:
+    # unix seconds or ISO local time ("2025-01-31 02:00", "2025-01-31T02:00:00")
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _fmt(ts: float) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(ts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor metrics store")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    query_parser = subparsers.add_parser("query", help="stat over a time range")
+    query_parser.add_argument("--endpoint", required=True, help="/health or /predict")
+    query_parser.add_argument(
+        "--start", required=True, help="ISO local time or unix ts"
+    )
+    query_parser.add_argument("--end", required=True, help="ISO local time or unix ts")
+    query_parser.add_argument("--stat", choices=STATS, default="p95")
+    query_parser.add_argument("--target", default=None)
+    query_parser.add_argument(
+        "--step", choices=list(RESOLUTIONS), default=None, help="per-bucket series"
+    )
+
+    subparsers.add_parser("prune", help="apply retention now")
+
+    args = parser.parse_args()
+    store = MetricsStore(args.db)
+
+    if args.command == "prune":
+        store.prune()
+        return
+
+    start, end = _parse_time(args.start), _parse_time(args.end)
+    step = RESOLUTIONS[args.step] if args.step else None
+    for ts, value in store.query(
+        args.endpoint, start, end, args.stat, args.target, step
+    ):
+        label = _fmt(ts) if step else f"{_fmt(start)} .. {_fmt(end)}"
+        print(f"{label}  {args.endpoint}  {args.stat}={value:.2f}")
+
+
+if __name__ == "__main__":
+    main()
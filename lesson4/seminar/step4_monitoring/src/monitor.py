@@ -1,174 +1,351 @@
+import asyncio
 import json
-import mimetypes
-import os
+import random
 import time
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Tuple
 
-import requests
+import httpx
 
-from .config import AppConfig
+from .anomaly import AnomalyDetector, detect
+from .config import AppConfig, TargetCfg, ThresholdsCfg
 from .logger import JsonLogger
+from .metrics_store import MetricsStore
+from .prober import AsyncProber
+from .scheduler import FixedRateScheduler
+from .scraper import PrometheusScraper
+from .stats import SlidingWindowStats
 
-# tiny 1x1 PNG (white), to avoid external deps
-_ONEPX_PNG = (
-    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89"
-    b"\x00\x00\x00\x0cIDAT\x08\x1d\x01\x01\x00\xfe\xff\x00\xff\xff\xff\xff\xa0\x8d\xf7\xde\x00\x00\x00\x00IEND\xaeB`\x82"
-)
 
-
-def p95(latencies_ms: List[float]) -> float:
-    if not latencies_ms:
-        return 0.0
-    data = sorted(latencies_ms)
-    k = int(round(0.95 * (len(data) - 1)))
-    return float(data[k])
+def _breach(
+    endpoint_stats: Dict[str, Dict[str, Dict]],
+    th: ThresholdsCfg,
+    window: str,
+    level: str,
+    consec_failures: int,
+) -> str | None:
+    if consec_failures >= getattr(th, f"consecutive_failures_{level}"):
+        return f"consecutive_failures={consec_failures} >= {level}"
+    for endpoint, windows in endpoint_stats.items():
+        stats = windows[window]
+        if stats["count"] == 0:
+            continue
+        if stats["error_rate_percent"] >= getattr(th, f"error_rate_{level}"):
+            return (
+                f"{endpoint} error_rate={stats['error_rate_percent']:.1f}% "
+                f"({window}) >= {level}"
+            )
+        # max latency reacts fast: always taken from the 1-minute window
+        recent_max = windows["1m"]["max_ms"]
+        # server-side histograms have no max; p95 and errors still apply
+        if recent_max is not None and recent_max >= getattr(
+            th, f"response_time_{level}"
+        ):
+            return f"{endpoint} response_time_max={recent_max:.0f}ms (1m) >= {level}"
+        if stats["p95_ms"] >= getattr(th, f"p95_{level}"):
+            return f"{endpoint} p95={stats['p95_ms']:.0f}ms ({window}) >= {level}"
+    return None
 
 
 def classify_status(
-    cfg: AppConfig, resp_times: List[float], error_rate: float, consec_failures: int
+    cfg: AppConfig,
+    endpoint_stats: Dict[str, Dict[str, Dict]],
+    consec_failures: int,
+    thresholds: ThresholdsCfg | None = None,
 ) -> Tuple[str, str]:
-    # Returns (color_level, reason)
-    p95_val = p95(resp_times)
-    if consec_failures >= cfg.thresholds.consecutive_failures_critical:
-        return ("RED", f"consecutive_failures={consec_failures} >= critical")
-    if error_rate >= cfg.thresholds.error_rate_critical:
-        return ("RED", f"error_rate={error_rate:.1f}% >= critical")
-    if resp_times and max(resp_times) >= cfg.thresholds.response_time_critical:
-        return ("RED", f"response_time_max={max(resp_times):.0f}ms >= critical")
-    if p95_val >= cfg.thresholds.p95_critical:
-        return ("RED", f"p95={p95_val:.0f}ms >= critical")
-
-    # warnings
-    if consec_failures >= cfg.thresholds.consecutive_failures_warning:
-        return ("YELLOW", f"consecutive_failures={consec_failures} >= warning")
-    if error_rate >= cfg.thresholds.error_rate_warning:
-        return ("YELLOW", f"error_rate={error_rate:.1f}% >= warning")
-    if resp_times and max(resp_times) >= cfg.thresholds.response_time_warning:
-        return ("YELLOW", f"response_time_max={max(resp_times):.0f}ms >= warning")
-    if p95_val >= cfg.thresholds.p95_warning:
-        return ("YELLOW", f"p95={p95_val:.0f}ms >= warning")
+    # Returns (color_level, reason); endpoint_stats: endpoint -> window -> snapshot
+    th = thresholds or cfg.thresholds
+    window = cfg.monitoring.alert_window
+    reason = _breach(endpoint_stats, th, window, "critical", consec_failures)
+    if reason:
+        return ("RED", reason)
+    reason = _breach(endpoint_stats, th, window, "warning", consec_failures)
+    if reason:
+        return ("YELLOW", reason)
     return ("GREEN", "within thresholds")
 
 
-def write_metrics(metrics_path: str, payload: Dict):
-    p = Path(metrics_path)
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with p.open("a", encoding="utf-8") as fp:
-        fp.write(json.dumps(payload, ensure_ascii=False) + "\n")
+def summarize_body(body: Dict, max_chars: int) -> Dict:
+    # keep the log small: long string fields of a response are truncated
+    summary = {}
+    for key, value in body.items():
+        if isinstance(value, str) and len(value) > max_chars:
+            value = value[:max_chars] + "..."
+        elif isinstance(value, (dict, list)):
+            text = json.dumps(value, ensure_ascii=False)
+            if len(text) > max_chars:
+                value = text[:max_chars] + "..."
+        summary[key] = value
+    return summary
 
 
-def check_health(base_url: str, timeout: int) -> Tuple[bool, float, Optional[Dict]]:
-    url = f"{base_url}/health"
-    t0 = time.perf_counter()
-    try:
-        r = requests.get(url, timeout=timeout)
-        dt = (time.perf_counter() - t0) * 1000.0
-        ok = r.ok
-        body = None
-        try:
-            body = r.json()
-        except Exception:
-            body = {"raw": r.text[:200]}
-        return ok, dt, body
-    except Exception as e:
-        dt = (time.perf_counter() - t0) * 1000.0
-        return False, dt, {"error": str(e)}
-
-
-def check_predict(base_url: str, timeout: int, cfg: AppConfig):
-    url = f"{base_url}/predict"
-    t0 = time.perf_counter()
-    try:
-        if cfg.testing and cfg.testing.sample_image_path:
-            path = cfg.testing.sample_image_path
-            field = cfg.testing.form_field or "file"
-            mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
-            with open(path, "rb") as fp:
-                files = {field: (os.path.basename(path), fp, mime)}
-                r = requests.post(url, files=files, timeout=timeout)
-        else:
-            files = {"file": ("1x1.png", _ONEPX_PNG, "image/png")}
-            r = requests.post(url, files=files, timeout=timeout)
+def build_logger(cfg: AppConfig) -> JsonLogger:
+    log_cfg = cfg.logging
+    return JsonLogger(
+        log_cfg.log_file,
+        console_colors=log_cfg.console_colors,
+        queue_size=log_cfg.queue_size,
+        batch_size=log_cfg.batch_size,
+        flush_interval_seconds=log_cfg.flush_interval_seconds,
+        max_bytes=log_cfg.max_bytes,
+        backup_count=log_cfg.backup_count,
+        compress=log_cfg.compress,
+        overflow_policy=log_cfg.overflow_policy,
+    )
 
-        dt = (time.perf_counter() - t0) * 1000.0
-        ok = r.ok
-        try:
-            body = r.json()
-        except Exception:
-            body = {"raw": r.text[:200]}
-        return ok, dt, body
 
-    except Exception as e:
-        dt = (time.perf_counter() - t0) * 1000.0
-        return False, dt, {"error": str(e)}
+def build_metrics_log(cfg: AppConfig) -> JsonLogger:
+    # metrics.jsonl gets its own background writer with the log's rotation
+    # and retention; a cycle adds one record per target, so records are never
+    # dropped
+    log_cfg = cfg.logging
+    return JsonLogger(
+        log_cfg.metrics_file,
+        queue_size=log_cfg.queue_size,
+        batch_size=log_cfg.batch_size,
+        flush_interval_seconds=log_cfg.flush_interval_seconds,
+        max_bytes=log_cfg.max_bytes,
+        backup_count=log_cfg.backup_count,
+        compress=log_cfg.compress,
+        overflow_policy="block",
+        console=False,
+    )
+
+
+def build_store(cfg: AppConfig) -> MetricsStore | None:
+    if not (cfg.storage and cfg.storage.enabled):
+        return None
+    return MetricsStore(
+        cfg.storage.db_path,
+        raw_retention_hours=cfg.storage.raw_retention_hours,
+        retention_days=cfg.storage.retention_days,
+    )
 
 
 def run_monitor(cfg: AppConfig):
-    logger = JsonLogger(cfg.logging.log_file, console_colors=cfg.logging.console_colors)
-    consecutive_failures = 0
-    last_alert_ts = 0.0
-    cooldown = cfg.alerts.cooldown_minutes * 60.0 if cfg.alerts.enabled else None
-    base_url = cfg.service.base_url
+    logger = build_logger(cfg)
+    metrics_log = build_metrics_log(cfg)
+    store = build_store(cfg)
+    try:
+        asyncio.run(monitor_loop(cfg, logger, store, metrics_log))
+    finally:
+        # drain queued records before exit
+        logger.close()
+        metrics_log.close()
+        if store:
+            store.close()
+
+
+class TargetMonitor:
+    """Probing, windowed stats, status and alert cooldown for one target."""
+
+    def __init__(
+        self,
+        cfg: AppConfig,
+        target: TargetCfg,
+        prober: AsyncProber,
+        logger: JsonLogger,
+        store: MetricsStore | None = None,
+        scraper: PrometheusScraper | None = None,
+        metrics_log: JsonLogger | None = None,
+    ):
+        self.cfg = cfg
+        self.target = target
+        self.prober = prober
+        self.logger = logger
+        self.store = store
+        self.scraper = scraper
+        self.metrics_log = metrics_log
+        self.consecutive_failures = 0
+        self.last_alert_ts = 0.0
+        self.last_anomaly_ts = 0.0
+        self.detector = AnomalyDetector(cfg.anomaly) if cfg.anomaly.enabled else None
+        self.window_stats = {
+            endpoint: SlidingWindowStats(cfg.monitoring.window_slot_seconds)
+            for endpoint in ("/health", "/predict")
+        }
 
-    logger.info("monitor started", base_url=base_url)
+    async def run(self, interval: float, budget: float, phase: float):
+        loop = asyncio.get_running_loop()
+        scheduler = FixedRateScheduler(
+            self.prober,
+            self.target.probe_mix,
+            interval,
+            deadline_seconds=budget,
+            max_outstanding=self.cfg.monitoring.max_outstanding_probes,
+        )
+        start = loop.time() + phase
+        probing = asyncio.create_task(scheduler.run(start))
+        # status is evaluated once per interval over the probes finished in it
+        next_eval = start + interval
+        try:
+            while True:
+                await asyncio.sleep(max(0.0, next_eval - loop.time()))
+                if self.scraper:
+                    await self.scrape()
+                await self.evaluate(*scheduler.drain())
+                next_eval += interval
+        finally:
+            probing.cancel()
+
+    async def scrape(self):
+        try:
+            await self.scraper.scrape()
+        except Exception as e:
+            self.logger.warn(
+                "scrape failed",
+                target=self.target.name,
+                error=str(e) or type(e).__name__,
+            )
 
-    while True:
+    async def evaluate(self, results: List[Dict], missed: Dict[str, int]):
+        cfg, logger, name = self.cfg, self.logger, self.target.name
+        cooldown = cfg.alerts.cooldown_minutes * 60.0 if cfg.alerts.enabled else None
         latencies = []
         errors = 0
-        samples = cfg.monitoring.samples_per_check
 
-        for i in range(samples):
-            ok_h, dt_h, body_h = check_health(
-                base_url, cfg.monitoring.request_timeout_seconds
+        for res in results:
+            latencies.append(res["latency_ms"])
+            self.window_stats[res["endpoint"]].record(
+                res["latency_ms"], res["ok"], now=res["ts"]
             )
-            latencies.append(dt_h)
-            logger.info("/health", ok=ok_h, latency_ms=round(dt_h, 2), body=body_h)
-            if not ok_h:
-                errors += 1
-                consecutive_failures += 1
-            else:
-                consecutive_failures = 0
-
-            ok_p, dt_p, body_p = check_predict(
-                base_url, cfg.monitoring.request_timeout_seconds, cfg
+            logger.info(
+                res["endpoint"],
+                target=name,
+                ok=res["ok"],
+                latency_ms=round(res["latency_ms"], 2),
+                service_ms=(
+                    round(res["service_ms"], 2)
+                    if res["service_ms"] is not None
+                    else None
+                ),
+                body=summarize_body(res["body"], cfg.logging.max_body_chars),
             )
-            latencies.append(dt_p)
-            logger.info("/predict", ok=ok_p, latency_ms=round(dt_p, 2), body=body_p)
-            if not ok_p:
+            if not res["ok"]:
                 errors += 1
-                consecutive_failures += 1
+                self.consecutive_failures += 1
             else:
-                consecutive_failures = 0
+                self.consecutive_failures = 0
 
-            time.sleep(0.1)  # short pause inside the sampling loop
-
-        err_rate = 100.0 * errors / max(1, 2 * samples)
-        p95_val = p95(latencies)
+        err_rate = 100.0 * errors / max(1, len(results))
+        now = time.time()
+        if missed:
+            logger.warn("missed probe slots", target=name, **missed)
+        if self.store:
+            # sqlite I/O off the event loop
+            points = [
+                (r["ts"], r["endpoint"], r["latency_ms"], r["ok"]) for r in results
+            ]
+            try:
+                await asyncio.to_thread(self.store.write, name, points)
+            except Exception as e:
+                # a failed write loses these points, not the target's monitoring
+                logger.warn(
+                    "metrics store write failed",
+                    target=name,
+                    error=str(e) or type(e).__name__,
+                )
+        endpoint_stats = {
+            endpoint: stats.snapshots(now)
+            for endpoint, stats in self.window_stats.items()
+        }
+        if self.scraper:
+            # real-traffic stats from the service's own counters
+            endpoint_stats.update(self.scraper.snapshots())
+        window = cfg.monitoring.alert_window
 
-        color, reason = classify_status(cfg, latencies, err_rate, consecutive_failures)
+        color, reason = classify_status(
+            cfg, endpoint_stats, self.consecutive_failures, self.target.thresholds
+        )
 
         metrics_payload = {
             "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime()),
+            "target": name,
             "response_time_ms_max": max(latencies) if latencies else 0,
-            "response_time_ms_avg": sum(latencies) / len(latencies) if latencies else 0,
-            "p95_latency_ms": p95_val,
+            "response_time_ms_avg": (
+                sum(latencies) / len(latencies) if latencies else 0
+            ),
+            "p95_latency_ms": max(
+                stats[window]["p95_ms"] for stats in endpoint_stats.values()
+            ),
             "error_rate_percent": err_rate,
-            "consecutive_failures": consecutive_failures,
+            "consecutive_failures": self.consecutive_failures,
+            "missed_slots": sum(missed.values()),
             "status": color,
             "reason": reason,
+            "endpoints": endpoint_stats,
         }
-        write_metrics(cfg.logging.metrics_file, metrics_payload)
+        if self.metrics_log:
+            # serialized and appended on the writer thread, not the event loop
+            self.metrics_log.write(metrics_payload)
 
         if color == "RED" or color == "YELLOW":
             now = time.time()
-            if (cooldown is None) or (now - last_alert_ts >= cooldown):
+            if (cooldown is None) or (now - self.last_alert_ts >= cooldown):
                 if color == "RED":
                     logger.error("ALERT", **metrics_payload)
                 else:
                     logger.warn("ALERT", **metrics_payload)
-                last_alert_ts = now
+                self.last_alert_ts = now
         else:
             logger.info("OK", **metrics_payload)
 
-        time.sleep(cfg.monitoring.check_interval_seconds)
+        if self.detector:
+            anomalies = detect(self.detector, name, endpoint_stats)
+            # early warnings have their own cooldown, so they never mute alerts
+            if anomalies and (
+                (cooldown is None) or (now - self.last_anomaly_ts >= cooldown)
+            ):
+                logger.warn("ANOMALY", target=name, anomalies=anomalies)
+                self.last_anomaly_ts = now
+
+
+async def monitor_loop(
+    cfg: AppConfig,
+    logger: JsonLogger,
+    store: MetricsStore | None = None,
+    metrics_log: JsonLogger | None = None,
+):
+    interval = cfg.monitoring.check_interval_seconds
+    # no probe may stay in flight longer than one interval past its slot
+    budget = min(cfg.monitoring.cycle_budget_seconds or interval, interval)
+    max_conn = cfg.monitoring.max_connections
+
+    logger.info(
+        "monitor started",
+        targets=[t.name for t in cfg.targets],
+        base_urls=[t.base_url for t in cfg.targets],
+    )
+
+    # one connection pool for all targets, one task per target
+    limits = httpx.Limits(max_connections=max_conn, max_keepalive_connections=max_conn)
+    async with httpx.AsyncClient(
+        timeout=cfg.monitoring.request_timeout_seconds, limits=limits
+    ) as client:
+        monitors = [
+            TargetMonitor(
+                cfg,
+                target,
+                AsyncProber(
+                    target.base_url,
+                    cfg.monitoring.request_timeout_seconds,
+                    health_concurrency=cfg.monitoring.health_concurrency,
+                    predict_concurrency=cfg.monitoring.predict_concurrency,
+                    testing=cfg.testing,
+                    client=client,
+                ),
+                logger,
+                store,
+                (
+                    PrometheusScraper(client, target.base_url, cfg.scrape)
+                    if cfg.scrape.enabled
+                    else None
+                ),
+                metrics_log,
+            )
+            for target in cfg.targets
+        ]
+        # random phase per target spreads the probes over the interval
+        spread = interval if len(monitors) > 1 else 0.0
+        await asyncio.gather(
+            *(m.run(interval, budget, random.uniform(0, spread)) for m in monitors)
+        )
@@ -0,0 +1,153 @@
+import asyncio
+import mimetypes
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from .config import TestingCfg
+
+# tiny 1x1 PNG (white), to avoid external deps
+_ONEPX_PNG = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89"
+    b"\x00\x00\x00\x0cIDAT\x08\x1d\x01\x01\x00\xfe\xff\x00\xff\xff\xff\xff\xa0\x8d\xf7\xde\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+
+def _load_probe_image(testing: Optional[TestingCfg]) -> Tuple[str, str, bytes, str]:
+    # (form field, filename, content, mime); read once, reused by every probe
+    if testing and testing.sample_image_path:
+        path = testing.sample_image_path
+        mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        with open(path, "rb") as fp:
+            content = fp.read()
+        return testing.form_field or "file", os.path.basename(path), content, mime
+    return "file", "1x1.png", _ONEPX_PNG, "image/png"
+
+
+def _parse_body(r: httpx.Response) -> Dict:
+    try:
+        return r.json()
+    except Exception:
+        return {"raw": r.text[:200]}
+
+
+class AsyncProber:
+    """
+    Concurrent /health and /predict prober over one pooled HTTP client.
+
+    Keep-alive connections are reused between probes, and each endpoint has
+    its own concurrency limit so slow /predict calls never starve /health.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        health_concurrency: int = 2,
+        predict_concurrency: int = 1,
+        testing: Optional[TestingCfg] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._limits = {
+            "/health": asyncio.Semaphore(health_concurrency),
+            "/predict": asyncio.Semaphore(predict_concurrency),
+        }
+        self._pool_size = health_concurrency + predict_concurrency
+        self._image = _load_probe_image(testing)
+        # a shared client (one pool for many targets) is owned by the caller
+        self._owns_client = client is None
+        self._client: Optional[httpx.AsyncClient] = client
+
+    async def __aenter__(self) -> "AsyncProber":
+        if not self._owns_client:
+            return self
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self._pool_size,
+                max_keepalive_connections=self._pool_size,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._owns_client:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(
+        self, endpoint: str, image: Optional[Tuple[str, str, bytes, str]] = None
+    ) -> Tuple[bool, float, Dict]:
+        async with self._limits[endpoint]:
+            t0 = time.perf_counter()
+            try:
+                if endpoint == "/health":
+                    r = await self._client.get(f"{self.base_url}/health")
+                else:
+                    field, filename, content, mime = image or self._image
+                    r = await self._client.post(
+                        f"{self.base_url}/predict",
+                        files={field: (filename, content, mime)},
+                    )
+                dt = (time.perf_counter() - t0) * 1000.0
+                body = _parse_body(r)
+                if not r.is_success and isinstance(body, dict):
+                    body["status_code"] = r.status_code
+                return r.is_success, dt, body
+            except Exception as e:
+                dt = (time.perf_counter() - t0) * 1000.0
+                return (
+                    False,
+                    dt,
+                    {
+                        "error": str(e) or type(e).__name__,
+                        "error_type": type(e).__name__,
+                    },
+                )
+
+    async def check_health(self) -> Tuple[bool, float, Dict]:
+        return await self._request("/health")
+
+    async def check_predict(self) -> Tuple[bool, float, Dict]:
+        return await self._request("/predict")
+
+    async def probe(
+        self,
+        endpoint: str,
+        planned: float,
+        deadline_seconds: float,
+        image: Optional[Tuple[str, str, bytes, str]] = None,
+    ) -> Dict:
+        """
+        One probe scheduled for loop time `planned`.
+
+        Latency is measured from the planned send time, so waiting for the
+        per-endpoint concurrency limit counts against the service (no
+        coordinated omission). A probe without a response `deadline_seconds`
+        after the planned time is cancelled and reported as a failure.
+        """
+        loop = asyncio.get_running_loop()
+        service_ms = None
+        try:
+            ok, service_ms, body = await asyncio.wait_for(
+                self._request(endpoint, image),
+                timeout=max(0.0, planned + deadline_seconds - loop.time()),
+            )
+        except asyncio.TimeoutError:
+            ok = False
+            body = {
+                "error": f"no response {deadline_seconds}s after planned send",
+                "error_type": "deadline",
+            }
+        return {
+            "endpoint": endpoint,
+            "ok": ok,
+            "latency_ms": (loop.time() - planned) * 1000.0,
+            "service_ms": service_ms,
+            "ts": time.time(),
+            "body": body,
+        }
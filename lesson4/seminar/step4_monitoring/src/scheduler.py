@@ -0,0 +1,109 @@
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from .prober import AsyncProber
+
+
+def plan_slots(probe_mix: Dict[str, int], interval: float) -> List[Tuple[float, str]]:
+    # (offset within the interval, endpoint); each endpoint evenly spaced,
+    # endpoints interleaved so their probes do not fire at the same instant
+    slots = []
+    active = [(ep, n) for ep, n in probe_mix.items() if n > 0]
+    for i, (endpoint, count) in enumerate(active):
+        period = interval / count
+        shift = period * i / len(active)
+        slots.extend((shift + k * period, endpoint) for k in range(count))
+    return sorted(slots)
+
+
+class FixedRateScheduler:
+    """
+    Fires probes at planned timestamps, independent of outstanding requests.
+
+    A slow or stalled service does not slow the probe rate down: every slot
+    is sent on time (or waits for a concurrency permit with the clock
+    running). A slot is reported as missed when it cannot be sent at all:
+    the event loop woke up more than one period late, or `max_outstanding`
+    probes to that endpoint are already in flight. Slots missed because the
+    service is slow (`max_outstanding`) are recorded as failed probes with
+    latency equal to the deadline, so they raise the tail instead of
+    silently disappearing. A late event loop is the monitor's own lag, not a
+    service failure: those slots are only counted in `missed`.
+    """
+
+    def __init__(
+        self,
+        prober: AsyncProber,
+        probe_mix: Dict[str, int],
+        interval: float,
+        deadline_seconds: float,
+        max_outstanding: int = 10,
+    ):
+        self.prober = prober
+        self.interval = interval
+        self.deadline = deadline_seconds
+        self.max_outstanding = max_outstanding
+        self.slots = plan_slots(probe_mix, interval)
+        self.late_tolerance = interval / max(1, len(self.slots))
+        self.outstanding: Counter = Counter()
+        self.missed: Counter = Counter()
+        self._results: List[Dict] = []
+        self._tasks: set = set()
+
+    def drain(self) -> Tuple[List[Dict], Dict[str, int]]:
+        # results completed and slots missed since the previous drain
+        results, self._results = self._results, []
+        missed, self.missed = dict(self.missed), Counter()
+        return results, missed
+
+    def _miss(self, endpoint: str, reason: str):
+        self.missed[endpoint] += 1
+        self._results.append(
+            {
+                "endpoint": endpoint,
+                "ok": False,
+                "latency_ms": self.deadline * 1000.0,
+                "service_ms": None,
+                "ts": time.time(),
+                "body": {"error": f"missed slot: {reason}"},
+                "missed": True,
+            }
+        )
+
+    def _done(self, endpoint: str, task: asyncio.Task):
+        self.outstanding[endpoint] -= 1
+        self._tasks.discard(task)
+        if not task.cancelled():
+            self._results.append(task.result())
+
+    async def run(self, start: float):
+        loop = asyncio.get_running_loop()
+        cycle_start = start
+        try:
+            while True:
+                for offset, endpoint in self.slots:
+                    planned = cycle_start + offset
+                    delay = planned - loop.time()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+
+                    if loop.time() - planned > self.late_tolerance:
+                        # monitor lag: counted, but not held against the service
+                        self.missed[endpoint] += 1
+                        continue
+                    if self.outstanding[endpoint] >= self.max_outstanding:
+                        self._miss(endpoint, f"{self.max_outstanding} probes in flight")
+                        continue
+
+                    self.outstanding[endpoint] += 1
+                    task = asyncio.create_task(
+                        self.prober.probe(endpoint, planned, self.deadline)
+                    )
+                    self._tasks.add(task)
+                    task.add_done_callback(lambda t, ep=endpoint: self._done(ep, t))
+                cycle_start += self.interval
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
@@ -0,0 +1,177 @@
+import math
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from .config import ScrapeCfg
+
+_SAMPLE_RE = re.compile(
+    r"^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})?\s+(?P<value>\S+)"
+)
+_LABEL_RE = re.compile(r'(?P<key>[a-zA-Z_][a-zA-Z0-9_]*)="(?P<value>(?:[^"\\]|\\.)*)"')
+
+
+def parse_prometheus(text: str) -> List[Tuple[str, Dict[str, str], float]]:
+    # (metric name, labels, value) for every sample line of a text exposition
+    samples = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        m = _SAMPLE_RE.match(line)
+        if not m:
+            continue
+        labels = {
+            lm.group("key"): lm.group("value")
+            .replace('\\"', '"')
+            .replace("\\n", "\n")
+            .replace("\\\\", "\\")
+            for lm in _LABEL_RE.finditer(m.group("labels") or "")
+        }
+        try:
+            value = float(m.group("value").replace("+Inf", "inf"))
+        except ValueError:
+            continue
+        samples.append((m.group("name"), labels, value))
+    return samples
+
+
+def histogram_quantile(q: float, buckets: List[Tuple[float, float]]) -> float:
+    """
+    Quantile from cumulative (upper bound, count) buckets, linear inside a
+    bucket, same as PromQL histogram_quantile. Result is in bucket units.
+    """
+    buckets = sorted(buckets)
+    if not buckets or buckets[-1][1] <= 0:
+        return 0.0
+    rank = q * buckets[-1][1]
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if math.isinf(bound):
+                return prev_bound  # tail beyond the last finite bucket
+            if count == prev_count:
+                return bound
+            return prev_bound + (bound - prev_bound) * (rank - prev_count) / (
+                count - prev_count
+            )
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+class _Totals:
+    # cumulative counters of one endpoint at one scrape
+    __slots__ = ("requests", "errors", "buckets", "sum_s")
+
+    def __init__(self):
+        self.requests = 0.0
+        self.errors = 0.0
+        self.buckets: Dict[float, float] = {}
+        self.sum_s = 0.0
+
+
+class PrometheusScraper:
+    """
+    Scrapes the service's Prometheus /metrics and turns counters into windows.
+
+    Counters are cumulative, so stats for a window are the difference between
+    the latest scrape and the oldest scrape inside that window (as PromQL
+    rate()/increase() do). A counter that went down means the service
+    restarted; the series is reset instead of producing negative deltas.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        cfg: ScrapeCfg,
+        windows: Optional[Dict[str, int]] = None,
+    ):
+        self.client = client
+        self.url = f"{base_url}{cfg.path}"
+        self.cfg = cfg
+        self.windows = windows or {"1m": 60, "5m": 300, "15m": 900}
+        self._history: deque = deque()  # (ts, {endpoint: _Totals})
+
+    def _totals(self, text: str) -> Dict[str, _Totals]:
+        totals: Dict[str, _Totals] = {}
+        duration = self.cfg.duration_metric
+        for name, labels, value in parse_prometheus(text):
+            endpoint = labels.get("endpoint")
+            if endpoint not in self.cfg.endpoints:
+                continue
+            t = totals.setdefault(endpoint, _Totals())
+            if name == self.cfg.requests_metric:
+                t.requests += value
+                if labels.get("status", "").startswith("5"):
+                    t.errors += value
+            elif name == f"{duration}_bucket":
+                bound = float(labels["le"].replace("+Inf", "inf"))
+                t.buckets[bound] = t.buckets.get(bound, 0.0) + value
+            elif name == f"{duration}_sum":
+                t.sum_s += value
+        return totals
+
+    async def scrape(self, now: Optional[float] = None):
+        r = await self.client.get(self.url)
+        r.raise_for_status()
+        self.ingest(r.text, time.time() if now is None else now)
+
+    def ingest(self, text: str, now: float):
+        totals = self._totals(text)
+        if self._history:
+            last = self._history[-1][1]
+            if any(
+                ep in last and t.requests < last[ep].requests
+                for ep, t in totals.items()
+            ):
+                self._history.clear()  # counter reset: service restarted
+        self._history.append((now, totals))
+        horizon = now - max(self.windows.values())
+        # keep one scrape at/before the horizon as the base of the widest window
+        while len(self._history) > 1 and self._history[1][0] <= horizon:
+            self._history.popleft()
+
+    def _base(self, now: float, seconds: int):
+        # oldest scrape still inside the window (or the latest before it)
+        base = None
+        for ts, totals in self._history:
+            if ts <= now - seconds or base is None:
+                base = (ts, totals)
+            else:
+                break
+        return base
+
+    def snapshots(self) -> Dict[str, Dict[str, Dict]]:
+        """endpoint -> window -> stats, same keys as SlidingWindowStats"""
+        if len(self._history) < 2:
+            return {}
+        now, latest = self._history[-1]
+        result: Dict[str, Dict[str, Dict]] = {}
+        for window, seconds in self.windows.items():
+            base_ts, base = self._base(now, seconds)
+            elapsed = max(now - base_ts, 1e-9)
+            for endpoint, cur in latest.items():
+                prev = base.get(endpoint, _Totals())
+                count = cur.requests - prev.requests
+                errors = cur.errors - prev.errors
+                buckets = [
+                    (bound, n - prev.buckets.get(bound, 0.0))
+                    for bound, n in cur.buckets.items()
+                ]
+                sum_ms = (cur.sum_s - prev.sum_s) * 1000.0
+                result.setdefault(f"server:{endpoint}", {})[window] = {
+                    "count": int(count),
+                    "errors": int(errors),
+                    "error_rate_percent": 100.0 * errors / count if count else 0.0,
+                    "rate_rps": count / elapsed,
+                    "avg_ms": sum_ms / count if count else 0.0,
+                    "p50_ms": 1000.0 * histogram_quantile(0.50, buckets),
+                    "p95_ms": 1000.0 * histogram_quantile(0.95, buckets),
+                    "p99_ms": 1000.0 * histogram_quantile(0.99, buckets),
+                    "max_ms": None,  # not observable from a histogram
+                }
+        return result
@@ -0,0 +1,156 @@
+import math
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# log-spaced latency buckets: 2% relative precision from 0.1 ms to 10 min
+_LOWEST_MS = 0.1
+_HIGHEST_MS = 600_000.0
+_LOG_BASE = math.log1p(0.02)
+NUM_BUCKETS = int(math.log(_HIGHEST_MS / _LOWEST_MS) / _LOG_BASE) + 1
+
+WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+
+def bucket_index(latency_ms: float) -> int:
+    latency_ms = min(max(latency_ms, _LOWEST_MS), _HIGHEST_MS)
+    return int(math.log(latency_ms / _LOWEST_MS) / _LOG_BASE)
+
+
+def bucket_value(index: int) -> float:
+    # upper bound of the bucket, so reported quantiles never under-estimate
+    return _LOWEST_MS * math.exp((index + 1) * _LOG_BASE)
+
+
+def quantile_from_counts(counts: List[int], total: int, q: float) -> float:
+    if total <= 0:
+        return 0.0
+    rank = max(1, math.ceil(q * total))
+    seen = 0
+    for idx, n in enumerate(counts):
+        seen += n
+        if seen >= rank:
+            return bucket_value(idx)
+    return bucket_value(len(counts) - 1)
+
+
+class _Slot:
+    __slots__ = ("start", "buckets", "count", "errors", "sum_ms", "max_ms")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.buckets: Dict[int, int] = {}  # sparse: few samples per slot
+        self.count = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+
+class _Aggregate:
+    __slots__ = ("counts", "count", "errors", "sum_ms")
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+
+
+class SlidingWindowStats:
+    """
+    Streaming latency/error statistics over sliding 1/5/15-minute windows.
+
+    Samples land in a log-bucket histogram (HDR-style, 2% precision), so
+    recording is O(1) and memory does not grow with traffic. Time is split
+    into fixed slots; each window keeps a running aggregate to which new
+    samples are added and from which expired slots are subtracted.
+    """
+
+    def __init__(self, slot_seconds: int = 10, windows: Optional[Dict] = None):
+        self.slot_seconds = slot_seconds
+        self.windows = {
+            name: max(1, seconds // slot_seconds)
+            for name, seconds in (windows or WINDOWS).items()
+        }
+        self.max_slots = max(self.windows.values())
+        self._slots: deque = deque()
+        self._agg = {name: _Aggregate() for name in self.windows}
+
+    def _slot_start(self, now: float) -> float:
+        return now - (now % self.slot_seconds)
+
+    def _advance(self, now: float):
+        start = self._slot_start(now)
+        if self._slots and self._slots[-1].start >= start:
+            return
+
+        if self._slots and start - self._slots[-1].start >= (
+            self.max_slots * self.slot_seconds
+        ):
+            # idle for longer than the largest window: everything expired
+            self._slots.clear()
+            self._agg = {name: _Aggregate() for name in self.windows}
+
+        next_start = self._slots[-1].start + self.slot_seconds if self._slots else start
+        while next_start <= start:
+            self._slots.append(_Slot(next_start))
+            for name, n_slots in self.windows.items():
+                if len(self._slots) > n_slots:
+                    self._subtract(name, self._slots[-(n_slots + 1)])
+            if len(self._slots) > self.max_slots:
+                self._slots.popleft()
+            next_start += self.slot_seconds
+
+    def _subtract(self, name: str, slot: _Slot):
+        agg = self._agg[name]
+        for idx, n in slot.buckets.items():
+            agg.counts[idx] -= n
+        agg.count -= slot.count
+        agg.errors -= slot.errors
+        agg.sum_ms -= slot.sum_ms
+
+    def record(self, latency_ms: float, ok: bool, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._advance(now)
+
+        slot = self._slots[-1]
+        idx = bucket_index(latency_ms)
+        slot.buckets[idx] = slot.buckets.get(idx, 0) + 1
+        slot.count += 1
+        slot.sum_ms += latency_ms
+        slot.max_ms = max(slot.max_ms, latency_ms)
+        if not ok:
+            slot.errors += 1
+
+        for agg in self._agg.values():
+            agg.counts[idx] += 1
+            agg.count += 1
+            agg.sum_ms += latency_ms
+            if not ok:
+                agg.errors += 1
+
+    def quantile(self, window: str, q: float, now: Optional[float] = None) -> float:
+        self._advance(time.time() if now is None else now)
+        agg = self._agg[window]
+        return quantile_from_counts(agg.counts, agg.count, q)
+
+    def snapshot(self, window: str, now: Optional[float] = None) -> Dict:
+        self._advance(time.time() if now is None else now)
+        agg = self._agg[window]
+        n_slots = self.windows[window]
+        recent: List[_Slot] = list(self._slots)[-n_slots:]
+        max_ms = max((slot.max_ms for slot in recent), default=0.0)
+        return {
+            "count": agg.count,
+            "errors": agg.errors,
+            "error_rate_percent": 100.0 * agg.errors / agg.count if agg.count else 0.0,
+            "avg_ms": agg.sum_ms / agg.count if agg.count else 0.0,
+            "p50_ms": min(quantile_from_counts(agg.counts, agg.count, 0.50), max_ms),
+            "p95_ms": min(quantile_from_counts(agg.counts, agg.count, 0.95), max_ms),
+            "p99_ms": min(quantile_from_counts(agg.counts, agg.count, 0.99), max_ms),
+            "max_ms": max_ms,
+        }
+
+    def snapshots(self, now: Optional[float] = None) -> Dict[str, Dict]:
+        now = time.time() if now is None else now
+        return {window: self.snapshot(window, now) for window in self.windows}
@@ -0,0 +1,230 @@
+"""On-disk cache of Forest Cover Type train/val/test splits."""
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sklearn.datasets import fetch_covtype
+from sklearn.model_selection import train_test_split
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = os.environ.get("DATASET_CACHE_DIR", "data_cache")
+
+# Candidate storage dtypes for features, narrowest first
+FEATURE_DTYPES = ("uint8", "int8", "uint16", "int16", "int32", "float32")
+
+# Read-only memory maps already opened by this process, per cache entry
+_OPEN_SPLITS: Dict[Tuple[str, str], Dict[str, np.ndarray]] = {}
+
+
+def column_dtypes(X: np.ndarray) -> List[str]:
+    """Find the narrowest dtype holding every value of each column exactly.
+
+    Args:
+        X: Feature matrix
+
+    Returns:
+        Dtype name per column (the column's own dtype if nothing narrower fits)
+    """
+    dtypes = []
+    for j in range(X.shape[1]):
+        column = X[:, j]
+        for dtype in FEATURE_DTYPES:
+            if np.array_equal(column.astype(dtype), column):
+                dtypes.append(dtype)
+                break
+        else:
+            dtypes.append(str(column.dtype))
+    return dtypes
+
+
+def compact_features(X: np.ndarray) -> np.ndarray:
+    """Downcast a feature matrix to the narrowest lossless common dtype.
+
+    A 2-D array has a single dtype, so the whole matrix gets the narrowest
+    type that holds every column (e.g. one-hot ``uint8`` columns next to
+    signed distances give ``int16``). Values are unchanged, so models see
+    exactly the same features as with the original ``float64`` matrix.
+
+    Args:
+        X: Feature matrix
+
+    Returns:
+        Feature matrix in the compact dtype (``X`` itself if nothing is gained)
+    """
+    for dtype in FEATURE_DTYPES:
+        if np.dtype(dtype).itemsize >= X.dtype.itemsize:
+            break
+        compact = X.astype(dtype)
+        if np.array_equal(compact, X):
+            return compact
+    return X
+
+
+def memory_report(arrays: Dict[str, Optional[np.ndarray]]) -> Dict[str, Any]:
+    """Summarize the memory held by feature arrays.
+
+    Args:
+        arrays: Mapping of array name to array (None entries are skipped)
+
+    Returns:
+        Dictionary with size in MB per array, the total, and the total the
+        same arrays would take as ``float64``
+    """
+    sizes = {
+        name: array.nbytes / 2**20
+        for name, array in arrays.items()
+        if array is not None
+    }
+    float64_mb = sum(
+        array.size * 8 / 2**20 for array in arrays.values() if array is not None
+    )
+    total_mb = sum(sizes.values())
+    return {
+        "arrays_mb": {name: round(mb, 2) for name, mb in sizes.items()},
+        "total_mb": round(total_mb, 2),
+        "float64_mb": round(float64_mb, 2),
+        "saved_ratio": round(1 - total_mb / float64_mb, 4) if float64_mb else 0.0,
+    }
+
+
+def cache_key(random_seed: int, test_size: float, val_size: Optional[float]) -> str:
+    """Build the cache directory name for a split configuration.
+
+    Args:
+        random_seed: Seed passed to ``train_test_split``
+        test_size: Fraction of the full dataset used for test
+        val_size: Fraction of the remaining data used for validation,
+            or None when there is no validation split
+
+    Returns:
+        Directory name unique for the split parameters
+    """
+    val = "none" if val_size is None else f"{val_size:g}"
+    return f"covtype_v{CACHE_VERSION}_seed{random_seed}_test{test_size:g}_val{val}"
+
+
+def _split_covtype(
+    random_seed: int, test_size: float, val_size: Optional[float]
+) -> Dict[str, np.ndarray]:
+    covtype = fetch_covtype()
+    X, y = covtype.data, covtype.target
+
+    dtypes = Counter(column_dtypes(X))
+    X = compact_features(X)
+    logger.info(f"Feature dtypes per column: {dict(dtypes)}")
+    logger.info(f"Features stored as {X.dtype}")
+
+    X_temp, X_test, y_temp, y_test = train_test_split(
+        X, y, test_size=test_size, random_state=random_seed, stratify=y
+    )
+    if val_size is None:
+        return {
+            "X_train": X_temp,
+            "y_train": y_temp,
+            "X_test": X_test,
+            "y_test": y_test,
+        }
+
+    X_train, X_val, y_train, y_val = train_test_split(
+        X_temp, y_temp, test_size=val_size, random_state=random_seed, stratify=y_temp
+    )
+    return {
+        "X_train": X_train,
+        "y_train": y_train,
+        "X_val": X_val,
+        "y_val": y_val,
+        "X_test": X_test,
+        "y_test": y_test,
+    }
+
+
+def _write_cache(path: Path, arrays: Dict[str, np.ndarray], meta: Dict) -> None:
+    # Write into a private temporary directory and rename it into place, so a
+    # concurrent reader never sees a half-written cache entry.
+    tmp = path.parent / f".{path.name}.{uuid.uuid4().hex}.tmp"
+    tmp.mkdir(parents=True)
+    try:
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(array))
+        with open(tmp / "meta.json", "w") as f:
+            json.dump(meta, f, indent=2)
+        os.rename(tmp, path)
+    except OSError:
+        if not path.exists():
+            raise
+        # Another process finished the same entry first; keep theirs.
+        logger.info(f"Dataset cache {path} was created concurrently")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_covtype_splits(
+    random_seed: int = 42,
+    test_size: float = 0.2,
+    val_size: Optional[float] = 0.2,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    mmap_mode: Optional[str] = "r",
+) -> Dict[str, np.ndarray]:
+    """Load Forest Cover Type splits, building the cache on first use.
+
+    The first call downloads/parses the dataset, downcasts the features to a
+    compact lossless dtype, runs the stratified splits and stores every split
+    as a ``.npy`` file. Later calls with the same
+    parameters open those files with ``mmap_mode``, so they neither re-run
+    ``train_test_split`` nor copy the arrays into memory up front. Read-only
+    maps are opened once per process and the same arrays are returned on
+    later calls.
+
+    Args:
+        random_seed: Seed passed to ``train_test_split``
+        test_size: Fraction of the full dataset used for test
+        val_size: Fraction of the remaining data used for validation,
+            or None to return only train/test
+        cache_dir: Directory holding cache entries
+        mmap_mode: Mode passed to ``np.load`` (None loads into memory)
+
+    Returns:
+        Dictionary with ``X_train``, ``y_train``, ``X_test``, ``y_test`` and,
+        when ``val_size`` is set, ``X_val`` and ``y_val``
+    """
+    path = Path(cache_dir) / cache_key(random_seed, test_size, val_size)
+
+    key = (str(path.resolve()), mmap_mode)
+    if mmap_mode == "r" and key in _OPEN_SPLITS:
+        return dict(_OPEN_SPLITS[key])
+
+    if not (path / "meta.json").exists():
+        logger.info(f"Dataset cache miss, building {path}...")
+        arrays = _split_covtype(random_seed, test_size, val_size)
+        meta = {
+            "version": CACHE_VERSION,
+            "random_seed": random_seed,
+            "test_size": test_size,
+            "val_size": val_size,
+            "shapes": {name: list(a.shape) for name, a in arrays.items()},
+            "dtypes": {name: str(a.dtype) for name, a in arrays.items()},
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_cache(path, arrays, meta)
+    else:
+        logger.info(f"Dataset cache hit: {path}")
+
+    with open(path / "meta.json") as f:
+        meta = json.load(f)
+
+    splits = {
+        name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode)
+        for name in meta["shapes"]
+    }
+    if mmap_mode == "r":
+        _OPEN_SPLITS[key] = splits
+    return dict(splits)
@@ -15,9 +15,8 @@ from pathlib import Path
 
 import numpy as np
 from catboost import CatBoostClassifier
-from sklearn.datasets import fetch_covtype
+from dataset_cache import load_covtype_splits
 from sklearn.metrics import accuracy_score, classification_report, f1_score
-from sklearn.model_selection import train_test_split
 
 
 def create_directories():
@@ -30,16 +29,15 @@ def load_and_prepare_data():
     """Load Forest Cover Type dataset and prepare train/test splits."""
     print("Loading Forest Cover Type dataset...")
 
-    covtype = fetch_covtype()
-    X, y = covtype.data, covtype.target
+    splits = load_covtype_splits(random_seed=42, test_size=0.2, val_size=None)
+    X_train, y_train = splits["X_train"], splits["y_train"]
+    X_test, y_test = splits["X_test"], splits["y_test"]
 
-    print(f"Dataset shape: {X.shape}")
-    print(f"Number of classes: {len(np.unique(y))}")
-    print(f"Classes: {np.unique(y)}")
-
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    classes = np.unique(np.concatenate([y_train, y_test]))
+    print(f"Dataset shape: {(len(X_train) + len(X_test), X_train.shape[1])}")
+    print(f"Number of classes: {len(classes)}")
+    print(f"Classes: {classes}")
+    print(f"Feature dtype: {X_train.dtype} ({X_train.nbytes / 2**20:.1f} MB train)")
 
     n_samples = int(0.1 * len(X_train))
     X_train_small = X_train[:n_samples]
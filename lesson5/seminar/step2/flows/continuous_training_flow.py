@@ -5,14 +5,18 @@ Continuous Training flow using Prefect and MLflow.
 import logging
 import os
 import sys
+import time
 from pathlib import Path
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
+import numpy as np
 from data_manager import DataManager
+from dataset_cache import DEFAULT_CACHE_DIR
 from mlflow_tracker import MLflowTracker
-from model_trainer import ModelTrainer
+from model_trainer import ModelTrainer, QuantizedPoolCache
 from prefect import flow, task
+from prefect.task_runners import ThreadPoolTaskRunner
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,27 +43,97 @@ def initialize_mlflow_tracker() -> MLflowTracker:
     return tracker
 
 
-@task(name="Train Model Iteration", log_prints=True)
-def train_model_iteration(
+@task(name="Build Quantized Pools", log_prints=True)
+def initialize_pool_cache(data_manager: DataManager) -> QuantizedPoolCache:
+    """Quantize the full training set once for all iterations."""
+    print("Quantizing training data for CatBoost...")
+    pool_cache = QuantizedPoolCache(
+        data_manager.X_train_full, data_manager.y_train_full
+    )
+    print(f"Training data quantized in {pool_cache.build_seconds:.2f}s")
+    return pool_cache
+
+
+def iteration_thread_budgets(
+    train_percentages: list, total_threads: int = None
+) -> list:
+    """Split CPU threads between concurrent iterations by training set size.
+
+    Iterations finish at about the same time when each gets threads in
+    proportion to its share of the total training rows. Every iteration gets
+    one thread and the spare threads are allocated by largest remainder, so
+    the budgets add up to exactly ``total_threads``.
+
+    Args:
+        train_percentages: Fraction of training data of each iteration
+        total_threads: Threads to share (default: CPU count)
+
+    Returns:
+        CatBoost thread_count per iteration. With more iterations than threads
+        every budget is 1 and the caller must run at most ``total_threads``
+        of them at once
+    """
+    total_threads = total_threads or os.cpu_count() or 1
+    n_iterations = len(train_percentages)
+    spare = total_threads - n_iterations
+    if spare <= 0:
+        return [1] * n_iterations
+
+    # Proportional share of each iteration above the one thread it always gets
+    total = sum(train_percentages)
+    weights = [max(0.0, total_threads * p / total - 1) for p in train_percentages]
+    weight_sum = sum(weights)
+    if weight_sum == 0:
+        weights, weight_sum = list(train_percentages), total
+    quotas = [spare * w / weight_sum for w in weights]
+
+    extra = [int(q) for q in quotas]
+    by_remainder = sorted(
+        range(n_iterations), key=lambda i: quotas[i] - extra[i], reverse=True
+    )
+    for i in by_remainder[: spare - sum(extra)]:
+        extra[i] += 1
+    return [1 + e for e in extra]
+
+
+def fit_iteration(
     data_manager: DataManager,
-    tracker: MLflowTracker,
+    trainer: ModelTrainer,
     iteration: int,
     train_percentage: float,
+    previous_model_path: str = None,
+    compare_full_retrain: bool = True,
+    report_quantization: bool = False,
 ) -> dict:
-    """Train model for a specific iteration with given percentage of data."""
-    print(f"Training iteration {iteration} with {train_percentage*100:.0f}% of data...")
-
+    """Train, evaluate and save the model of one CT iteration."""
     X_train, y_train = data_manager.get_incremental_train_data(train_percentage)
     X_val, y_val = data_manager.get_validation_data()
     X_test, y_test = data_manager.get_test_data()
 
-    trainer = ModelTrainer()
+    # Incremental training data is a prefix of the full training set
+    train_indices = np.arange(len(X_train))
 
-    model = trainer.train_model(X_train, y_train)
+    model = trainer.train_model(
+        X_train, y_train, init_model=previous_model_path, indices=train_indices
+    )
+
+    warm_start = {}
+    if trainer.warm_started and compare_full_retrain:
+        warm_start = trainer.compare_with_full_retrain(
+            X_train, y_train, X_val, y_val, indices=train_indices
+        )
 
     val_metrics = trainer.evaluate_model(X_val, y_val, "validation")
     test_metrics = trainer.evaluate_model(X_test, y_test, "test")
 
+    quantization = {}
+    # The baseline re-quantizes the raw arrays, which is exactly the work the
+    # pool cache removes, so it is only measured on request
+    if report_quantization and trainer.pool_cache is not None:
+        quantization = trainer.quantization_report(
+            X_train, y_train, {"validation": (X_val, y_val), "test": (X_test, y_test)}
+        )
+
     model_path = f"models/catboost_model_iter_{iteration:02d}.cbm"
     trainer.save_model(model_path)
 
@@ -69,17 +143,7 @@ def train_model_iteration(
     trainer.save_metrics(val_metrics, str(metrics_dir / "val_metrics.json"))
     trainer.save_metrics(test_metrics, str(metrics_dir / "test_metrics.json"))
 
-    run_id = tracker.log_training_iteration(
-        iteration=iteration,
-        train_size=len(X_train),
-        train_percentage=train_percentage * 100,
-        model_params=trainer.model_params,
-        val_metrics=val_metrics,
-        test_metrics=test_metrics,
-        model=model,
-    )
-
-    result = {
+    return {
         "iteration": iteration,
         "train_percentage": train_percentage,
         "train_size": len(X_train),
@@ -88,57 +152,232 @@ def train_model_iteration(
         "val_f1_macro": val_metrics["f1_macro"],
         "test_f1_macro": test_metrics["f1_macro"],
         "model_path": model_path,
-        "mlflow_run_id": run_id,
+        "warm_started": trainer.warm_started,
+        "train_seconds": trainer.train_seconds,
+        "warm_start": warm_start,
+        "quantization": quantization,
+        "model": model,
+        "model_params": trainer.model_params,
+        "val_metrics": val_metrics,
+        "test_metrics": test_metrics,
     }
 
-    print(f"Iteration {iteration} completed:")
-    print(f"  Train size: {len(X_train)}")
-    print(f"  Val accuracy: {val_metrics['accuracy']:.4f}")
-    print(f"  Test accuracy: {test_metrics['accuracy']:.4f}")
 
+def log_iteration(tracker: MLflowTracker, result: dict) -> dict:
+    """Log a fitted iteration to MLflow and return its summary."""
+    result = dict(result)
+    model = result.pop("model")
+    val_metrics = result.pop("val_metrics")
+    test_metrics = result.pop("test_metrics")
+
+    result["mlflow_run_id"] = tracker.log_training_iteration(
+        iteration=result["iteration"],
+        train_size=result["train_size"],
+        train_percentage=result["train_percentage"] * 100,
+        model_params=result.pop("model_params"),
+        val_metrics=val_metrics,
+        test_metrics=test_metrics,
+        model=model,
+        extra_metrics={**result["warm_start"], **result["quantization"]},
+    )
+    return result
+
+
+def print_iteration(result: dict) -> None:
+    """Print the summary of a fitted iteration."""
+    warm_start = result["warm_start"]
+    quantization = result["quantization"]
+
+    print(f"Iteration {result['iteration']} completed:")
+    print(f"  Train size: {result['train_size']}")
+    print(f"  Val accuracy: {result['val_accuracy']:.4f}")
+    print(f"  Test accuracy: {result['test_accuracy']:.4f}")
+    if warm_start:
+        print(
+            f"  Warm start: {warm_start['warm_start_seconds']:.2f}s vs "
+            f"{warm_start['full_retrain_seconds']:.2f}s full retrain "
+            f"({warm_start['time_saved_percent']:.0f}% saved), "
+            f"val accuracy diff {warm_start['val_accuracy_diff']:+.4f}"
+        )
+    if quantization:
+        print(
+            f"  Quantization: {quantization['pool_seconds']:.3f}s with cached pools "
+            f"vs {quantization['raw_quantize_seconds']:.3f}s from raw arrays"
+        )
+
+
+@task(name="Train Model Iteration", log_prints=True)
+def train_model_iteration(
+    data_manager: DataManager,
+    tracker: MLflowTracker,
+    iteration: int,
+    train_percentage: float,
+    previous_model_path: str = None,
+    warm_start_iterations: int = None,
+    compare_full_retrain: bool = True,
+    pool_cache: QuantizedPoolCache = None,
+    report_quantization: bool = False,
+) -> dict:
+    """Train model for a specific iteration with given percentage of data."""
+    print(f"Training iteration {iteration} with {train_percentage*100:.0f}% of data...")
+
+    trainer = ModelTrainer(
+        warm_start_iterations=warm_start_iterations, pool_cache=pool_cache
+    )
+    result = log_iteration(
+        tracker,
+        fit_iteration(
+            data_manager,
+            trainer,
+            iteration,
+            train_percentage,
+            previous_model_path=previous_model_path,
+            compare_full_retrain=compare_full_retrain,
+            report_quantization=report_quantization,
+        ),
+    )
+    print_iteration(result)
+
+    return result
+
+
+@task(name="Fit Model Iteration", log_prints=True)
+def fit_model_iteration(
+    iteration: int,
+    train_percentage: float,
+    thread_count: int,
+    random_seed: int = 42,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+) -> dict:
+    """Train one independent CT iteration without logging it to MLflow.
+
+    Takes only the split parameters and opens the memory-mapped dataset cache
+    itself, so no arrays are passed (or serialized) as task parameters.
+    """
+    print(
+        f"Training iteration {iteration} with {train_percentage*100:.0f}% of data "
+        f"({thread_count} threads)..."
+    )
+
+    data_manager = DataManager(random_seed=random_seed, cache_dir=cache_dir)
+    data_manager.load_and_split_data()
+
+    trainer = ModelTrainer(
+        model_params={**ModelTrainer().model_params, "thread_count": thread_count}
+    )
+    return fit_iteration(data_manager, trainer, iteration, train_percentage)
+
+
+@task(name="Log Model Iteration", log_prints=True)
+def log_model_iteration(tracker: MLflowTracker, fit_result: dict) -> dict:
+    """Log a fitted CT iteration to MLflow."""
+    result = log_iteration(tracker, fit_result)
+    print_iteration(result)
     return result
 
 
-@flow(name="Continuous Training Pipeline", log_prints=True)
-def continuous_training_pipeline(start_percentage: float = 0.1, iterations: int = 10):
+@flow(
+    name="Continuous Training Pipeline",
+    log_prints=True,
+    task_runner=ThreadPoolTaskRunner(),
+)
+def continuous_training_pipeline(
+    start_percentage: float = 0.1,
+    iterations: int = 10,
+    warm_start_iterations: int = None,
+    quantized_pools: bool = True,
+    report_quantization: bool = False,
+    parallel: bool = False,
+    total_threads: int = None,
+):
     """
     Main Continuous Training pipeline.
 
     Args:
         start_percentage: Starting percentage of training data (default: 0.1 = 10%)
         iterations: Number of training iterations (default: 10)
+        warm_start_iterations: If set, each iteration continues from the previous
+            model and adds this many trees; compared against full retraining
+        quantized_pools: Quantize the training set once and reuse the pools in
+            every iteration instead of passing raw arrays to CatBoost
+        report_quantization: Also time quantizing each iteration's raw arrays
+            to report what the cached pools save. Costs the quantization the
+            cache avoids, so it is off by default
+        parallel: Train all iterations concurrently, each with a share of the
+            CPU threads proportional to its training size; results are logged
+            to MLflow afterwards in iteration order. Not combined with warm
+            start (iterations depend on each other) or quantized pools
+        total_threads: CPU threads shared by parallel iterations
+            (default: CPU count)
     """
     print("Starting Continuous Training Pipeline")
     print(f"Start percentage: {start_percentage*100:.0f}%")
     print(f"Iterations: {iterations}")
     print("=" * 60)
 
+    if parallel and warm_start_iterations:
+        print("Warm start chains iterations, running them sequentially")
+        parallel = False
+
     data_manager = initialize_data_manager()
     tracker = initialize_mlflow_tracker()
+    pool_cache = (
+        initialize_pool_cache(data_manager)
+        if quantized_pools and not parallel
+        else None
+    )
 
     Path("models").mkdir(exist_ok=True)
     Path("metrics").mkdir(exist_ok=True)
 
-    results = []
+    train_percentages = []
     for i in range(1, iterations + 1):
-        train_percentage = start_percentage * i
-
-        if train_percentage > 1.0:
-            train_percentage = 1.0
-
-        result = train_model_iteration(
-            data_manager=data_manager,
-            tracker=tracker,
-            iteration=i,
-            train_percentage=train_percentage,
-        )
-
-        results.append(result)
-
-        if train_percentage >= 1.0:
+        train_percentages.append(min(start_percentage * i, 1.0))
+        if train_percentages[-1] >= 1.0:
             print(f"Reached 100% of training data at iteration {i}")
             break
 
+    start = time.perf_counter()
+    results = []
+    if parallel:
+        total_threads = total_threads or os.cpu_count() or 1
+        thread_counts = iteration_thread_budgets(train_percentages, total_threads)
+        # With more iterations than threads every budget is 1; keep at most
+        # total_threads iterations in flight so the CPU is not oversubscribed
+        max_in_flight = min(len(train_percentages), total_threads)
+
+        def submit(index: int):
+            return fit_model_iteration.submit(
+                iteration=index + 1,
+                train_percentage=train_percentages[index],
+                thread_count=thread_counts[index],
+                random_seed=data_manager.random_seed,
+                cache_dir=data_manager.cache_dir,
+            )
+
+        futures = [submit(index) for index in range(max_in_flight)]
+        # Log in iteration order so MLflow runs keep the sequential step order;
+        # the next iteration is submitted as soon as the oldest one is done
+        for index in range(len(train_percentages)):
+            result = futures[index].result()
+            if len(futures) < len(train_percentages):
+                futures.append(submit(len(futures)))
+            results.append(log_model_iteration(tracker, result))
+    else:
+        for i, train_percentage in enumerate(train_percentages, start=1):
+            result = train_model_iteration(
+                data_manager=data_manager,
+                tracker=tracker,
+                iteration=i,
+                train_percentage=train_percentage,
+                previous_model_path=results[-1]["model_path"] if results else None,
+                warm_start_iterations=warm_start_iterations,
+                pool_cache=pool_cache,
+                report_quantization=report_quantization,
+            )
+            results.append(result)
+    sweep_seconds = time.perf_counter() - start
+
     print("\\n" + "=" * 60)
     print("CONTINUOUS TRAINING SUMMARY")
     print("=" * 60)
@@ -157,6 +396,30 @@ def continuous_training_pipeline(start_percentage: float = 0.1, iterations: int
         f"(Val Acc: {best_result['val_accuracy']:.4f})"
     )
 
+    warm = [r["warm_start"] for r in results if r["warm_start"]]
+    if warm:
+        saved = sum(w["time_saved_seconds"] for w in warm)
+        mean_diff = sum(w["val_accuracy_diff"] for w in warm) / len(warm)
+        print(
+            f"Warm start: {saved:.1f}s saved over {len(warm)} iterations, "
+            f"mean val accuracy diff vs full retrain {mean_diff:+.4f}"
+        )
+
+    train_seconds = [r["train_seconds"] for r in results]
+    print(
+        f"Sweep time: {sweep_seconds:.1f}s "
+        f"(sum of training times {sum(train_seconds):.1f}s, "
+        f"largest iteration {max(train_seconds):.1f}s)"
+    )
+
+    if pool_cache is not None and report_quantization:
+        saved = sum(r["quantization"]["quantize_saved_seconds"] for r in results)
+        print(
+            f"Quantized pools: {saved:.1f}s of quantization saved over "
+            f"{len(results)} iterations, {saved - pool_cache.build_seconds:.1f}s "
+            f"net of the one-time {pool_cache.build_seconds:.1f}s build"
+        )
+
     print("\\nContinuous Training Pipeline completed!")
     print("Check MLflow UI for detailed experiment tracking")
 
@@ -164,6 +427,7 @@ def continuous_training_pipeline(start_percentage: float = 0.1, iterations: int
         "total_iterations": len(results),
         "results": results,
         "best_iteration": best_result,
+        "sweep_seconds": sweep_seconds,
     }
 
 
@@ -203,8 +467,14 @@ if __name__ == "__main__":
             iteration = int(sys.argv[2]) if len(sys.argv) > 2 else 1
             percentage = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
             single_iteration_pipeline(iteration, percentage)
+        elif sys.argv[1] == "parallel":
+            iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+            continuous_training_pipeline(iterations=iterations, parallel=True)
         else:
             iterations = int(sys.argv[1])
-            continuous_training_pipeline(iterations=iterations)
+            warm_start = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            continuous_training_pipeline(
+                iterations=iterations, warm_start_iterations=warm_start
+            )
     else:
         continuous_training_pipeline()
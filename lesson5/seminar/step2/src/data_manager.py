@@ -4,8 +4,7 @@ import logging
 from typing import Any, Dict, Tuple
 
 import numpy as np
-from sklearn.datasets import fetch_covtype
-from sklearn.model_selection import train_test_split
+from dataset_cache import DEFAULT_CACHE_DIR, load_covtype_splits, memory_report
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +12,15 @@ logger = logging.getLogger(__name__)
 class DataManager:
     """Manages data loading and splitting for Continuous Training."""
 
-    def __init__(self, random_seed: int = 42):
+    def __init__(self, random_seed: int = 42, cache_dir: str = DEFAULT_CACHE_DIR):
         """Initialize DataManager.
 
         Args:
             random_seed: Random seed for reproducibility
+            cache_dir: Directory of the on-disk dataset split cache
         """
         self.random_seed = random_seed
+        self.cache_dir = cache_dir
         self.X_train_full = None
         self.X_val = None
         self.X_test = None
@@ -36,32 +37,29 @@ class DataManager:
         """
         logger.info("Loading Forest Cover Type dataset...")
 
-        covtype = fetch_covtype()
-        X, y = covtype.data, covtype.target
-
-        logger.info(f"Dataset shape: {X.shape}")
-        logger.info(f"Number of classes: {len(np.unique(y))}")
-
-        X_temp, self.X_test, y_temp, self.y_test = train_test_split(
-            X, y, test_size=0.2, random_state=self.random_seed, stratify=y
-        )
-
-        self.X_train_full, self.X_val, self.y_train_full, self.y_val = train_test_split(
-            X_temp,
-            y_temp,
+        splits = load_covtype_splits(
+            random_seed=self.random_seed,
             test_size=0.2,
-            random_state=self.random_seed,
-            stratify=y_temp,
+            val_size=0.2,
+            cache_dir=self.cache_dir,
         )
+        self.X_train_full, self.y_train_full = splits["X_train"], splits["y_train"]
+        self.X_val, self.y_val = splits["X_val"], splits["y_val"]
+        self.X_test, self.y_test = splits["X_test"], splits["y_test"]
+
+        y = np.concatenate([self.y_train_full, self.y_val, self.y_test])
+
+        logger.info(f"Dataset shape: {(len(y), self.X_train_full.shape[1])}")
+        logger.info(f"Number of classes: {len(np.unique(y))}")
 
         self._is_loaded = True
 
         dataset_info = {
-            "total_samples": len(X),
+            "total_samples": len(y),
             "train_samples": len(self.X_train_full),
             "val_samples": len(self.X_val),
             "test_samples": len(self.X_test),
-            "features": X.shape[1],
+            "features": self.X_train_full.shape[1],
             "classes": len(np.unique(y)),
             "class_distribution": dict(zip(*np.unique(y, return_counts=True))),
         }
@@ -71,6 +69,12 @@ class DataManager:
         logger.info(f"  Validation: {dataset_info['val_samples']} samples")
         logger.info(f"  Test: {dataset_info['test_samples']} samples")
 
+        report = self.get_memory_report()
+        logger.info(
+            f"Feature memory: {report['total_mb']:.1f} MB as {report['dtype']} "
+            f"(float64: {report['float64_mb']:.1f} MB)"
+        )
+
         return dataset_info
 
     def get_incremental_train_data(
@@ -139,3 +143,24 @@ class DataManager:
             "test_samples": len(self.X_test),
             "features": self.X_train_full.shape[1],
         }
+
+    def get_memory_report(self) -> Dict[str, Any]:
+        """Get memory used by the feature arrays.
+
+        Returns:
+            Dictionary with feature dtype, size in MB per array, the total,
+            and the total the same arrays would take as float64
+        """
+        if not self._is_loaded:
+            return {"status": "not_loaded"}
+
+        return {
+            "dtype": str(self.X_train_full.dtype),
+            **memory_report(
+                {
+                    "X_train_full": self.X_train_full,
+                    "X_val": self.X_val,
+                    "X_test": self.X_test,
+                }
+            ),
+        }
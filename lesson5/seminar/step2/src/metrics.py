@@ -0,0 +1,189 @@
+"""Classification metrics computed from a single confusion matrix."""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Largest label range for which the confusion matrix is counted directly by
+# label value; wider or non-integer labels are encoded with np.unique first
+_MAX_DIRECT_LABEL_RANGE = 1024
+
+
+def confusion_matrix(
+    y_true: np.ndarray, y_pred: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Count the confusion matrix in one ``np.bincount`` pass.
+
+    Labels are the sorted union of true and predicted labels, as in sklearn.
+
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels (CatBoost's ``(n, 1)`` output is accepted)
+
+    Returns:
+        Tuple of (labels, matrix) where ``matrix[i, j]`` counts samples of
+        class ``labels[i]`` predicted as ``labels[j]``
+    """
+    y_true = np.asarray(y_true).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+    if len(y_true) != len(y_pred):
+        raise ValueError(
+            f"y_true and y_pred have different lengths: {len(y_true)} != {len(y_pred)}"
+        )
+
+    if len(y_true) and y_true.dtype.kind in "iub" and y_pred.dtype.kind in "iub":
+        low = int(min(y_true.min(), y_pred.min()))
+        n_values = int(max(y_true.max(), y_pred.max())) - low + 1
+        if n_values <= _MAX_DIRECT_LABEL_RANGE:
+            codes = (y_true.astype(np.int64) - low) * n_values + (
+                y_pred.astype(np.int64) - low
+            )
+            matrix = np.bincount(codes, minlength=n_values * n_values).reshape(
+                n_values, n_values
+            )
+            present = (matrix.sum(axis=0) + matrix.sum(axis=1)) > 0
+            labels = np.arange(low, low + n_values)[present].astype(
+                np.result_type(y_true, y_pred)
+            )
+            return labels, matrix[np.ix_(present, present)]
+
+    labels, codes = np.unique(np.concatenate([y_true, y_pred]), return_inverse=True)
+    n_labels = len(labels)
+    codes = codes.ravel()
+    matrix = np.bincount(
+        codes[: len(y_true)] * n_labels + codes[len(y_true) :],
+        minlength=n_labels * n_labels,
+    ).reshape(n_labels, n_labels)
+    return labels, matrix
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    # sklearn's zero_division default: undefined scores count as 0
+    result = np.zeros(len(numerator), dtype=np.float64)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+class ClassificationMetrics:
+    """Accuracy and per-class/averaged precision, recall and F1.
+
+    Every score is derived from one confusion matrix and matches the
+    corresponding ``sklearn.metrics`` function with default arguments.
+    """
+
+    def __init__(self, y_true: np.ndarray, y_pred: np.ndarray):
+        """Count the confusion matrix of the predictions.
+
+        Args:
+            y_true: True labels
+            y_pred: Predicted labels
+        """
+        self.labels, self.confusion_matrix = confusion_matrix(y_true, y_pred)
+
+        true_positives = np.diag(self.confusion_matrix)
+        predicted = self.confusion_matrix.sum(axis=0)
+        self.support = self.confusion_matrix.sum(axis=1)
+        self.samples = int(self.support.sum())
+
+        self.accuracy = (
+            float(true_positives.sum() / self.samples) if self.samples else 0.0
+        )
+        self.precision = _safe_divide(true_positives, predicted)
+        self.recall = _safe_divide(true_positives, self.support)
+        self.f1 = _safe_divide(2 * true_positives, predicted + self.support)
+
+    def average(self, scores: np.ndarray, average: str) -> float:
+        """Average per-class scores.
+
+        Args:
+            scores: Per-class scores (e.g. ``self.f1``)
+            average: "macro" (unweighted) or "weighted" (by support)
+
+        Returns:
+            Averaged score
+        """
+        if average == "macro":
+            return float(scores.mean()) if len(scores) else 0.0
+        if average == "weighted":
+            if not self.samples:
+                return 0.0
+            return float(np.average(scores, weights=self.support))
+        raise ValueError(f"Unknown average: {average}")
+
+    def to_dict(self) -> Dict[str, float]:
+        """Accuracy and macro/weighted precision, recall and F1."""
+        scores = {"accuracy": self.accuracy}
+        for name, values in (
+            ("f1", self.f1),
+            ("precision", self.precision),
+            ("recall", self.recall),
+        ):
+            for average in ("macro", "weighted"):
+                scores[f"{name}_{average}"] = self.average(values, average)
+        return scores
+
+    def report(self, digits: int = 2) -> "ClassificationReport":
+        """Text report in the format of ``sklearn.metrics.classification_report``.
+
+        Args:
+            digits: Number of digits for the scores
+
+        Returns:
+            Report rendered on first ``str()``
+        """
+        return ClassificationReport(self, digits)
+
+    def render_report(self, digits: int = 2) -> str:
+        """Render the text classification report."""
+        headers = ["precision", "recall", "f1-score", "support"]
+        names = [str(label) for label in self.labels]
+        width = max([len(name) for name in names] + [len("weighted avg"), digits])
+
+        head_fmt = "{:>{width}s} " + " {:>9}" * len(headers)
+        row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+        accuracy_fmt = (
+            "{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f} {:>9}\n"
+        )
+
+        text = head_fmt.format("", *headers, width=width) + "\n\n"
+        for row in zip(names, self.precision, self.recall, self.f1, self.support):
+            text += row_fmt.format(*row, width=width, digits=digits)
+        text += "\n"
+        text += accuracy_fmt.format(
+            "accuracy", "", "", self.accuracy, self.samples, width=width, digits=digits
+        )
+        for average in ("macro", "weighted"):
+            text += row_fmt.format(
+                f"{average} avg",
+                self.average(self.precision, average),
+                self.average(self.recall, average),
+                self.average(self.f1, average),
+                self.samples,
+                width=width,
+                digits=digits,
+            )
+        return text
+
+
+class ClassificationReport:
+    """Classification report that is rendered only when converted to ``str``."""
+
+    def __init__(self, metrics: ClassificationMetrics, digits: int = 2):
+        self._metrics = metrics
+        self._digits = digits
+        self._text: Optional[str] = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self._metrics.render_report(self._digits)
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"ClassificationReport(labels={len(self._metrics.labels)})"
+
+
+def accuracy(y_true: np.ndarray, y_pred: np.ndarray) -> float:
+    """Fraction of correct predictions (``accuracy_score``)."""
+    y_true = np.asarray(y_true).ravel()
+    y_pred = np.asarray(y_pred).ravel()
+    return float(np.mean(y_true == y_pred)) if len(y_true) else 0.0
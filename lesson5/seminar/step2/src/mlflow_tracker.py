@@ -120,6 +120,7 @@ class MLflowTracker:
         val_metrics: Dict[str, Any],
         test_metrics: Dict[str, Any],
         model=None,
+        extra_metrics: Optional[Dict[str, float]] = None,
     ) -> str:
         """Log a complete training iteration.
 
@@ -131,6 +132,7 @@ class MLflowTracker:
             val_metrics: Validation metrics
             test_metrics: Test metrics
             model: Trained model (optional)
+            extra_metrics: Additional metrics to log as is (optional)
 
         Returns:
             Run ID
@@ -165,6 +167,9 @@ class MLflowTracker:
             }
             self.log_metrics(test_metrics_prefixed, step=iteration)
 
+            if extra_metrics:
+                self.log_metrics(extra_metrics, step=iteration)
+
             if model is not None:
                 self.log_model(model, f"model_iter_{iteration:02d}")
 
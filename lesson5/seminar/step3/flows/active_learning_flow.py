@@ -10,6 +10,7 @@ from pathlib import Path
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from active_learning import ActiveLearningManager
+from data_handles import ALDataHandle, ModelHandle
 from data_manager import ActiveLearningDataManager
 from mlflow_tracker import MLflowTracker
 from model_trainer import ModelTrainer
@@ -20,25 +21,33 @@ logger = logging.getLogger(__name__)
 
 
 @task(name="Initialize AL Data Manager", log_prints=True)
-def initialize_al_data_manager() -> ActiveLearningDataManager:
-    """Initialize and load data using ActiveLearningDataManager."""
+def initialize_al_data_manager() -> ALDataHandle:
+    """Build the dataset cache and return a handle to it."""
     print("Initializing ActiveLearningDataManager...")
     data_manager = ActiveLearningDataManager(random_seed=42)
     dataset_info = data_manager.load_and_split_data()
 
     print(f"Dataset loaded: {dataset_info}")
-    return data_manager
+    return ALDataHandle(
+        cache_dir=data_manager.cache_dir, random_seed=data_manager.random_seed
+    )
 
 
 @task(name="Initialize AL Manager", log_prints=True)
 def initialize_al_manager(
     uncertainty_strategy: str = "entropy",
+    candidate_confidence: float = None,
+    candidate_quantile: float = 0.05,
 ) -> ActiveLearningManager:
     """Initialize Active Learning manager."""
     print(
         f"Initializing Active Learning manager with {uncertainty_strategy} strategy..."
     )
-    al_manager = ActiveLearningManager(uncertainty_strategy)
+    al_manager = ActiveLearningManager(
+        uncertainty_strategy,
+        candidate_confidence=candidate_confidence,
+        candidate_quantile=candidate_quantile,
+    )
     return al_manager
 
 
@@ -54,14 +63,16 @@ def initialize_mlflow_tracker() -> MLflowTracker:
 
 @task(name="Setup Initial AL", log_prints=True)
 def setup_initial_active_learning(
-    data_manager: ActiveLearningDataManager, initial_percentage: float = 0.1
+    data_handle: ALDataHandle, initial_percentage: float = 0.1
 ) -> dict:
     """Setup initial Active Learning state."""
     print(
         f"Setting up Active Learning with {initial_percentage*100:.0f}% initial data..."
     )
 
+    data_manager = data_handle.open()
     init_info = data_manager.initialize_active_learning(initial_percentage)
+    init_info["data_handle"] = data_handle.save_state(data_manager)
 
     print("Initial setup completed:")
     print(f"  Labeled samples: {init_info['initial_labeled_size']}")
@@ -70,28 +81,69 @@ def setup_initial_active_learning(
     return init_info
 
 
+@task(name="Build Quantized Pools", log_prints=True)
+def initialize_pool_cache(data_handle: ALDataHandle) -> float:
+    """Quantize the full training set once for all AL iterations."""
+    print("Quantizing training data for CatBoost...")
+    pool_cache = data_handle.pool_cache()
+    print(f"Training data quantized in {pool_cache.build_seconds:.2f}s")
+    return pool_cache.build_seconds
+
+
 @task(name="Train AL Model Iteration", log_prints=True)
 def train_al_model_iteration(
-    data_manager: ActiveLearningDataManager,
+    data_handle: ALDataHandle,
     al_manager: ActiveLearningManager,
     tracker: MLflowTracker,
     iteration: int,
-    previous_model_path: str = None,
+    previous_model: ModelHandle = None,
+    warm_start_iterations: int = None,
+    compare_full_retrain: bool = True,
+    quantized_pools: bool = False,
+    report_quantization: bool = False,
 ) -> dict:
     """Train model for Active Learning iteration."""
     print(f"Training Active Learning iteration {iteration}...")
 
+    data_manager = data_handle.open()
+    pool_cache = data_handle.pool_cache() if quantized_pools else None
+
     X_labeled, y_labeled = data_manager.get_labeled_data()
     X_val, y_val = data_manager.get_validation_data()
     X_test, y_test = data_manager.get_test_data()
 
-    trainer = ModelTrainer()
+    labeled_indices = data_manager.labeled_indices
+
+    trainer = ModelTrainer(
+        warm_start_iterations=warm_start_iterations, pool_cache=pool_cache
+    )
 
-    model = trainer.train_model(X_labeled, y_labeled)
+    model = trainer.train_model(
+        X_labeled,
+        y_labeled,
+        init_model=previous_model.path if previous_model else None,
+        indices=labeled_indices,
+    )
+
+    warm_start = {}
+    if trainer.warm_started and compare_full_retrain:
+        warm_start = trainer.compare_with_full_retrain(
+            X_labeled, y_labeled, X_val, y_val, indices=labeled_indices
+        )
 
     val_metrics = trainer.evaluate_model(X_val, y_val, "validation")
     test_metrics = trainer.evaluate_model(X_test, y_test, "test")
 
+    quantization = {}
+    # The baseline re-quantizes the raw arrays, which is exactly the work the
+    # pool cache removes, so it is only measured on request
+    if report_quantization and pool_cache is not None:
+        quantization = trainer.quantization_report(
+            X_labeled,
+            y_labeled,
+            {"validation": (X_val, y_val), "test": (X_test, y_test)},
+        )
+
     model_path = f"models/catboost_model_al_iter_{iteration:02d}.cbm"
     trainer.save_model(model_path)
 
@@ -112,6 +164,7 @@ def train_al_model_iteration(
         val_metrics=val_metrics,
         test_metrics=test_metrics,
         model=model,
+        extra_metrics={**warm_start, **quantization},
     )
 
     result = {
@@ -123,8 +176,12 @@ def train_al_model_iteration(
         "val_f1_macro": val_metrics["f1_macro"],
         "test_f1_macro": test_metrics["f1_macro"],
         "model_path": model_path,
+        "model_handle": ModelHandle(model_path),
         "mlflow_run_id": run_id,
-        "model": model,
+        "warm_started": trainer.warm_started,
+        "train_seconds": trainer.train_seconds,
+        "warm_start": warm_start,
+        "quantization": quantization,
     }
 
     al_manager.update_training_history(iteration, result)
@@ -133,33 +190,47 @@ def train_al_model_iteration(
     print(f"  Labeled size: {len(X_labeled)} ({labeled_percentage:.1f}%)")
     print(f"  Val accuracy: {val_metrics['accuracy']:.4f}")
     print(f"  Test accuracy: {test_metrics['accuracy']:.4f}")
+    if warm_start:
+        print(
+            f"  Warm start: {warm_start['warm_start_seconds']:.2f}s vs "
+            f"{warm_start['full_retrain_seconds']:.2f}s full retrain "
+            f"({warm_start['time_saved_percent']:.0f}% saved), "
+            f"val accuracy diff {warm_start['val_accuracy_diff']:+.4f}"
+        )
+    if quantization:
+        print(
+            f"  Quantization: {quantization['pool_seconds']:.3f}s with cached pools "
+            f"vs {quantization['raw_quantize_seconds']:.3f}s from raw arrays"
+        )
 
     return result
 
 
 @task(name="Select Next AL Batch", log_prints=True)
 def select_next_al_batch(
-    data_manager: ActiveLearningDataManager,
+    data_handle: ALDataHandle,
     al_manager: ActiveLearningManager,
-    model,
+    model_handle: ModelHandle,
     batch_size: int,
 ) -> dict:
     """Select next batch of samples using Active Learning."""
     print(f"Selecting next batch of {batch_size} samples...")
 
+    data_manager = data_handle.open()
     if data_manager.is_pool_empty():
         print("Pool is empty, no more samples to select")
-        return {"samples_selected": 0, "pool_empty": True}
+        return {"samples_selected": 0, "pool_empty": True, "data_handle": data_handle}
 
     X_pool, y_pool = data_manager.get_pool_data()
 
     actual_batch_size = min(batch_size, len(X_pool))
 
     selected_X, selected_y, selected_indices = al_manager.select_next_batch(
-        X_pool, y_pool, model, actual_batch_size
+        X_pool, y_pool, model_handle.load(), actual_batch_size
     )
 
     selection_quality = al_manager.evaluate_selection_quality(selected_y, y_pool)
+    selection_info = al_manager.last_selection_info
 
     update_info = data_manager.add_samples_to_labeled_set(selected_indices)
 
@@ -167,9 +238,22 @@ def select_next_al_batch(
         "samples_selected": len(selected_indices),
         "pool_empty": False,
         "selection_quality": selection_quality,
+        "selection_info": selection_info,
         "update_info": update_info,
+        "data_handle": data_handle.save_state(data_manager),
     }
 
+    print(
+        f"Scored {selection_info['candidates_scored']} of "
+        f"{selection_info['pool_size']} pool samples, estimated overlap with "
+        f"full-pool selection: {selection_info['expected_overlap']:.1%}"
+    )
+    if "candidate_quantile" in selection_info:
+        print(
+            f"  With {selection_info['candidate_confidence']:.0%} confidence all "
+            f"selected samples are in the top "
+            f"{selection_info['candidate_quantile']:.1%} of the pool"
+        )
     print(f"Selected {len(selected_indices)} samples:")
     print(f"  New labeled size: {update_info['new_labeled_size']}")
     print(f"  Remaining pool size: {update_info['new_pool_size']}")
@@ -184,6 +268,11 @@ def active_learning_pipeline(
     batch_size: int = 1000,
     max_iterations: int = 10,
     uncertainty_strategy: str = "entropy",
+    candidate_confidence: float = None,
+    candidate_quantile: float = 0.05,
+    warm_start_iterations: int = None,
+    quantized_pools: bool = True,
+    report_quantization: bool = False,
 ):
     """
     Main Active Learning pipeline.
@@ -193,6 +282,16 @@ def active_learning_pipeline(
         batch_size: Size of each AL batch (default: 10% of remaining data)
         max_iterations: Maximum number of AL iterations
         uncertainty_strategy: Uncertainty sampling strategy
+        candidate_confidence: If set, score only a random candidate subset of
+            the pool (see ActiveLearningManager)
+        candidate_quantile: Target top fraction of the pool for candidates
+        warm_start_iterations: If set, each iteration continues from the previous
+            model and adds this many trees; compared against full retraining
+        quantized_pools: Quantize the training set once and train every
+            iteration on a pool sliced by the labeled indices
+        report_quantization: Also time quantizing each iteration's raw arrays
+            to report what the cached pools save. Costs the quantization the
+            cache avoids, so it is off by default
     """
     print("Starting Active Learning Pipeline")
     print(f"Initial percentage: {initial_percentage*100:.0f}%")
@@ -200,14 +299,18 @@ def active_learning_pipeline(
     print(f"Uncertainty strategy: {uncertainty_strategy}")
     print("=" * 60)
 
-    data_manager = initialize_al_data_manager()
-    al_manager = initialize_al_manager(uncertainty_strategy)
+    data_handle = initialize_al_data_manager()
+    al_manager = initialize_al_manager(
+        uncertainty_strategy, candidate_confidence, candidate_quantile
+    )
     tracker = initialize_mlflow_tracker()
+    pool_build_seconds = initialize_pool_cache(data_handle) if quantized_pools else None
 
     Path("models").mkdir(exist_ok=True)
     Path("metrics").mkdir(exist_ok=True)
 
-    init_info = setup_initial_active_learning(data_manager, initial_percentage)
+    init_info = setup_initial_active_learning(data_handle, initial_percentage)
+    data_handle = init_info["data_handle"]
 
     if batch_size <= 0:
         batch_size = max(1000, int(0.1 * init_info["initial_pool_size"]))
@@ -221,23 +324,27 @@ def active_learning_pipeline(
         print(f"\n--- Active Learning Iteration {iteration} ---")
 
         train_result = train_al_model_iteration(
-            data_manager=data_manager,
+            data_handle=data_handle,
             al_manager=al_manager,
             tracker=tracker,
             iteration=iteration,
-            previous_model_path=current_model,
+            previous_model=current_model,
+            warm_start_iterations=warm_start_iterations,
+            quantized_pools=quantized_pools,
+            report_quantization=report_quantization,
         )
 
         results.append(train_result)
-        current_model = train_result["model"]
+        current_model = train_result["model_handle"]
 
         if iteration < max_iterations:
             selection_result = select_next_al_batch(
-                data_manager=data_manager,
+                data_handle=data_handle,
                 al_manager=al_manager,
-                model=current_model,
+                model_handle=current_model,
                 batch_size=batch_size,
             )
+            data_handle = selection_result["data_handle"]
 
             if selection_result["pool_empty"]:
                 print(f"Pool exhausted at iteration {iteration}")
@@ -265,6 +372,23 @@ def active_learning_pipeline(
         f"(Val Acc: {best_result['val_accuracy']:.4f})"
     )
 
+    warm = [r["warm_start"] for r in results if r["warm_start"]]
+    if warm:
+        saved = sum(w["time_saved_seconds"] for w in warm)
+        mean_diff = sum(w["val_accuracy_diff"] for w in warm) / len(warm)
+        print(
+            f"Warm start: {saved:.1f}s saved over {len(warm)} iterations, "
+            f"mean val accuracy diff vs full retrain {mean_diff:+.4f}"
+        )
+
+    if pool_build_seconds is not None and report_quantization:
+        saved = sum(r["quantization"]["quantize_saved_seconds"] for r in results)
+        print(
+            f"Quantized pools: {saved:.1f}s of quantization saved over "
+            f"{len(results)} iterations, {saved - pool_build_seconds:.1f}s "
+            f"net of the one-time {pool_build_seconds:.1f}s build"
+        )
+
     training_summary = al_manager.get_training_summary()
 
     print("\nActive Learning completed!")
@@ -280,7 +404,7 @@ def active_learning_pipeline(
         "results": results,
         "best_iteration": best_result,
         "training_summary": training_summary,
-        "final_data_info": data_manager.get_data_info(),
+        "final_data_info": data_handle.open().get_data_info(),
     }
 
 
@@ -302,17 +426,17 @@ def single_al_iteration_pipeline(
         f"Running single AL iteration {iteration} with {initial_percentage*100:.0f}% initial data"
     )
 
-    data_manager = initialize_al_data_manager()
+    data_handle = initialize_al_data_manager()
     al_manager = initialize_al_manager(uncertainty_strategy)
     tracker = initialize_mlflow_tracker()
 
     Path("models").mkdir(exist_ok=True)
     Path("metrics").mkdir(exist_ok=True)
 
-    setup_initial_active_learning(data_manager, initial_percentage)
+    init_info = setup_initial_active_learning(data_handle, initial_percentage)
 
     result = train_al_model_iteration(
-        data_manager=data_manager,
+        data_handle=init_info["data_handle"],
         al_manager=al_manager,
         tracker=tracker,
         iteration=iteration,
@@ -332,8 +456,17 @@ if __name__ == "__main__":
         else:
             max_iters = int(sys.argv[1])
             strategy = sys.argv[2] if len(sys.argv) > 2 else "entropy"
+            confidence = (
+                float(sys.argv[3])
+                if len(sys.argv) > 3 and sys.argv[3] != "none"
+                else None
+            )
+            warm_start = int(sys.argv[4]) if len(sys.argv) > 4 else None
             active_learning_pipeline(
-                max_iterations=max_iters, uncertainty_strategy=strategy
+                max_iterations=max_iters,
+                uncertainty_strategy=strategy,
+                candidate_confidence=confidence,
+                warm_start_iterations=warm_start,
             )
     else:
         active_learning_pipeline()
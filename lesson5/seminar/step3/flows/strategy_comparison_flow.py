@@ -0,0 +1,179 @@
+"""
+Parallel comparison of Active Learning strategies using Prefect and MLflow.
+"""
+
+import logging
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from data_manager import ActiveLearningDataManager
+from experiment_runner import (
+    STRATEGIES,
+    build_experiment_configs,
+    format_comparison_table,
+    run_experiments,
+    save_comparison_csv,
+    summarize_results,
+    worker_thread_budget,
+)
+from mlflow_tracker import MLflowTracker
+from prefect import flow, task
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@task(name="Prepare Dataset Cache", log_prints=True)
+def prepare_dataset_cache(random_seed: int = 42) -> dict:
+    """Build the dataset cache once so workers only open it."""
+    print("Preparing dataset cache for workers...")
+    data_manager = ActiveLearningDataManager(random_seed=random_seed)
+    dataset_info = data_manager.load_and_split_data()
+
+    print(f"Dataset cache ready: {data_manager.cache_dir}")
+    return dataset_info
+
+
+@task(name="Run Strategy Experiments", log_prints=True)
+def run_strategy_experiments(configs: list, n_workers: int) -> list:
+    """Run all (strategy, seed) experiments in worker processes."""
+    print(
+        f"Running {len(configs)} experiments on {n_workers} workers "
+        f"({configs[0]['thread_count']} CatBoost threads each)..."
+    )
+    results = run_experiments(configs, n_workers)
+
+    for result in results:
+        print(
+            f"  {result['strategy']:<16} seed {result['seed']}: "
+            f"test acc {result['final_test_accuracy']:.4f} "
+            f"({result['seconds']:.1f}s, pid {result['pid']})"
+        )
+    return results
+
+
+@task(name="Log Strategy Comparison", log_prints=True)
+def log_comparison_to_mlflow(
+    results: list, summary: list, settings: dict, csv_path: str
+) -> str:
+    """Log all experiments as nested runs under one parent run."""
+    tracker = MLflowTracker(experiment_name="active_learning_step3")
+
+    with tracker.start_run(run_name="strategy_comparison") as parent:
+        tracker.log_params(settings)
+        for row in summary:
+            tracker.log_metrics(
+                {
+                    f"{row['strategy']}_{key}": value
+                    for key, value in row.items()
+                    if key not in ("strategy", "runs")
+                }
+            )
+        tracker.log_artifact(csv_path)
+
+        for result in results:
+            with tracker.start_run(
+                run_name=f"al_{result['strategy']}_seed{result['seed']}", nested=True
+            ):
+                tracker.log_params(
+                    {
+                        "strategy": result["strategy"],
+                        "seed": result["seed"],
+                        "thread_count": result["thread_count"],
+                    }
+                )
+                for row in result["history"]:
+                    tracker.log_metrics(row, step=row["iteration"])
+                tracker.log_metrics(
+                    {
+                        "final_val_accuracy": result["final_val_accuracy"],
+                        "final_test_accuracy": result["final_test_accuracy"],
+                        "seconds": result["seconds"],
+                    }
+                )
+
+    print(f"Logged comparison to MLflow run {parent.info.run_id}")
+    return parent.info.run_id
+
+
+@flow(name="AL Strategy Comparison", log_prints=True)
+def strategy_comparison_pipeline(
+    strategies: list = None,
+    seeds: list = None,
+    n_workers: int = None,
+    total_threads: int = None,
+    initial_percentage: float = 0.1,
+    batch_size: int = 1000,
+    max_iterations: int = 10,
+):
+    """
+    Compare uncertainty sampling strategies in parallel.
+
+    Args:
+        strategies: Strategies to compare (default: all supported)
+        seeds: Seeds per strategy for CatBoost and candidate sampling
+        n_workers: Worker processes (default: one per experiment, at most
+            the CPU count)
+        total_threads: CPU threads shared by the workers (default: CPU count)
+        initial_percentage: Initial percentage of training data to label
+        batch_size: Number of samples added per AL iteration
+        max_iterations: Maximum number of AL iterations per experiment
+    """
+    strategies = list(strategies or STRATEGIES)
+    seeds = list(seeds or [42])
+    n_experiments = len(strategies) * len(seeds)
+    n_workers = n_workers or min(n_experiments, os.cpu_count() or 1)
+    thread_count = worker_thread_budget(n_workers, total_threads)
+
+    print("Starting AL Strategy Comparison")
+    print(f"Strategies: {strategies}")
+    print(f"Seeds: {seeds}")
+    print(f"Workers: {n_workers}, CatBoost threads per worker: {thread_count}")
+    print("=" * 60)
+
+    prepare_dataset_cache()
+
+    settings = {
+        "initial_percentage": initial_percentage,
+        "batch_size": batch_size,
+        "max_iterations": max_iterations,
+    }
+    configs = build_experiment_configs(strategies, seeds, thread_count, **settings)
+    results = run_strategy_experiments(configs, n_workers)
+
+    summary = summarize_results(results)
+    csv_path = str(Path("metrics") / "strategy_comparison.csv")
+    save_comparison_csv(results, csv_path)
+
+    run_id = log_comparison_to_mlflow(
+        results,
+        summary,
+        {
+            **settings,
+            "strategies": ",".join(strategies),
+            "seeds": ",".join(str(seed) for seed in seeds),
+            "n_workers": n_workers,
+            "thread_count": thread_count,
+        },
+        csv_path,
+    )
+
+    print("\n" + "=" * 60)
+    print("STRATEGY COMPARISON")
+    print("=" * 60)
+    print(format_comparison_table(summary))
+    print(f"\nPer-iteration metrics: {csv_path}")
+    print("Check MLflow UI for detailed experiment tracking")
+
+    return {"summary": summary, "results": results, "mlflow_run_id": run_id}
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    seeds = (
+        [int(seed) for seed in sys.argv[2].split(",")] if len(sys.argv) > 2 else None
+    )
+    strategy_comparison_pipeline(n_workers=workers, seeds=seeds)
@@ -1,25 +1,47 @@
 """Active Learning utilities for uncertainty sampling."""
 
 import logging
-from typing import Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
 import numpy as np
 from catboost import CatBoostClassifier
+from scipy.stats import binom
 
 logger = logging.getLogger(__name__)
 
 
 class UncertaintySampler:
-    """Implements uncertainty sampling strategies for Active Learning."""
+    """Implements uncertainty sampling strategies for Active Learning.
 
-    def __init__(self, strategy: str = "entropy"):
+    The pool is scored in fixed-size chunks on a thread pool (CatBoost and
+    NumPy release the GIL), uncertainty is computed in float32 in place, and
+    only the current top ``n_samples`` candidates are kept between chunks, so
+    peak memory depends on the chunk size rather than on the pool size.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "entropy",
+        chunk_size: int = 65536,
+        n_jobs: Optional[int] = None,
+        thread_count: int = -1,
+    ):
         """Initialize uncertainty sampler.
 
         Args:
             strategy: Uncertainty sampling strategy ("entropy", "margin", "least_confident")
+            chunk_size: Number of pool rows scored per chunk
+            n_jobs: Number of chunks scored in parallel (default: CPU count)
+            thread_count: CatBoost threads per predict_proba call (-1: split the
+                CPU cores between the chunks scored in parallel)
         """
         self.strategy = strategy
         self.supported_strategies = ["entropy", "margin", "least_confident"]
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.thread_count = thread_count
 
         if strategy not in self.supported_strategies:
             raise ValueError(
@@ -33,8 +55,12 @@ class UncertaintySampler:
             probabilities: Prediction probabilities shape (n_samples, n_classes)
 
         Returns:
-            Uncertainty scores for each sample
+            Uncertainty scores (float32) for each sample
         """
+        return self._uncertainty_inplace(np.array(probabilities, dtype=np.float32))
+
+    def _uncertainty_inplace(self, probabilities: np.ndarray) -> np.ndarray:
+        """Calculate uncertainty scores, using probabilities as scratch space."""
         if self.strategy == "entropy":
             return self._entropy_uncertainty(probabilities)
         elif self.strategy == "margin":
@@ -43,18 +69,24 @@ class UncertaintySampler:
             return self._least_confident_uncertainty(probabilities)
 
     def _entropy_uncertainty(self, probabilities: np.ndarray) -> np.ndarray:
-        """Calculate entropy-based uncertainty."""
+        """Calculate entropy-based uncertainty (overwrites probabilities)."""
         eps = 1e-10
-        probabilities = np.clip(probabilities, eps, 1 - eps)
+        np.clip(probabilities, eps, 1 - eps, out=probabilities)
 
-        entropy = -np.sum(probabilities * np.log(probabilities), axis=1)
-        return entropy
+        log_probs = np.log(probabilities)
+        log_probs *= probabilities
+        return -log_probs.sum(axis=1)
 
     def _margin_uncertainty(self, probabilities: np.ndarray) -> np.ndarray:
-        """Calculate margin-based uncertainty (difference between top 2 predictions)."""
-        sorted_probs = np.sort(probabilities, axis=1)[:, ::-1]
+        """Calculate margin-based uncertainty (difference between top 2 predictions).
 
-        margin = sorted_probs[:, 0] - sorted_probs[:, 1]
+        Only the two largest probabilities are needed, so rows are partitioned
+        in place instead of fully sorted.
+        """
+        n_classes = probabilities.shape[1]
+        probabilities.partition(n_classes - 2, axis=1)
+
+        margin = probabilities[:, -1] - probabilities[:, -2]
         return -margin
 
     def _least_confident_uncertainty(self, probabilities: np.ndarray) -> np.ndarray:
@@ -62,6 +94,69 @@ class UncertaintySampler:
         max_probs = np.max(probabilities, axis=1)
         return 1 - max_probs
 
+    def _score_chunk(
+        self,
+        model: CatBoostClassifier,
+        X_chunk: np.ndarray,
+        offset: int,
+        k: int,
+        thread_count: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        probabilities = model.predict_proba(X_chunk, thread_count=thread_count).astype(
+            np.float32, copy=False
+        )
+        scores = self._uncertainty_inplace(probabilities)
+        return _top_k(scores, np.arange(offset, offset + len(scores)), k)
+
+    def score_top_k(
+        self, X_pool: np.ndarray, model: CatBoostClassifier, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k most uncertain pool samples.
+
+        Args:
+            X_pool: Pool of unlabeled samples
+            model: Trained model for making predictions
+            k: Number of samples to return
+
+        Returns:
+            Tuple of (pool_indices, uncertainty_scores), most uncertain first
+        """
+        k = min(k, len(X_pool))
+        best_scores = np.empty(0, dtype=np.float32)
+        best_indices = np.empty(0, dtype=np.int64)
+        if k <= 0:
+            return best_indices, best_scores
+
+        starts = range(0, len(X_pool), self.chunk_size)
+        n_workers = min(self.n_jobs, len(starts))
+        # each parallel predict_proba gets its share of the cores, so chunks
+        # times CatBoost threads never exceeds the CPU count
+        thread_count = self.thread_count
+        if thread_count == -1:
+            thread_count = max(1, (os.cpu_count() or 1) // n_workers)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            chunks = executor.map(
+                lambda start: self._score_chunk(
+                    model,
+                    X_pool[start : start + self.chunk_size],
+                    start,
+                    k,
+                    thread_count,
+                ),
+                starts,
+            )
+            for chunk_scores, chunk_indices in chunks:
+                best_scores, best_indices = _top_k(
+                    np.concatenate([best_scores, chunk_scores]),
+                    np.concatenate([best_indices, chunk_indices]),
+                    k,
+                )
+
+        # most uncertain first; ties broken by pool position for determinism
+        order = np.lexsort((best_indices, -best_scores))
+        return best_indices[order], best_scores[order]
+
     def select_samples(
         self,
         X_pool: np.ndarray,
@@ -84,32 +179,129 @@ class UncertaintySampler:
             f"Selecting {n_samples} samples using {self.strategy} uncertainty sampling..."
         )
 
-        probabilities = model.predict_proba(X_pool)
-
-        uncertainty_scores = self.calculate_uncertainty(probabilities)
-
-        uncertain_indices = np.argsort(uncertainty_scores)[::-1][:n_samples]
+        uncertain_indices, uncertainty_scores = self.score_top_k(
+            X_pool, model, n_samples
+        )
 
         selected_X = X_pool[uncertain_indices]
         selected_y = y_pool[uncertain_indices]
 
-        mean_uncertainty = np.mean(uncertainty_scores[uncertain_indices])
-        logger.info(f"Selected samples with mean uncertainty: {mean_uncertainty:.4f}")
+        if len(uncertainty_scores):
+            mean_uncertainty = np.mean(uncertainty_scores)
+            logger.info(
+                f"Selected samples with mean uncertainty: {mean_uncertainty:.4f}"
+            )
 
         return selected_X, selected_y, uncertain_indices
 
 
+def _top_k(
+    scores: np.ndarray, indices: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # k largest scores (unordered) via argpartition, O(n) instead of a full sort
+    if k <= 0:
+        return scores[:0], indices[:0]
+    if len(scores) <= k:
+        return scores, indices
+    top = np.argpartition(scores, len(scores) - k)[len(scores) - k :]
+    return scores[top], indices[top]
+
+
+def candidate_sample_size(
+    batch_size: int, pool_size: int, quantile: float, confidence: float
+) -> int:
+    """Number of random pool candidates to score for a batch selection.
+
+    Each random candidate lands in the top ``quantile`` of the pool (by
+    uncertainty) with probability ``quantile``, so the number of such
+    candidates among m is Binomial(m, quantile). Returns the smallest m for
+    which at least ``batch_size`` of them are drawn with probability
+    ``confidence``; the top ``batch_size`` candidates are then all within the
+    top ``quantile`` of the full pool. Sampling without replacement only
+    tightens this bound. The result does not depend on the pool size.
+
+    Args:
+        batch_size: Number of samples to select
+        pool_size: Number of samples in the pool
+        quantile: Target top fraction of the pool for selected samples
+        confidence: Probability that the guarantee holds
+
+    Returns:
+        Candidate count, capped at ``pool_size``
+    """
+    low = batch_size
+    high = max(batch_size, int(np.ceil(batch_size / quantile)))
+    while binom.sf(batch_size - 1, high, quantile) < confidence:
+        if high >= pool_size:
+            return pool_size
+        low, high = high, high * 2
+    while low < high:
+        mid = (low + high) // 2
+        if binom.sf(batch_size - 1, mid, quantile) >= confidence:
+            high = mid
+        else:
+            low = mid + 1
+    return min(high, pool_size)
+
+
 class ActiveLearningManager:
     """Manages the Active Learning process."""
 
-    def __init__(self, uncertainty_strategy: str = "entropy"):
+    def __init__(
+        self,
+        uncertainty_strategy: str = "entropy",
+        candidate_confidence: Optional[float] = None,
+        candidate_quantile: float = 0.05,
+        candidate_sampling: str = "random",
+        random_seed: int = 42,
+        n_jobs: Optional[int] = None,
+        thread_count: int = -1,
+    ):
         """Initialize Active Learning manager.
 
         Args:
             uncertainty_strategy: Strategy for uncertainty sampling
+            candidate_confidence: If set, score only a candidate subset of the
+                pool, sized so that with this probability all selected samples
+                are in the top ``candidate_quantile`` of the full pool
+            candidate_quantile: Target top fraction of the pool
+            candidate_sampling: "random" or "stratified" (one candidate per
+                equal slice of the pool)
+            random_seed: Seed for candidate sampling
+            n_jobs: Number of pool chunks scored in parallel (default: CPU count)
+            thread_count: CatBoost threads per prediction call (-1: all cores)
         """
-        self.sampler = UncertaintySampler(uncertainty_strategy)
+        if candidate_sampling not in ("random", "stratified"):
+            raise ValueError(
+                f"Candidate sampling {candidate_sampling} not supported. "
+                "Use 'random' or 'stratified'"
+            )
+
+        self.sampler = UncertaintySampler(
+            uncertainty_strategy, n_jobs=n_jobs, thread_count=thread_count
+        )
         self.training_history = []
+        self.candidate_confidence = candidate_confidence
+        self.candidate_quantile = candidate_quantile
+        self.candidate_sampling = candidate_sampling
+        self.rng = np.random.default_rng(random_seed)
+        self.last_selection_info = {}
+
+    def _sample_candidates(self, pool_size: int, n_candidates: int) -> np.ndarray:
+        if self.candidate_sampling == "stratified":
+            # One row per integer stratum; every stratum is non-empty because
+            # n_candidates <= pool_size, so the rows are distinct
+            edges = np.linspace(0, pool_size, n_candidates + 1).astype(np.int64)
+            candidates = edges[:-1] + (
+                self.rng.random(n_candidates) * np.diff(edges)
+            ).astype(np.int64)
+        else:
+            candidates = np.sort(
+                self.rng.choice(pool_size, size=n_candidates, replace=False)
+            )
+        if np.any(np.diff(candidates) <= 0):
+            raise ValueError("Candidate sample contains duplicate pool indices")
+        return candidates
 
     def select_next_batch(
         self,
@@ -127,9 +319,46 @@ class ActiveLearningManager:
             batch_size: Number of samples to select
 
         Returns:
-            Tuple of (selected_X, selected_y, selected_indices)
+            Tuple of (selected_X, selected_y, selected_indices), indices are
+            positions in X_pool
         """
-        return self.sampler.select_samples(X_pool, y_pool, model, batch_size)
+        pool_size = len(X_pool)
+        n_candidates = pool_size
+        if self.candidate_confidence is not None:
+            n_candidates = candidate_sample_size(
+                batch_size,
+                pool_size,
+                self.candidate_quantile,
+                self.candidate_confidence,
+            )
+
+        self.last_selection_info = {
+            "pool_size": pool_size,
+            "candidates_scored": n_candidates,
+            # a full-pool top-batch sample is selected iff it was drawn as a
+            # candidate, so the expected overlap is the sampled fraction
+            "expected_overlap": n_candidates / pool_size if pool_size else 1.0,
+        }
+
+        if n_candidates >= pool_size:
+            return self.sampler.select_samples(X_pool, y_pool, model, batch_size)
+
+        self.last_selection_info.update(
+            {
+                "candidate_quantile": self.candidate_quantile,
+                "candidate_confidence": self.candidate_confidence,
+            }
+        )
+        logger.info(
+            f"Scoring {n_candidates} of {pool_size} pool samples "
+            f"({self.candidate_sampling} candidates)"
+        )
+
+        candidates = self._sample_candidates(pool_size, n_candidates)
+        selected_X, selected_y, candidate_indices = self.sampler.select_samples(
+            X_pool[candidates], y_pool[candidates], model, batch_size
+        )
+        return selected_X, selected_y, candidates[candidate_indices]
 
     def evaluate_selection_quality(
         self,
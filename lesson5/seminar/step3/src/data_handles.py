@@ -0,0 +1,108 @@
+"""Lightweight references passed between Prefect tasks instead of live objects.
+
+Prefect hashes task parameters for caching, and process or remote task runners
+would pickle them (and any persisted results). Flows therefore pass small
+frozen handles to the memory-mapped dataset cache, the labeled set and saved
+models, and each task resolves them locally.
+"""
+
+import os
+import uuid
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from catboost import CatBoostClassifier
+from data_manager import ActiveLearningDataManager
+from dataset_cache import DEFAULT_CACHE_DIR
+from model_trainer import QuantizedPoolCache
+
+AL_STATE_DIR = "al_state"
+
+
+@dataclass(frozen=True)
+class ModelHandle:
+    """Reference to a CatBoost model saved as ``.cbm``."""
+
+    path: str
+
+    def load(self) -> CatBoostClassifier:
+        """Load the model."""
+        model = CatBoostClassifier()
+        model.load_model(self.path)
+        return model
+
+
+@dataclass(frozen=True)
+class ALDataHandle:
+    """Reference to the dataset splits and the Active Learning labeled set.
+
+    Attributes:
+        cache_dir: Directory of the dataset split cache
+        random_seed: Seed of the splits (selects the cache entry)
+        state_path: ``.npy`` file with labeled training rows in the order they
+            were added (None before Active Learning is initialized)
+        n_labeled: The labeled set is the first ``n_labeled`` rows of
+            ``state_path``; the file only grows, so older handles stay valid
+    """
+
+    cache_dir: str = DEFAULT_CACHE_DIR
+    random_seed: int = 42
+    state_path: Optional[str] = None
+    n_labeled: int = 0
+
+    def open(self) -> ActiveLearningDataManager:
+        """Open the memory-mapped splits and restore the labeled set.
+
+        Returns:
+            Loaded data manager
+        """
+        data_manager = ActiveLearningDataManager(
+            random_seed=self.random_seed, cache_dir=self.cache_dir
+        )
+        data_manager.load_and_split_data()
+
+        if self.state_path is not None:
+            labeled = np.load(self.state_path, mmap_mode="r")[: self.n_labeled]
+            data_manager.restore_active_learning(labeled)
+        return data_manager
+
+    def save_state(self, data_manager: ActiveLearningDataManager) -> "ALDataHandle":
+        """Save the labeled set of a data manager.
+
+        Args:
+            data_manager: Data manager opened from this handle
+
+        Returns:
+            Handle to the updated labeled set
+        """
+        state_path = self.state_path or str(
+            Path(AL_STATE_DIR) / f"labeled_{uuid.uuid4().hex}.npy"
+        )
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Write next to the target and rename, so readers never see a partial
+        # file (np.save appends .npy to names that lack it)
+        tmp_path = f"{state_path}.{uuid.uuid4().hex}.tmp.npy"
+        np.save(tmp_path, data_manager.labeled_indices)
+        os.replace(tmp_path, state_path)
+
+        return replace(
+            self, state_path=state_path, n_labeled=int(data_manager.n_labeled)
+        )
+
+    def pool_cache(self) -> QuantizedPoolCache:
+        """Get the quantized pools of the training set, built once per process.
+
+        Returns:
+            Pool cache shared by all tasks of this process
+        """
+        return _open_pool_cache(self.cache_dir, self.random_seed)
+
+
+@lru_cache(maxsize=1)
+def _open_pool_cache(cache_dir: str, random_seed: int) -> QuantizedPoolCache:
+    data_manager = ALDataHandle(cache_dir, random_seed).open()
+    return QuantizedPoolCache(data_manager.X_train_full, data_manager.y_train_full)
@@ -1,11 +1,10 @@
 """Data management for Active Learning."""
 
 import logging
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import numpy as np
-from sklearn.datasets import fetch_covtype
-from sklearn.model_selection import train_test_split
+from dataset_cache import DEFAULT_CACHE_DIR, load_covtype_splits, memory_report
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +12,15 @@ logger = logging.getLogger(__name__)
 class ActiveLearningDataManager:
     """Manages data loading and splitting for Active Learning."""
 
-    def __init__(self, random_seed: int = 42):
+    def __init__(self, random_seed: int = 42, cache_dir: str = DEFAULT_CACHE_DIR):
         """Initialize ActiveLearningDataManager.
 
         Args:
             random_seed: Random seed for reproducibility
+            cache_dir: Directory of the on-disk dataset split cache
         """
         self.random_seed = random_seed
+        self.cache_dir = cache_dir
         self.X_train_full = None
         self.X_val = None
         self.X_test = None
@@ -28,12 +29,75 @@ class ActiveLearningDataManager:
         self.y_test = None
         self._is_loaded = False
 
-        self.X_labeled = None
-        self.y_labeled = None
-        self.X_pool = None
-        self.y_pool = None
-        self.labeled_indices = []
-        self.pool_indices = []
+        # Active Learning state as row indices into X_train_full: labeled rows
+        # in the order they were added (up to _n_labeled) and a pool mask.
+        # Labeled/pool arrays are gathered on first access and cached until
+        # the sets change.
+        self._labeled_order = np.empty(0, dtype=np.int64)
+        self._n_labeled = 0
+        self._pool_mask = None
+        self._cache: Dict[str, np.ndarray] = {}
+
+    def _cached(self, name: str, build: Callable[[], np.ndarray]) -> np.ndarray:
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def labeled_indices(self) -> np.ndarray:
+        """Training set rows of the labeled samples, in the order they were added."""
+        return self._labeled_order[: self._n_labeled]
+
+    @property
+    def pool_indices(self) -> np.ndarray:
+        """Training set rows of the pool samples, in ascending order."""
+        if self._pool_mask is None:
+            return np.empty(0, dtype=np.int64)
+        return self._cached("pool_indices", lambda: np.flatnonzero(self._pool_mask))
+
+    @property
+    def X_labeled(self) -> Optional[np.ndarray]:
+        """Features of the labeled set (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached(
+            "X_labeled", lambda: self.X_train_full[self.labeled_indices]
+        )
+
+    @property
+    def y_labeled(self) -> Optional[np.ndarray]:
+        """Labels of the labeled set (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached(
+            "y_labeled", lambda: self.y_train_full[self.labeled_indices]
+        )
+
+    @property
+    def X_pool(self) -> Optional[np.ndarray]:
+        """Features of the pool (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached("X_pool", lambda: self.X_train_full[self.pool_indices])
+
+    @property
+    def y_pool(self) -> Optional[np.ndarray]:
+        """Labels of the pool (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached("y_pool", lambda: self.y_train_full[self.pool_indices])
+
+    @property
+    def n_labeled(self) -> int:
+        """Number of labeled samples."""
+        return self._n_labeled
+
+    @property
+    def n_pool(self) -> int:
+        """Number of samples left in the pool."""
+        if self._pool_mask is None:
+            return 0
+        return len(self.X_train_full) - self._n_labeled
 
     def load_and_split_data(self) -> Dict[str, Any]:
         """Load Forest Cover Type dataset and create train/val/test splits.
@@ -43,32 +107,29 @@ class ActiveLearningDataManager:
         """
         logger.info("Loading Forest Cover Type dataset...")
 
-        covtype = fetch_covtype()
-        X, y = covtype.data, covtype.target
-
-        logger.info(f"Dataset shape: {X.shape}")
-        logger.info(f"Number of classes: {len(np.unique(y))}")
-
-        X_temp, self.X_test, y_temp, self.y_test = train_test_split(
-            X, y, test_size=0.2, random_state=self.random_seed, stratify=y
-        )
-
-        self.X_train_full, self.X_val, self.y_train_full, self.y_val = train_test_split(
-            X_temp,
-            y_temp,
+        splits = load_covtype_splits(
+            random_seed=self.random_seed,
             test_size=0.2,
-            random_state=self.random_seed,
-            stratify=y_temp,
+            val_size=0.2,
+            cache_dir=self.cache_dir,
         )
+        self.X_train_full, self.y_train_full = splits["X_train"], splits["y_train"]
+        self.X_val, self.y_val = splits["X_val"], splits["y_val"]
+        self.X_test, self.y_test = splits["X_test"], splits["y_test"]
+
+        y = np.concatenate([self.y_train_full, self.y_val, self.y_test])
+
+        logger.info(f"Dataset shape: {(len(y), self.X_train_full.shape[1])}")
+        logger.info(f"Number of classes: {len(np.unique(y))}")
 
         self._is_loaded = True
 
         dataset_info = {
-            "total_samples": len(X),
+            "total_samples": len(y),
             "train_samples": len(self.X_train_full),
             "val_samples": len(self.X_val),
             "test_samples": len(self.X_test),
-            "features": X.shape[1],
+            "features": self.X_train_full.shape[1],
             "classes": len(np.unique(y)),
             "class_distribution": dict(zip(*np.unique(y, return_counts=True))),
         }
@@ -78,6 +139,12 @@ class ActiveLearningDataManager:
         logger.info(f"  Validation: {dataset_info['val_samples']} samples")
         logger.info(f"  Test: {dataset_info['test_samples']} samples")
 
+        report = self.get_memory_report()
+        logger.info(
+            f"Feature memory: {report['total_mb']:.1f} MB as {report['dtype']} "
+            f"(float64: {report['float64_mb']:.1f} MB)"
+        )
+
         return dataset_info
 
     def get_incremental_train_data(
@@ -140,13 +207,13 @@ class ActiveLearningDataManager:
             return {"status": "not_loaded"}
 
         al_info = {}
-        if self.X_labeled is not None:
+        if self._pool_mask is not None:
             al_info.update(
                 {
-                    "labeled_samples": len(self.X_labeled),
-                    "pool_samples": len(self.X_pool) if self.X_pool is not None else 0,
+                    "labeled_samples": self.n_labeled,
+                    "pool_samples": self.n_pool,
                     "total_labeled_ratio": (
-                        len(self.X_labeled) / len(self.X_train_full)
+                        self.n_labeled / len(self.X_train_full)
                         if len(self.X_train_full) > 0
                         else 0
                     ),
@@ -176,80 +243,101 @@ class ActiveLearningDataManager:
         if not self._is_loaded:
             raise ValueError("Data not loaded. Call load_and_split_data() first.")
 
-        n_initial = int(initial_percentage * len(self.X_train_full))
-
-        self.labeled_indices = list(range(n_initial))
-        self.pool_indices = list(range(n_initial, len(self.X_train_full)))
+        n_train = len(self.X_train_full)
+        n_initial = int(initial_percentage * n_train)
 
-        self.X_labeled = self.X_train_full[self.labeled_indices].copy()
-        self.y_labeled = self.y_train_full[self.labeled_indices].copy()
-        self.X_pool = self.X_train_full[self.pool_indices].copy()
-        self.y_pool = self.y_train_full[self.pool_indices].copy()
+        self._labeled_order = np.empty(n_train, dtype=np.int64)
+        self._labeled_order[:n_initial] = np.arange(n_initial)
+        self._n_labeled = n_initial
+        self._pool_mask = np.ones(n_train, dtype=bool)
+        self._pool_mask[:n_initial] = False
+        self._cache.clear()
 
         init_info = {
-            "initial_labeled_size": len(self.X_labeled),
-            "initial_pool_size": len(self.X_pool),
+            "initial_labeled_size": self.n_labeled,
+            "initial_pool_size": self.n_pool,
             "initial_percentage": initial_percentage,
             "labeled_class_distribution": dict(
-                zip(*np.unique(self.y_labeled, return_counts=True))
+                zip(*np.unique(self.y_train_full[:n_initial], return_counts=True))
             ),
             "pool_class_distribution": dict(
-                zip(*np.unique(self.y_pool, return_counts=True))
+                zip(*np.unique(self.y_train_full[n_initial:], return_counts=True))
             ),
         }
 
         logger.info("Active Learning initialized:")
-        logger.info(f"  Initial labeled: {len(self.X_labeled)} samples")
-        logger.info(f"  Pool: {len(self.X_pool)} samples")
+        logger.info(f"  Initial labeled: {self.n_labeled} samples")
+        logger.info(f"  Pool: {self.n_pool} samples")
         logger.info(
             f"  Labeled classes: {list(init_info['labeled_class_distribution'].keys())}"
         )
 
         return init_info
 
+    def restore_active_learning(self, labeled_indices: np.ndarray) -> None:
+        """Restore the Active Learning state from labeled training rows.
+
+        Args:
+            labeled_indices: Rows of X_train_full in the order they were
+                labeled (as in ``labeled_indices``)
+        """
+        if not self._is_loaded:
+            raise ValueError("Data not loaded. Call load_and_split_data() first.")
+
+        rows = np.asarray(labeled_indices, dtype=np.int64)
+        n_train = len(self.X_train_full)
+
+        self._labeled_order = np.empty(n_train, dtype=np.int64)
+        self._labeled_order[: len(rows)] = rows
+        self._n_labeled = len(rows)
+        self._pool_mask = np.ones(n_train, dtype=bool)
+        self._pool_mask[rows] = False
+        self._cache.clear()
+
     def add_samples_to_labeled_set(
         self, selected_indices: np.ndarray
     ) -> Dict[str, Any]:
         """Add selected samples from pool to labeled set.
 
+        Only the index bookkeeping is updated (O(batch)); the labeled and pool
+        arrays are gathered again the next time they are requested.
+
         Args:
-            selected_indices: Indices of samples to move from pool to labeled set
+            selected_indices: Positions in the current pool (as returned by
+                get_pool_data) of samples to move to the labeled set
 
         Returns:
             Dictionary with update information
         """
-        if self.X_pool is None or self.y_pool is None:
+        if self._pool_mask is None:
             raise ValueError(
                 "Pool not initialized. Call initialize_active_learning() first."
             )
 
-        selected_X = self.X_pool[selected_indices]
-        selected_y = self.y_pool[selected_indices]
-
-        self.X_labeled = np.vstack([self.X_labeled, selected_X])
-        self.y_labeled = np.concatenate([self.y_labeled, selected_y])
-
-        pool_indices_to_add = [self.pool_indices[i] for i in selected_indices]
-        self.labeled_indices.extend(pool_indices_to_add)
+        rows = self.pool_indices[np.asarray(selected_indices, dtype=np.int64)]
+        if len(np.unique(rows)) != len(rows):
+            raise ValueError("Selected indices contain duplicates")
+        selected_y = self.y_train_full[rows]
 
-        remaining_indices = np.setdiff1d(range(len(self.X_pool)), selected_indices)
-        self.X_pool = self.X_pool[remaining_indices]
-        self.y_pool = self.y_pool[remaining_indices]
-        self.pool_indices = [self.pool_indices[i] for i in remaining_indices]
+        end = self._n_labeled + len(rows)
+        self._labeled_order[self._n_labeled : end] = rows
+        self._n_labeled = end
+        self._pool_mask[rows] = False
+        self._cache.clear()
 
         update_info = {
-            "samples_added": len(selected_indices),
-            "new_labeled_size": len(self.X_labeled),
-            "new_pool_size": len(self.X_pool),
+            "samples_added": len(rows),
+            "new_labeled_size": self.n_labeled,
+            "new_pool_size": self.n_pool,
             "added_class_distribution": dict(
                 zip(*np.unique(selected_y, return_counts=True))
             ),
-            "total_labeled_ratio": len(self.X_labeled) / len(self.X_train_full),
+            "total_labeled_ratio": self.n_labeled / len(self.X_train_full),
         }
 
-        logger.info(f"Added {len(selected_indices)} samples to labeled set")
-        logger.info(f"  New labeled size: {len(self.X_labeled)}")
-        logger.info(f"  Remaining pool size: {len(self.X_pool)}")
+        logger.info(f"Added {len(rows)} samples to labeled set")
+        logger.info(f"  New labeled size: {self.n_labeled}")
+        logger.info(f"  Remaining pool size: {self.n_pool}")
 
         return update_info
 
@@ -262,11 +350,11 @@ class ActiveLearningDataManager:
         Returns:
             Tuple of (X_batch, y_batch) from pool
         """
-        if self.X_pool is None or len(self.X_pool) == 0:
+        if self.is_pool_empty():
             raise ValueError("Pool is empty or not initialized")
 
-        actual_batch_size = min(batch_size, len(self.X_pool))
-        return self.X_pool[:actual_batch_size], self.y_pool[:actual_batch_size]
+        rows = self.pool_indices[:batch_size]
+        return self.X_train_full[rows], self.y_train_full[rows]
 
     def get_labeled_data(self) -> Tuple[np.ndarray, np.ndarray]:
         """Get current labeled dataset.
@@ -274,7 +362,7 @@ class ActiveLearningDataManager:
         Returns:
             Tuple of (X_labeled, y_labeled)
         """
-        if self.X_labeled is None:
+        if self._pool_mask is None:
             raise ValueError(
                 "Labeled set not initialized. Call initialize_active_learning() first."
             )
@@ -287,7 +375,7 @@ class ActiveLearningDataManager:
         Returns:
             Tuple of (X_pool, y_pool)
         """
-        if self.X_pool is None:
+        if self._pool_mask is None:
             raise ValueError(
                 "Pool not initialized. Call initialize_active_learning() first."
             )
@@ -300,4 +388,27 @@ class ActiveLearningDataManager:
         Returns:
             True if pool is empty, False otherwise
         """
-        return self.X_pool is None or len(self.X_pool) == 0
+        return self.n_pool == 0
+
+    def get_memory_report(self) -> Dict[str, Any]:
+        """Get memory used by the feature arrays.
+
+        Returns:
+            Dictionary with feature dtype, size in MB per array, the total,
+            and the total the same arrays would take as float64
+        """
+        if not self._is_loaded:
+            return {"status": "not_loaded"}
+
+        return {
+            "dtype": str(self.X_train_full.dtype),
+            **memory_report(
+                {
+                    "X_train_full": self.X_train_full,
+                    "X_val": self.X_val,
+                    "X_test": self.X_test,
+                    "X_labeled": self._cache.get("X_labeled"),
+                    "X_pool": self._cache.get("X_pool"),
+                }
+            ),
+        }
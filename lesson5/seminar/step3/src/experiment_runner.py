@@ -0,0 +1,274 @@
+"""Parallel Active Learning experiments across strategies and seeds."""
+
+import csv
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from active_learning import ActiveLearningManager
+from data_manager import ActiveLearningDataManager
+from dataset_cache import DEFAULT_CACHE_DIR
+from model_trainer import ModelTrainer, QuantizedPoolCache
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("entropy", "margin", "least_confident")
+
+
+def worker_thread_budget(n_workers: int, total_threads: Optional[int] = None) -> int:
+    """Split the available CPU threads evenly between worker processes.
+
+    Args:
+        n_workers: Number of worker processes running at the same time
+        total_threads: Threads to share (default: CPU count)
+
+    Returns:
+        CatBoost ``thread_count`` for each worker (at least 1)
+    """
+    total_threads = total_threads or os.cpu_count() or 1
+    return max(1, total_threads // max(1, n_workers))
+
+
+def build_experiment_configs(
+    strategies: Sequence[str],
+    seeds: Sequence[int],
+    thread_count: int,
+    **settings: Any,
+) -> List[Dict[str, Any]]:
+    """Build one experiment config per (strategy, seed) pair.
+
+    Args:
+        strategies: Uncertainty sampling strategies
+        seeds: Seeds for CatBoost and candidate sampling
+        thread_count: CatBoost threads for each experiment
+        **settings: Shared settings passed to run_experiment
+
+    Returns:
+        List of experiment configs
+    """
+    return [
+        {"strategy": strategy, "seed": seed, "thread_count": thread_count, **settings}
+        for strategy in strategies
+        for seed in seeds
+    ]
+
+
+def run_experiment(
+    strategy: str,
+    seed: int,
+    thread_count: int = -1,
+    initial_percentage: float = 0.1,
+    batch_size: int = 1000,
+    max_iterations: int = 10,
+    data_seed: int = 42,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    quantized_pools: bool = True,
+) -> Dict[str, Any]:
+    """Run one Active Learning experiment (executed in a worker process).
+
+    The splits are opened from the on-disk dataset cache as read-only memory
+    maps, so all workers share the same pages of the OS page cache instead of
+    each holding its own copy of the dataset.
+
+    Args:
+        strategy: Uncertainty sampling strategy
+        seed: Seed for CatBoost and candidate sampling
+        thread_count: CatBoost threads for training and prediction
+        initial_percentage: Initial percentage of training data to label
+        batch_size: Number of samples added per iteration
+        max_iterations: Maximum number of AL iterations
+        data_seed: Seed of the train/val/test split (shared by all workers)
+        cache_dir: Directory of the dataset cache
+        quantized_pools: Train on quantized pools sliced by labeled indices
+
+    Returns:
+        Dictionary with the experiment settings and per-iteration history
+    """
+    start = time.perf_counter()
+
+    data_manager = ActiveLearningDataManager(random_seed=data_seed, cache_dir=cache_dir)
+    data_manager.load_and_split_data()
+    data_manager.initialize_active_learning(initial_percentage)
+    X_val, y_val = data_manager.get_validation_data()
+    X_test, y_test = data_manager.get_test_data()
+
+    al_manager = ActiveLearningManager(
+        uncertainty_strategy=strategy,
+        random_seed=seed,
+        n_jobs=1,
+        thread_count=thread_count,
+    )
+    pool_cache = (
+        QuantizedPoolCache(
+            data_manager.X_train_full,
+            data_manager.y_train_full,
+            thread_count=thread_count,
+        )
+        if quantized_pools
+        else None
+    )
+    model_params = {
+        **ModelTrainer().model_params,
+        "random_seed": seed,
+        "thread_count": thread_count,
+    }
+
+    history = []
+    for iteration in range(1, max_iterations + 1):
+        X_labeled, y_labeled = data_manager.get_labeled_data()
+
+        trainer = ModelTrainer(model_params=model_params, pool_cache=pool_cache)
+        model = trainer.train_model(
+            X_labeled, y_labeled, indices=data_manager.labeled_indices
+        )
+        val_metrics = trainer.evaluate_model(X_val, y_val, "validation")
+        test_metrics = trainer.evaluate_model(X_test, y_test, "test")
+
+        history.append(
+            {
+                "iteration": iteration,
+                "labeled_size": len(X_labeled),
+                "labeled_percentage": 100
+                * len(X_labeled)
+                / len(data_manager.X_train_full),
+                "val_accuracy": val_metrics["accuracy"],
+                "test_accuracy": test_metrics["accuracy"],
+                "val_f1_macro": val_metrics["f1_macro"],
+                "test_f1_macro": test_metrics["f1_macro"],
+                "train_seconds": trainer.train_seconds,
+            }
+        )
+
+        if iteration == max_iterations or data_manager.is_pool_empty():
+            break
+
+        X_pool, y_pool = data_manager.get_pool_data()
+        _, _, selected_indices = al_manager.select_next_batch(
+            X_pool, y_pool, model, min(batch_size, len(X_pool))
+        )
+        data_manager.add_samples_to_labeled_set(selected_indices)
+
+    final = history[-1]
+    return {
+        "strategy": strategy,
+        "seed": seed,
+        "thread_count": thread_count,
+        "pid": os.getpid(),
+        "seconds": time.perf_counter() - start,
+        "iterations": len(history),
+        "final_labeled_percentage": final["labeled_percentage"],
+        "final_val_accuracy": final["val_accuracy"],
+        "final_test_accuracy": final["test_accuracy"],
+        "final_test_f1_macro": final["test_f1_macro"],
+        "history": history,
+    }
+
+
+def _run_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    return run_experiment(**config)
+
+
+def run_experiments(
+    configs: List[Dict[str, Any]], n_workers: int
+) -> List[Dict[str, Any]]:
+    """Run experiments in parallel worker processes.
+
+    Workers are started with ``spawn`` so they do not inherit the parent's
+    CatBoost/OpenMP thread state. Results are returned in config order.
+
+    Args:
+        configs: Experiment configs (see build_experiment_configs)
+        n_workers: Number of worker processes
+
+    Returns:
+        List of experiment results
+    """
+    logger.info(f"Running {len(configs)} experiments on {n_workers} workers...")
+    with ProcessPoolExecutor(
+        max_workers=n_workers, mp_context=get_context("spawn")
+    ) as executor:
+        return list(executor.map(_run_config, configs))
+
+
+def summarize_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate experiment results per strategy.
+
+    Args:
+        results: Experiment results
+
+    Returns:
+        One row per strategy with mean/std of the final metrics across seeds,
+        sorted by mean final test accuracy (best first)
+    """
+    rows = []
+    for strategy in dict.fromkeys(r["strategy"] for r in results):
+        runs = [r for r in results if r["strategy"] == strategy]
+        val = np.array([r["final_val_accuracy"] for r in runs])
+        test = np.array([r["final_test_accuracy"] for r in runs])
+        rows.append(
+            {
+                "strategy": strategy,
+                "runs": len(runs),
+                "labeled_percentage": float(
+                    np.mean([r["final_labeled_percentage"] for r in runs])
+                ),
+                "val_accuracy_mean": float(val.mean()),
+                "val_accuracy_std": float(val.std()),
+                "test_accuracy_mean": float(test.mean()),
+                "test_accuracy_std": float(test.std()),
+                "seconds_mean": float(np.mean([r["seconds"] for r in runs])),
+            }
+        )
+    return sorted(rows, key=lambda row: row["test_accuracy_mean"], reverse=True)
+
+
+def format_comparison_table(rows: List[Dict[str, Any]]) -> str:
+    """Format strategy summary rows as a text table.
+
+    Args:
+        rows: Rows from summarize_results
+
+    Returns:
+        Table as a string
+    """
+    header = (
+        f"{'strategy':<16} {'runs':>4} {'labeled %':>9} "
+        f"{'val acc':>17} {'test acc':>17} {'time s':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['strategy']:<16} {row['runs']:>4} "
+            f"{row['labeled_percentage']:>9.1f} "
+            f"{row['val_accuracy_mean']:>8.4f} ± {row['val_accuracy_std']:.4f} "
+            f"{row['test_accuracy_mean']:>8.4f} ± {row['test_accuracy_std']:.4f} "
+            f"{row['seconds_mean']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def save_comparison_csv(results: List[Dict[str, Any]], filepath: str) -> None:
+    """Save per-iteration metrics of every experiment to a CSV file.
+
+    Args:
+        results: Experiment results
+        filepath: Path of the CSV file
+    """
+    Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+
+    fields = ["strategy", "seed"] + list(results[0]["history"][0])
+    with open(filepath, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for result in results:
+            for row in result["history"]:
+                writer.writerow(
+                    {"strategy": result["strategy"], "seed": result["seed"], **row}
+                )
+
+    logger.info(f"Comparison saved to {filepath}")
@@ -46,18 +46,22 @@ class MLflowTracker:
             raise
 
     def start_run(
-        self, run_name: Optional[str] = None, tags: Dict[str, str] = None
+        self,
+        run_name: Optional[str] = None,
+        tags: Dict[str, str] = None,
+        nested: bool = False,
     ) -> mlflow.ActiveRun:
         """Start a new MLflow run.
 
         Args:
             run_name: Name for the run
             tags: Tags to add to the run
+            nested: Start the run as a child of the active run
 
         Returns:
             Active MLflow run
         """
-        run = mlflow.start_run(run_name=run_name, tags=tags)
+        run = mlflow.start_run(run_name=run_name, tags=tags, nested=nested)
         logger.info(f"Started MLflow run: {run.info.run_id}")
         return run
 
@@ -120,6 +124,7 @@ class MLflowTracker:
         val_metrics: Dict[str, Any],
         test_metrics: Dict[str, Any],
         model=None,
+        extra_metrics: Optional[Dict[str, float]] = None,
     ) -> str:
         """Log a complete training iteration.
 
@@ -131,6 +136,7 @@ class MLflowTracker:
             val_metrics: Validation metrics
             test_metrics: Test metrics
             model: Trained model (optional)
+            extra_metrics: Additional metrics to log as is (optional)
 
         Returns:
             Run ID
@@ -165,6 +171,9 @@ class MLflowTracker:
             }
             self.log_metrics(test_metrics_prefixed, step=iteration)
 
+            if extra_metrics:
+                self.log_metrics(extra_metrics, step=iteration)
+
             if model is not None:
                 self.log_model(model, f"model_iter_{iteration:02d}")
 
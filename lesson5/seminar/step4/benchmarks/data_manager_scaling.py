@@ -0,0 +1,119 @@
+"""Scaling benchmark of ActiveLearningDataManager bookkeeping.
+
+Runs the Active Learning bookkeeping (initialization, moving selected samples
+from the pool to the labeled set, gathering labeled/pool arrays) on synthetic
+pools from 10k to 10M rows and prints time per operation. Every step should
+grow linearly with the pool size (or with the batch size for
+``add_samples_to_labeled_set``).
+
+Usage:
+    python -m benchmarks.data_manager_scaling [--sizes 10000,100000] [--features 8]
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+from src.data_manager import ActiveLearningDataManager
+
+DEFAULT_SIZES = "10000,100000,1000000,10000000"
+
+
+def make_data_manager(
+    n_rows: int, n_features: int, random_seed: int = 42
+) -> ActiveLearningDataManager:
+    """Create a data manager over a synthetic training set of ``n_rows`` rows."""
+    rng = np.random.default_rng(random_seed)
+    data_manager = ActiveLearningDataManager(random_seed=random_seed)
+    data_manager.X_train_full = rng.integers(
+        0, 17, size=(n_rows, n_features), dtype=np.uint8
+    )
+    data_manager.y_train_full = rng.integers(0, 10, size=n_rows, dtype=np.int64)
+    data_manager._is_loaded = True
+    return data_manager
+
+
+def benchmark_size(
+    n_rows: int,
+    n_features: int,
+    iterations: int,
+    initial_percentage: float,
+    increment_percentage: float,
+) -> Dict[str, float]:
+    """Time one full AL bookkeeping run on a pool of ``n_rows`` rows."""
+    data_manager = make_data_manager(n_rows, n_features)
+    rng = np.random.default_rng(0)
+    batch_size = max(1, int(increment_percentage * n_rows))
+
+    start = time.perf_counter()
+    data_manager.initialize_active_learning(initial_percentage)
+    init_s = time.perf_counter() - start
+
+    add_s = pool_s = labeled_s = 0.0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        X_pool, _ = data_manager.get_pool_data()
+        pool_s += time.perf_counter() - start
+
+        selected = rng.choice(len(X_pool), size=batch_size, replace=False)
+        start = time.perf_counter()
+        data_manager.add_samples_to_labeled_set(selected)
+        add_s += time.perf_counter() - start
+
+        start = time.perf_counter()
+        data_manager.get_labeled_data()
+        labeled_s += time.perf_counter() - start
+
+    return {
+        "rows": n_rows,
+        "batch": batch_size,
+        "init_ms": init_s * 1000,
+        "add_ms": add_s / iterations * 1000,
+        "pool_gather_ms": pool_s / iterations * 1000,
+        "labeled_gather_ms": labeled_s / iterations * 1000,
+    }
+
+
+def print_results(results: List[Dict[str, float]]):
+    """Print benchmark results as a table."""
+    header = (
+        f"{'rows':>10} {'batch':>8} {'init ms':>10} {'add ms':>10} "
+        f"{'pool ms':>10} {'labeled ms':>11} {'init ns/row':>12}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['rows']:>10} {r['batch']:>8} {r['init_ms']:>10.2f} "
+            f"{r['add_ms']:>10.3f} {r['pool_gather_ms']:>10.2f} "
+            f"{r['labeled_gather_ms']:>11.2f} {r['init_ms'] * 1e6 / r['rows']:>12.1f}"
+        )
+
+
+def main():
+    """Run the scaling benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Pool sizes")
+    parser.add_argument("--features", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--initial-percentage", type=float, default=0.05)
+    parser.add_argument("--increment-percentage", type=float, default=0.01)
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in (int(size) for size in args.sizes.split(",")):
+        results.append(
+            benchmark_size(
+                n_rows,
+                args.features,
+                args.iterations,
+                args.initial_percentage,
+                args.increment_percentage,
+            )
+        )
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
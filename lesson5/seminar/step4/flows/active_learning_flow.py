@@ -1,39 +1,55 @@
 """Prefect flow for Active Learning with incremental data addition."""
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from prefect import flow, task
 from src.active_learning import ActiveLearningManager
+from src.data_handles import DatasetHandle, save_splits
 from src.data_manager import ActiveLearningDataManager
 from src.mlflow_tracker import MLflowTracker
-from src.model_trainer import ModelTrainer
+from src.model_trainer import ModelTrainer, QuantizedPoolCache
 
 logger = logging.getLogger(__name__)
 
 
 @task
-def setup_data_manager(random_seed: int = 42) -> ActiveLearningDataManager:
-    """Initialize and load data manager."""
+def setup_data_manager(random_seed: int = 42) -> DatasetHandle:
+    """Load and split the data once and return a handle to the saved splits."""
     data_manager = ActiveLearningDataManager(random_seed=random_seed)
     data_manager.load_and_split_data()
-    return data_manager
+    return save_splits(data_manager)
 
 
 @task
 def run_active_learning_experiment(
-    data_manager: ActiveLearningDataManager,
+    data_handle: DatasetHandle,
     sampling_strategy: str = "entropy",
     initial_percentage: float = 0.05,
     increment_percentage: float = 0.05,
     max_iterations: int = 15,
     random_seed: int = 42,
+    warm_start_iterations: Optional[int] = None,
+    quantized_pools: bool = True,
+    report_quantization: bool = False,
 ) -> Dict[str, Any]:
-    """Run Active Learning experiment with incremental data addition."""
+    """Run Active Learning experiment with incremental data addition.
 
+    ``report_quantization`` also times quantizing each iteration's raw arrays
+    to report what the cached pools save; it costs the quantization the cache
+    avoids, so it is off by default.
+    """
+
+    data_manager = data_handle.open()
     al_manager = ActiveLearningManager(uncertainty_strategy=sampling_strategy)
     data_manager.initialize_active_learning(initial_percentage=initial_percentage)
+    pool_cache = (
+        QuantizedPoolCache(data_manager.X_train_full, data_manager.y_train_full)
+        if quantized_pools
+        else None
+    )
     iteration_results = []
+    previous_model = None
 
     for iteration in range(max_iterations):
         X_labeled, y_labeled = data_manager.get_labeled_data()
@@ -42,13 +58,31 @@ def run_active_learning_experiment(
             print(f"All training data used at iteration {iteration + 1}")
             break
 
-        model_trainer = ModelTrainer(model_params={"random_seed": random_seed})
-        model_trainer.train_model(X_labeled, y_labeled)
+        model_trainer = ModelTrainer(
+            model_params={"random_seed": random_seed},
+            warm_start_iterations=warm_start_iterations,
+            pool_cache=pool_cache,
+        )
+        labeled_indices = data_manager.labeled_indices
+        model_trainer.train_model(
+            X_labeled, y_labeled, init_model=previous_model, indices=labeled_indices
+        )
+        previous_model = model_trainer.model
 
         training_info = {
             "training_samples": len(X_labeled),
             "features": X_labeled.shape[1],
+            "warm_started": model_trainer.warm_started,
+            "train_seconds": model_trainer.train_seconds,
         }
+        if model_trainer.warm_started:
+            training_info["warm_start"] = model_trainer.compare_with_full_retrain(
+                X_labeled,
+                y_labeled,
+                data_manager.X_val,
+                data_manager.y_val,
+                indices=labeled_indices,
+            )
 
         val_metrics = model_trainer.evaluate_model(
             data_manager.X_val, data_manager.y_val, "validation"
@@ -56,6 +90,15 @@ def run_active_learning_experiment(
         test_metrics = model_trainer.evaluate_model(
             data_manager.X_test, data_manager.y_test, "test"
         )
+        if report_quantization and pool_cache is not None:
+            training_info["quantization"] = model_trainer.quantization_report(
+                X_labeled,
+                y_labeled,
+                {
+                    "validation": (data_manager.X_val, data_manager.y_val),
+                    "test": (data_manager.X_test, data_manager.y_test),
+                },
+            )
 
         current_percentage = len(X_labeled) / len(data_manager.X_train_full) * 100
 
@@ -78,6 +121,19 @@ def run_active_learning_experiment(
         print(f"  Val accuracy: {val_metrics['accuracy']:.4f}")
         print(f"  Test accuracy: {test_metrics['accuracy']:.4f}")
         print(f"  Labeled samples: {len(X_labeled)}")
+        if "warm_start" in training_info:
+            warm_start = training_info["warm_start"]
+            print(
+                f"  Warm start: {warm_start['warm_start_seconds']:.2f}s vs "
+                f"{warm_start['full_retrain_seconds']:.2f}s full retrain, "
+                f"val accuracy diff {warm_start['val_accuracy_diff']:+.4f}"
+            )
+        if "quantization" in training_info:
+            quantization = training_info["quantization"]
+            print(
+                f"  Quantization: {quantization['pool_seconds']:.3f}s cached pools "
+                f"vs {quantization['raw_quantize_seconds']:.3f}s raw arrays"
+            )
 
         if data_manager.is_pool_empty():
             print("Pool is empty, stopping Active Learning")
@@ -107,6 +163,7 @@ def run_active_learning_experiment(
             iteration_results[-1]["data_percentage"] if iteration_results else 0
         ),
         "iteration_results": iteration_results,
+        "pool_build_seconds": pool_cache.build_seconds if pool_cache else None,
     }
 
 
@@ -137,6 +194,10 @@ def log_active_learning_to_mlflow(
         mlflow_tracker.log_metrics(
             {f"test_{k}": v for k, v in final_results["test_metrics"].items()}
         )
+        if al_results.get("pool_build_seconds") is not None:
+            mlflow_tracker.log_metrics(
+                {"pool_build_seconds": al_results["pool_build_seconds"]}
+            )
 
         for i, result in enumerate(al_results["iteration_results"]):
             mlflow_tracker.log_metrics(
@@ -150,6 +211,18 @@ def log_active_learning_to_mlflow(
                 },
                 step=i + 1,
             )
+            warm_start = result["training_info"].get("warm_start")
+            if warm_start:
+                mlflow_tracker.log_metrics(
+                    {f"iteration_{i+1}_{k}": v for k, v in warm_start.items()},
+                    step=i + 1,
+                )
+            quantization = result["training_info"].get("quantization")
+            if quantization:
+                mlflow_tracker.log_metrics(
+                    {f"iteration_{i+1}_{k}": v for k, v in quantization.items()},
+                    step=i + 1,
+                )
 
 
 @flow(name="Active Learning Pipeline")
@@ -160,17 +233,23 @@ def active_learning_pipeline(
     max_iterations: int = 15,
     random_seed: int = 42,
     experiment_name: str = "step4_active_learning",
+    warm_start_iterations: Optional[int] = None,
+    quantized_pools: bool = True,
+    report_quantization: bool = False,
 ) -> Dict[str, Any]:
     """Complete Active Learning pipeline with incremental data addition."""
-    data_manager = setup_data_manager(random_seed=random_seed)
+    data_handle = setup_data_manager(random_seed=random_seed)
 
     al_results = run_active_learning_experiment(
-        data_manager=data_manager,
+        data_handle=data_handle,
         sampling_strategy=sampling_strategy,
         initial_percentage=initial_percentage,
         increment_percentage=increment_percentage,
         max_iterations=max_iterations,
         random_seed=random_seed,
+        warm_start_iterations=warm_start_iterations,
+        quantized_pools=quantized_pools,
+        report_quantization=report_quantization,
     )
 
     log_active_learning_to_mlflow(
@@ -5,6 +5,7 @@ from typing import Any, Dict
 
 from prefect import flow, task
 from src.baseline_trainer import BaselineTrainer
+from src.data_handles import DatasetHandle, save_splits
 from src.data_manager import ActiveLearningDataManager
 from src.mlflow_tracker import MLflowTracker
 
@@ -12,18 +13,19 @@ logger = logging.getLogger(__name__)
 
 
 @task
-def setup_data_manager(random_seed: int = 42) -> ActiveLearningDataManager:
-    """Initialize and load data manager."""
+def setup_data_manager(random_seed: int = 42) -> DatasetHandle:
+    """Load and split the data once and return a handle to the saved splits."""
     data_manager = ActiveLearningDataManager(random_seed=random_seed)
     data_manager.load_and_split_data()
-    return data_manager
+    return save_splits(data_manager)
 
 
 @task
 def train_baseline_model(
-    data_manager: ActiveLearningDataManager, random_seed: int = 42
+    data_handle: DatasetHandle, random_seed: int = 42
 ) -> Dict[str, Any]:
     """Train baseline model on full dataset."""
+    data_manager = data_handle.open()
     baseline_trainer = BaselineTrainer(random_seed=random_seed)
     training_info = baseline_trainer.train_full_dataset(
         X_train=data_manager.X_train_full,
@@ -79,8 +81,8 @@ def baseline_pipeline(
     random_seed: int = 42, experiment_name: str = "step4_baseline"
 ) -> Dict[str, Any]:
     """Complete baseline training pipeline."""
-    data_manager = setup_data_manager(random_seed=random_seed)
-    baseline_results = train_baseline_model(data_manager, random_seed=random_seed)
+    data_handle = setup_data_manager(random_seed=random_seed)
+    baseline_results = train_baseline_model(data_handle, random_seed=random_seed)
     log_baseline_to_mlflow(
         baseline_results=baseline_results, experiment_name=experiment_name
     )
@@ -1,7 +1,9 @@
 """Active Learning utilities for uncertainty sampling."""
 
 import logging
-from typing import Tuple
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 
 import numpy as np
 from catboost import CatBoostClassifier
@@ -10,12 +12,23 @@ logger = logging.getLogger(__name__)
 
 
 class UncertaintySampler:
-    """Implements uncertainty sampling strategies for Active Learning."""
+    """Implements uncertainty sampling strategies for Active Learning.
 
-    def __init__(self, strategy: str = "entropy"):
+    The pool is scored in chunks on a thread pool with float32 in-place
+    uncertainty and a running top-k, so memory is bounded by the chunk size.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "entropy",
+        chunk_size: int = 65536,
+        n_jobs: Optional[int] = None,
+    ):
         """Initialize uncertainty sampler."""
         self.strategy = strategy
         self.supported_strategies = ["entropy", "margin", "least_confident"]
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs or os.cpu_count() or 1
 
         if strategy not in self.supported_strategies:
             raise ValueError(
@@ -23,7 +36,11 @@ class UncertaintySampler:
             )
 
     def calculate_uncertainty(self, probabilities: np.ndarray) -> np.ndarray:
-        """Calculate uncertainty scores for predictions."""
+        """Calculate uncertainty scores (float32) for predictions."""
+        return self._uncertainty_inplace(np.array(probabilities, dtype=np.float32))
+
+    def _uncertainty_inplace(self, probabilities: np.ndarray) -> np.ndarray:
+        """Calculate uncertainty scores, using probabilities as scratch space."""
         if self.strategy == "entropy":
             return self._entropy_uncertainty(probabilities)
         elif self.strategy == "margin":
@@ -34,14 +51,15 @@ class UncertaintySampler:
     def _entropy_uncertainty(self, probabilities: np.ndarray) -> np.ndarray:
         """Calculate entropy-based uncertainty."""
         eps = 1e-10
-        probabilities = np.clip(probabilities, eps, 1 - eps)
-        entropy = -np.sum(probabilities * np.log(probabilities), axis=1)
-        return entropy
+        np.clip(probabilities, eps, 1 - eps, out=probabilities)
+        log_probs = np.log(probabilities)
+        log_probs *= probabilities
+        return -log_probs.sum(axis=1)
 
     def _margin_uncertainty(self, probabilities: np.ndarray) -> np.ndarray:
-        """Calculate margin-based uncertainty."""
-        sorted_probs = np.sort(probabilities, axis=1)[:, ::-1]
-        margin = sorted_probs[:, 0] - sorted_probs[:, 1]
+        """Calculate margin-based uncertainty (top 2 via partition, no full sort)."""
+        probabilities.partition(probabilities.shape[1] - 2, axis=1)
+        margin = probabilities[:, -1] - probabilities[:, -2]
         return -margin
 
     def _least_confident_uncertainty(self, probabilities: np.ndarray) -> np.ndarray:
@@ -49,6 +67,56 @@ class UncertaintySampler:
         max_probs = np.max(probabilities, axis=1)
         return 1 - max_probs
 
+    def _score_chunk(
+        self,
+        model: CatBoostClassifier,
+        X_chunk: np.ndarray,
+        offset: int,
+        k: int,
+        thread_count: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        probabilities = model.predict_proba(X_chunk, thread_count=thread_count).astype(
+            np.float32, copy=False
+        )
+        scores = self._uncertainty_inplace(probabilities)
+        return _top_k(scores, np.arange(offset, offset + len(scores)), k)
+
+    def score_top_k(
+        self, X_pool: np.ndarray, model: CatBoostClassifier, k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the k most uncertain pool samples, most uncertain first."""
+        k = min(k, len(X_pool))
+        best_scores = np.empty(0, dtype=np.float32)
+        best_indices = np.empty(0, dtype=np.int64)
+        if k <= 0:
+            return best_indices, best_scores
+
+        starts = range(0, len(X_pool), self.chunk_size)
+        n_workers = min(self.n_jobs, len(starts))
+        # split the cores between parallel predict_proba calls
+        thread_count = max(1, (os.cpu_count() or 1) // n_workers)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            chunks = executor.map(
+                lambda start: self._score_chunk(
+                    model,
+                    X_pool[start : start + self.chunk_size],
+                    start,
+                    k,
+                    thread_count,
+                ),
+                starts,
+            )
+            for chunk_scores, chunk_indices in chunks:
+                best_scores, best_indices = _top_k(
+                    np.concatenate([best_scores, chunk_scores]),
+                    np.concatenate([best_indices, chunk_indices]),
+                    k,
+                )
+
+        order = np.lexsort((best_indices, -best_scores))
+        return best_indices[order], best_scores[order]
+
     def select_samples(
         self,
         X_pool: np.ndarray,
@@ -57,14 +125,24 @@ class UncertaintySampler:
         n_samples: int,
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """Select most uncertain samples from the pool."""
-        probabilities = model.predict_proba(X_pool)
-        uncertainty_scores = self.calculate_uncertainty(probabilities)
-        uncertain_indices = np.argsort(uncertainty_scores)[::-1][:n_samples]
+        uncertain_indices, _ = self.score_top_k(X_pool, model, n_samples)
         selected_X = X_pool[uncertain_indices]
         selected_y = y_pool[uncertain_indices]
         return selected_X, selected_y, uncertain_indices
 
 
+def _top_k(
+    scores: np.ndarray, indices: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # k largest scores (unordered) via argpartition
+    if k <= 0:
+        return scores[:0], indices[:0]
+    if len(scores) <= k:
+        return scores, indices
+    top = np.argpartition(scores, len(scores) - k)[len(scores) - k :]
+    return scores[top], indices[top]
+
+
 class ActiveLearningManager:
     """Manages the Active Learning process."""
 
@@ -7,7 +7,7 @@ from typing import Any, Dict
 
 import numpy as np
 from catboost import CatBoostClassifier
-from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+from src.metrics import ClassificationMetrics
 
 logger = logging.getLogger(__name__)
 
@@ -65,16 +65,7 @@ class BaselineTrainer:
         if not self.is_trained:
             raise ValueError("Model not trained. Call train_full_dataset() first.")
         y_pred = self.model.predict(X_test)
-        metrics = {
-            "accuracy": accuracy_score(y_test, y_pred),
-            "f1_macro": f1_score(y_test, y_pred, average="macro"),
-            "f1_weighted": f1_score(y_test, y_pred, average="weighted"),
-            "precision_macro": precision_score(y_test, y_pred, average="macro"),
-            "precision_weighted": precision_score(y_test, y_pred, average="weighted"),
-            "recall_macro": recall_score(y_test, y_pred, average="macro"),
-            "recall_weighted": recall_score(y_test, y_pred, average="weighted"),
-        }
-        return metrics
+        return ClassificationMetrics(y_test, y_pred).to_dict()
 
     def save_model(self, filepath: str) -> None:
         """Save trained model to file."""
@@ -0,0 +1,52 @@
+"""Lightweight dataset references passed between Prefect tasks."""
+
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from src.data_manager import SPLIT_NAMES, ActiveLearningDataManager
+
+DEFAULT_DATA_DIR = os.environ.get("DATASET_CACHE_DIR", "data_cache")
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """Reference to dataset splits saved as ``.npy`` files."""
+
+    path: str
+    random_seed: int = 42
+
+    def open(self) -> ActiveLearningDataManager:
+        """Open the splits as read-only memory maps in a new data manager."""
+        data_manager = ActiveLearningDataManager(random_seed=self.random_seed)
+        data_manager.load_splits(
+            {
+                name: np.load(Path(self.path) / f"{name}.npy", mmap_mode="r")
+                for name in SPLIT_NAMES
+            }
+        )
+        return data_manager
+
+
+def save_splits(
+    data_manager: ActiveLearningDataManager, data_dir: str = DEFAULT_DATA_DIR
+) -> DatasetHandle:
+    """Save the splits of a loaded data manager once and return a handle to them."""
+    path = Path(data_dir) / f"digits_seed{data_manager.random_seed}"
+    if not path.exists():
+        # Write to a temporary directory and rename it, so concurrent runs never
+        # open a partially written cache
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=path.parent, prefix=f".{path.name}.")
+        for name in SPLIT_NAMES:
+            np.save(Path(tmp_dir) / f"{name}.npy", getattr(data_manager, name))
+        try:
+            os.rename(tmp_dir, path)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not path.exists():
+                raise
+    return DatasetHandle(path=str(path), random_seed=data_manager.random_seed)
@@ -1,7 +1,7 @@
 """Data management for Active Learning."""
 
 import logging
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import numpy as np
 from sklearn.datasets import load_digits
@@ -9,6 +9,8 @@ from sklearn.model_selection import train_test_split
 
 logger = logging.getLogger(__name__)
 
+SPLIT_NAMES = ("X_train_full", "y_train_full", "X_val", "y_val", "X_test", "y_test")
+
 
 class ActiveLearningDataManager:
     """Manages data loading and splitting for Active Learning."""
@@ -23,28 +25,93 @@ class ActiveLearningDataManager:
         self.y_val = None
         self.y_test = None
         self._is_loaded = False
-        self.X_labeled = None
-        self.y_labeled = None
-        self.X_pool = None
-        self.y_pool = None
-        self.labeled_indices = []
-        self.pool_indices = []
+        self.reset_active_learning()
+
+    def _cached(self, name: str, build: Callable[[], np.ndarray]) -> np.ndarray:
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    @property
+    def labeled_indices(self) -> np.ndarray:
+        """Training set rows of the labeled samples, in the order they were added."""
+        return self._labeled_order[: self._n_labeled]
+
+    @property
+    def pool_indices(self) -> np.ndarray:
+        """Training set rows of the pool samples, in ascending order."""
+        if self._pool_mask is None:
+            return np.empty(0, dtype=np.int64)
+        return self._cached("pool_indices", lambda: np.flatnonzero(self._pool_mask))
+
+    @property
+    def X_labeled(self) -> Optional[np.ndarray]:
+        """Features of the labeled set (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached(
+            "X_labeled", lambda: self.X_train_full[self.labeled_indices]
+        )
+
+    @property
+    def y_labeled(self) -> Optional[np.ndarray]:
+        """Labels of the labeled set (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached(
+            "y_labeled", lambda: self.y_train_full[self.labeled_indices]
+        )
+
+    @property
+    def X_pool(self) -> Optional[np.ndarray]:
+        """Features of the pool (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached("X_pool", lambda: self.X_train_full[self.pool_indices])
+
+    @property
+    def y_pool(self) -> Optional[np.ndarray]:
+        """Labels of the pool (None before AL initialization)."""
+        if self._pool_mask is None:
+            return None
+        return self._cached("y_pool", lambda: self.y_train_full[self.pool_indices])
+
+    @property
+    def n_labeled(self) -> int:
+        """Number of labeled samples."""
+        return self._n_labeled
+
+    @property
+    def n_pool(self) -> int:
+        """Number of samples left in the pool."""
+        if self._pool_mask is None:
+            return 0
+        return len(self._pool_mask) - self._n_labeled
 
     def load_and_split_data(self) -> Dict[str, Any]:
         """Load Digits dataset and create train/val/test splits."""
         digits = load_digits()
         X, y = digits.data, digits.target
-        X_temp, self.X_test, y_temp, self.y_test = train_test_split(
+        X_temp, X_test, y_temp, y_test = train_test_split(
             X, y, test_size=0.2, random_state=self.random_seed, stratify=y
         )
-        self.X_train_full, self.X_val, self.y_train_full, self.y_val = train_test_split(
+        X_train, X_val, y_train, y_val = train_test_split(
             X_temp,
             y_temp,
             test_size=0.2,
             random_state=self.random_seed,
             stratify=y_temp,
         )
-        self._is_loaded = True
+        self.load_splits(
+            {
+                "X_train_full": X_train,
+                "y_train_full": y_train,
+                "X_val": X_val,
+                "y_val": y_val,
+                "X_test": X_test,
+                "y_test": y_test,
+            }
+        )
         dataset_info = {
             "total_samples": len(X),
             "train_samples": len(self.X_train_full),
@@ -56,6 +123,13 @@ class ActiveLearningDataManager:
         }
         return dataset_info
 
+    def load_splits(self, splits: Dict[str, np.ndarray]) -> None:
+        """Use already computed splits (e.g. memory-mapped ``.npy`` files)."""
+        for name in SPLIT_NAMES:
+            setattr(self, name, splits[name])
+        self._is_loaded = True
+        self.reset_active_learning()
+
     def initialize_active_learning(
         self, initial_percentage: float = 0.1
     ) -> Dict[str, Any]:
@@ -67,50 +141,49 @@ class ActiveLearningDataManager:
         initial_indices = np.random.RandomState(self.random_seed).choice(
             len(self.X_train_full), size=n_initial, replace=False
         )
-        self.labeled_indices = initial_indices.tolist()
-        self.pool_indices = [
-            i for i in range(len(self.X_train_full)) if i not in self.labeled_indices
-        ]
-        self._update_active_learning_sets()
+        self._labeled_order = np.empty(len(self.X_train_full), dtype=np.int64)
+        self._labeled_order[:n_initial] = initial_indices
+        self._n_labeled = n_initial
+        self._pool_mask = np.ones(len(self.X_train_full), dtype=bool)
+        self._pool_mask[initial_indices] = False
+        self._cache = {}
 
         init_info = {
-            "initial_labeled_samples": len(self.labeled_indices),
-            "initial_pool_samples": len(self.pool_indices),
+            "initial_labeled_samples": self.n_labeled,
+            "initial_pool_samples": self.n_pool,
             "initial_percentage": initial_percentage,
             "labeled_class_distribution": dict(
-                zip(*np.unique(self.y_labeled, return_counts=True))
+                zip(*np.unique(self.y_train_full[initial_indices], return_counts=True))
             ),
         }
         return init_info
 
-    def _update_active_learning_sets(self):
-        """Update labeled and pool sets based on current indices."""
-        self.X_labeled = self.X_train_full[self.labeled_indices]
-        self.y_labeled = self.y_train_full[self.labeled_indices]
-        self.X_pool = self.X_train_full[self.pool_indices]
-        self.y_pool = self.y_train_full[self.pool_indices]
-
     def add_samples_to_labeled_set(
         self, pool_indices_to_add: np.ndarray
     ) -> Dict[str, Any]:
-        """Add samples from pool to labeled set."""
+        """Add samples (positions in the current pool) to labeled set.
+
+        Only the index bookkeeping changes, in O(batch); labeled/pool arrays
+        are gathered again the next time they are requested.
+        """
         if len(pool_indices_to_add) == 0:
             return {"samples_added": 0}
 
-        actual_indices = [self.pool_indices[i] for i in pool_indices_to_add]
-        self.labeled_indices.extend(actual_indices)
-        for idx in sorted(pool_indices_to_add, reverse=True):
-            self.pool_indices.pop(idx)
+        rows = self.pool_indices[np.asarray(pool_indices_to_add, dtype=np.int64)]
+        if len(np.unique(rows)) != len(rows):
+            raise ValueError("Pool indices to add contain duplicates")
 
-        self._update_active_learning_sets()
+        end = self._n_labeled + len(rows)
+        self._labeled_order[self._n_labeled : end] = rows
+        self._n_labeled = end
+        self._pool_mask[rows] = False
+        self._cache = {}
 
         update_info = {
-            "samples_added": len(pool_indices_to_add),
-            "new_labeled_size": len(self.labeled_indices),
-            "new_pool_size": len(self.pool_indices),
-            "labeled_percentage": len(self.labeled_indices)
-            / len(self.X_train_full)
-            * 100,
+            "samples_added": len(rows),
+            "new_labeled_size": self.n_labeled,
+            "new_pool_size": self.n_pool,
+            "labeled_percentage": self.n_labeled / len(self.X_train_full) * 100,
         }
         return update_info
 
@@ -119,13 +192,12 @@ class ActiveLearningDataManager:
         if self.is_pool_empty():
             return np.array([]), np.array([])
 
-        actual_batch_size = min(batch_size, len(self.X_pool))
-        batch_indices = np.arange(actual_batch_size)
-        return self.X_pool[batch_indices], self.y_pool[batch_indices]
+        rows = self.pool_indices[:batch_size]
+        return self.X_train_full[rows], self.y_train_full[rows]
 
     def get_labeled_data(self) -> Tuple[np.ndarray, np.ndarray]:
         """Get current labeled dataset."""
-        if self.X_labeled is None:
+        if self._pool_mask is None:
             raise ValueError(
                 "Active Learning not initialized. Call initialize_active_learning() first."
             )
@@ -133,7 +205,7 @@ class ActiveLearningDataManager:
 
     def get_pool_data(self) -> Tuple[np.ndarray, np.ndarray]:
         """Get current pool dataset."""
-        if self.X_pool is None:
+        if self._pool_mask is None:
             raise ValueError(
                 "Active Learning not initialized. Call initialize_active_learning() first."
             )
@@ -141,7 +213,7 @@ class ActiveLearningDataManager:
 
     def is_pool_empty(self) -> bool:
         """Check if pool is empty."""
-        return len(self.pool_indices) == 0
+        return self.n_pool == 0
 
     def get_active_learning_stats(self) -> Dict[str, Any]:
         """Get current Active Learning statistics."""
@@ -149,13 +221,11 @@ class ActiveLearningDataManager:
             return {"status": "not_initialized"}
 
         return {
-            "labeled_samples": len(self.labeled_indices),
-            "pool_samples": len(self.pool_indices),
+            "labeled_samples": self.n_labeled,
+            "pool_samples": self.n_pool,
             "total_train_samples": len(self.X_train_full),
-            "labeled_percentage": len(self.labeled_indices)
-            / len(self.X_train_full)
-            * 100,
-            "pool_percentage": len(self.pool_indices) / len(self.X_train_full) * 100,
+            "labeled_percentage": self.n_labeled / len(self.X_train_full) * 100,
+            "pool_percentage": self.n_pool / len(self.X_train_full) * 100,
             "labeled_class_distribution": (
                 dict(zip(*np.unique(self.y_labeled, return_counts=True)))
                 if self.y_labeled is not None
@@ -165,12 +235,12 @@ class ActiveLearningDataManager:
 
     def reset_active_learning(self):
         """Reset Active Learning state."""
-        self.X_labeled = None
-        self.y_labeled = None
-        self.X_pool = None
-        self.y_pool = None
-        self.labeled_indices = []
-        self.pool_indices = []
+        # labeled rows in the order they were added (up to _n_labeled) and a
+        # pool mask over X_train_full; gathered arrays are cached on access
+        self._labeled_order = np.empty(0, dtype=np.int64)
+        self._n_labeled = 0
+        self._pool_mask: Optional[np.ndarray] = None
+        self._cache: Dict[str, np.ndarray] = {}
 
     def get_dataset_info(self) -> Dict[str, Any]:
         """Get comprehensive dataset information."""
@@ -2,24 +2,147 @@
 
 import json
 import logging
+import os
+import tempfile
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple, Union
 
 import numpy as np
-from catboost import CatBoostClassifier
-from sklearn.metrics import accuracy_score, classification_report, f1_score
+from catboost import CatBoostClassifier, Pool
+from src.metrics import ClassificationMetrics, accuracy
 
 logger = logging.getLogger(__name__)
 
 
+class QuantizedPoolCache:
+    """Quantized CatBoost pools sharing borders computed once per flow run.
+
+    CatBoost quantizes NumPy input on every ``fit``/``predict`` call. The cache
+    quantizes the full training set once, so any training subset is a
+    ``Pool.slice`` of it, and quantizes each evaluation set once with the same
+    borders.
+    """
+
+    def __init__(
+        self,
+        X_train_full: np.ndarray,
+        y_train_full: np.ndarray,
+        border_count: int = 254,
+        thread_count: int = -1,
+    ):
+        """Quantize the full training set.
+
+        Args:
+            X_train_full: Features of the full training set
+            y_train_full: Labels of the full training set
+            border_count: Number of borders per feature
+            thread_count: Threads used to build the pools (-1: all cores)
+        """
+        self.X_train_full = X_train_full
+        self.y_train_full = y_train_full
+        self.border_count = border_count
+        self.thread_count = thread_count
+        self._borders_dir = tempfile.TemporaryDirectory(prefix="catboost_borders_")
+        self.borders_path = os.path.join(self._borders_dir.name, "borders.tsv")
+        self._eval_pools: Dict[str, Tuple[np.ndarray, Pool]] = {}
+
+        start = time.perf_counter()
+        self.train_pool_full = Pool(
+            X_train_full, y_train_full, thread_count=thread_count
+        )
+        self.train_pool_full.quantize(border_count=border_count)
+        self.train_pool_full.save_quantization_borders(self.borders_path)
+        self.build_seconds = time.perf_counter() - start
+
+        logger.info(
+            f"Quantized {len(X_train_full)} training samples in "
+            f"{self.build_seconds:.2f}s ({border_count} borders)"
+        )
+
+    def __reduce__(self):
+        # Pools are not picklable; rebuild them from the source arrays
+        return (
+            self.__class__,
+            (
+                self.X_train_full,
+                self.y_train_full,
+                self.border_count,
+                self.thread_count,
+            ),
+        )
+
+    def train_pool(self, indices: np.ndarray) -> Pool:
+        """Get the quantized pool of a training subset.
+
+        Args:
+            indices: Rows of the full training set, in training order
+
+        Returns:
+            Quantized pool of those rows
+        """
+        return self.train_pool_full.slice(np.asarray(indices, dtype=np.int64))
+
+    def eval_pool(self, name: str, X: np.ndarray, y: np.ndarray) -> Pool:
+        """Get the quantized pool of an evaluation set, building it on first use.
+
+        Args:
+            name: Dataset name (e.g. "validation", "test")
+            X: Features
+            y: Labels
+
+        Returns:
+            Quantized pool with the training set borders
+        """
+        cached = self._eval_pools.get(name)
+        if cached is None or cached[0] is not X:
+            pool = Pool(X, y, thread_count=self.thread_count)
+            pool.quantize(input_borders=self.borders_path)
+            self._eval_pools[name] = cached = (X, pool)
+        return cached[1]
+
+    def raw_quantize_seconds(
+        self, X: np.ndarray, y: np.ndarray, compute_borders: bool
+    ) -> float:
+        """Time quantizing raw arrays the way CatBoost does for NumPy input.
+
+        Args:
+            X: Features
+            y: Labels
+            compute_borders: Whether borders are computed from the data
+                (training) or taken from the model (evaluation)
+
+        Returns:
+            Wall-clock seconds
+        """
+        start = time.perf_counter()
+        pool = Pool(X, y, thread_count=self.thread_count)
+        if compute_borders:
+            pool.quantize(border_count=self.border_count)
+        else:
+            pool.quantize(input_borders=self.borders_path)
+        return time.perf_counter() - start
+
+
 class ModelTrainer:
     """Handles model training and evaluation."""
 
-    def __init__(self, model_params: Dict[str, Any] = None):
+    def __init__(
+        self,
+        model_params: Dict[str, Any] = None,
+        warm_start_iterations: Optional[int] = None,
+        pool_cache: Optional[QuantizedPoolCache] = None,
+    ):
         """Initialize ModelTrainer.
 
         Args:
             model_params: Parameters for CatBoost model
+            warm_start_iterations: If set, train_model continues from a given
+                init_model and adds this many trees instead of training from
+                scratch
+            pool_cache: Quantized pools shared across iterations; when set,
+                training uses pools sliced by index and evaluation uses
+                cached pools instead of raw arrays
         """
         self.model_params = model_params or {
             "iterations": 100,
@@ -29,28 +152,149 @@ class ModelTrainer:
             "random_seed": 42,
             "verbose": False,
         }
+        self.warm_start_iterations = warm_start_iterations
+        self.pool_cache = pool_cache
         self.model = None
+        self.warm_started = False
+        self.train_seconds = None
+        self.pool_seconds = 0.0
+
+    def _training_data(
+        self, X: np.ndarray, y: np.ndarray, indices: Optional[np.ndarray]
+    ) -> Tuple[Union[np.ndarray, Pool], Optional[np.ndarray]]:
+        if self.pool_cache is None or indices is None:
+            return X, y
+        start = time.perf_counter()
+        pool = self.pool_cache.train_pool(indices)
+        self.pool_seconds += time.perf_counter() - start
+        return pool, None
+
+    def _evaluation_data(
+        self, X: np.ndarray, y: np.ndarray, dataset_name: str
+    ) -> Union[np.ndarray, Pool]:
+        if self.pool_cache is None:
+            return X
+        start = time.perf_counter()
+        pool = self.pool_cache.eval_pool(dataset_name, X, y)
+        self.pool_seconds += time.perf_counter() - start
+        return pool
 
     def train_model(
-        self, X_train: np.ndarray, y_train: np.ndarray
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        init_model: Optional[Union[CatBoostClassifier, str]] = None,
+        indices: Optional[np.ndarray] = None,
     ) -> CatBoostClassifier:
         """Train CatBoost model.
 
         Args:
             X_train: Training features
             y_train: Training labels
+            init_model: Previous model (or path to a saved .cbm) to continue
+                from; used only when warm_start_iterations is set
+            indices: Rows of the full training set that X_train holds; with
+                a pool_cache the model trains on the pool sliced by them
 
         Returns:
             Trained CatBoost model
         """
-        logger.info(f"Training CatBoost model on {len(X_train)} samples...")
+        start = time.perf_counter()
+        self.warm_started = False
+        self.pool_seconds = 0.0
+        train_data, train_label = self._training_data(X_train, y_train, indices)
+
+        if init_model is not None and self.warm_start_iterations:
+            if isinstance(init_model, str):
+                model_path, init_model = init_model, CatBoostClassifier()
+                init_model.load_model(model_path)
+
+            if set(init_model.classes_) == set(np.unique(y_train)):
+                logger.info(
+                    f"Warm-starting CatBoost model on {len(X_train)} samples "
+                    f"(+{self.warm_start_iterations} trees)..."
+                )
+                params = {**self.model_params, "iterations": self.warm_start_iterations}
+                self.model = CatBoostClassifier(**params)
+                self.model.fit(train_data, train_label, init_model=init_model)
+                self.warm_started = True
+            else:
+                logger.warning(
+                    "Classes differ from the previous model, training from scratch"
+                )
 
-        self.model = CatBoostClassifier(**self.model_params)
-        self.model.fit(X_train, y_train)
+        if not self.warm_started:
+            logger.info(f"Training CatBoost model on {len(X_train)} samples...")
 
-        logger.info("Model training completed")
+            self.model = CatBoostClassifier(**self.model_params)
+            self.model.fit(train_data, train_label)
+
+        self.train_seconds = time.perf_counter() - start
+        logger.info(f"Model training completed in {self.train_seconds:.2f}s")
         return self.model
 
+    def compare_with_full_retrain(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray,
+        indices: Optional[np.ndarray] = None,
+    ) -> Dict[str, float]:
+        """Compare the current (warm-started) model with training from scratch.
+
+        Trains a reference model with model_params on the same data without
+        replacing the current model.
+
+        Args:
+            X_train: Training features the current model was trained on
+            y_train: Training labels
+            X_val: Validation features
+            y_val: Validation labels
+            indices: Rows of the full training set that X_train holds
+
+        Returns:
+            Dictionary with wall-clock times, time saved and validation
+            accuracy of both models
+        """
+        if self.model is None:
+            raise ValueError("Model not trained. Call train_model() first.")
+
+        pool_seconds = self.pool_seconds
+        start = time.perf_counter()
+        reference = CatBoostClassifier(**self.model_params)
+        reference.fit(*self._training_data(X_train, y_train, indices))
+        full_seconds = time.perf_counter() - start
+
+        val_data = self._evaluation_data(X_val, y_val, "validation")
+        self.pool_seconds = pool_seconds
+        thread_count = self.model_params.get("thread_count", -1)
+        current_accuracy = accuracy(
+            y_val, self.model.predict(val_data, thread_count=thread_count)
+        )
+        full_accuracy = accuracy(
+            y_val, reference.predict(val_data, thread_count=thread_count)
+        )
+
+        comparison = {
+            "warm_start_seconds": self.train_seconds,
+            "full_retrain_seconds": full_seconds,
+            "time_saved_seconds": full_seconds - self.train_seconds,
+            "time_saved_percent": (
+                100 * (1 - self.train_seconds / full_seconds) if full_seconds else 0.0
+            ),
+            "warm_start_val_accuracy": float(current_accuracy),
+            "full_retrain_val_accuracy": float(full_accuracy),
+            "val_accuracy_diff": float(current_accuracy - full_accuracy),
+        }
+
+        logger.info(
+            f"Warm start vs full retrain: {comparison['warm_start_seconds']:.2f}s vs "
+            f"{full_seconds:.2f}s, val accuracy diff "
+            f"{comparison['val_accuracy_diff']:+.4f}"
+        )
+        return comparison
+
     def evaluate_model(
         self, X: np.ndarray, y: np.ndarray, dataset_name: str = "dataset"
     ) -> Dict[str, Any]:
@@ -69,30 +313,77 @@ class ModelTrainer:
 
         logger.info(f"Evaluating model on {dataset_name} ({len(X)} samples)...")
 
-        y_pred = self.model.predict(X)
-
-        accuracy = accuracy_score(y, y_pred)
-        f1_macro = f1_score(y, y_pred, average="macro")
-        f1_weighted = f1_score(y, y_pred, average="weighted")
+        y_pred = self.model.predict(
+            self._evaluation_data(X, y, dataset_name),
+            thread_count=self.model_params.get("thread_count", -1),
+        )
 
-        class_report = classification_report(y, y_pred)
+        # One confusion matrix for all scores; the text report is rendered
+        # only if it is saved
+        scores = ClassificationMetrics(y, y_pred)
 
         metrics = {
             "dataset": dataset_name,
             "samples": len(X),
-            "accuracy": float(accuracy),
-            "f1_macro": float(f1_macro),
-            "f1_weighted": float(f1_weighted),
-            "classification_report": class_report,
+            "accuracy": scores.accuracy,
+            "f1_macro": scores.average(scores.f1, "macro"),
+            "f1_weighted": scores.average(scores.f1, "weighted"),
+            "classification_report": scores.report(),
         }
 
         logger.info(f"{dataset_name} metrics:")
-        logger.info(f"  Accuracy: {accuracy:.4f}")
-        logger.info(f"  F1 Score (macro): {f1_macro:.4f}")
-        logger.info(f"  F1 Score (weighted): {f1_weighted:.4f}")
+        logger.info(f"  Accuracy: {metrics['accuracy']:.4f}")
+        logger.info(f"  F1 Score (macro): {metrics['f1_macro']:.4f}")
+        logger.info(f"  F1 Score (weighted): {metrics['f1_weighted']:.4f}")
 
         return metrics
 
+    def quantization_report(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        eval_sets: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    ) -> Dict[str, float]:
+        """Compare this iteration's pool reuse with quantizing raw arrays.
+
+        Call after train_model and evaluate_model. Times what CatBoost would
+        spend quantizing the same arrays passed as NumPy input: the training
+        set with its own borders and each evaluation set with fixed borders.
+        This repeats the quantization the pool cache avoids, so flows only
+        call it when the comparison is requested.
+
+        Args:
+            X_train: Training features of the iteration
+            y_train: Training labels
+            eval_sets: Mapping of dataset name to (features, labels) evaluated
+                in the iteration
+
+        Returns:
+            Dictionary with the time spent getting cached pools, the time
+            raw quantization takes and the difference
+        """
+        if self.pool_cache is None:
+            raise ValueError("No pool_cache configured.")
+
+        raw_seconds = self.pool_cache.raw_quantize_seconds(
+            X_train, y_train, compute_borders=True
+        )
+        for X, y in eval_sets.values():
+            raw_seconds += self.pool_cache.raw_quantize_seconds(
+                X, y, compute_borders=False
+            )
+
+        report = {
+            "pool_seconds": self.pool_seconds,
+            "raw_quantize_seconds": raw_seconds,
+            "quantize_saved_seconds": raw_seconds - self.pool_seconds,
+        }
+        logger.info(
+            f"Quantization: {self.pool_seconds:.3f}s with cached pools vs "
+            f"{raw_seconds:.3f}s from raw arrays"
+        )
+        return report
+
     def save_model(self, filepath: str) -> None:
         """Save trained model.
 
@@ -163,6 +454,6 @@ class ModelTrainer:
                     f"Classification Report - {metrics.get('dataset', 'Unknown')}\n"
                 )
                 f.write("=" * 50 + "\n")
-                f.write(metrics["classification_report"])
+                f.write(str(metrics["classification_report"]))
 
         logger.info(f"Metrics saved to {filepath}")